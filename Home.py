@@ -1,19 +1,13 @@
 import streamlit as st
+from urllib.parse import urlencode
+from roles import ROLES
 from streamlit_extras.switch_page_button import switch_page
 
 st.set_page_config(page_title="Interview Setup", layout="centered")
 
 st.title("Interview Practice Setup")
 
-role_options = [
-    "Select a role...",
-    "Software Engineer",
-    "Product Manager",
-    "Data Scientist",
-    "UX Designer",
-    "Business Analyst",
-    "Other"
-]
+role_options = ["Select a role...", *ROLES, "Other"]
 
 # Input fields
 name = st.text_input("Your Name", "")
@@ -50,7 +44,7 @@ if st.button("Start Practice", key="start_practice_button"):
         # Go to Practice
         st.markdown(
             f"""
-            <a href="/Practice?name={name}&role={role}" target="_self">
+            <a href="/Practice?{urlencode({'name': name, 'role': role, 'topic': topic, 'goal': goal})}" target="_self">
                 <button style='padding: 0.75em 1.5em; font-size: 1.1em; background-color: #2563eb; color: white; border: none; border-radius: 8px; margin-top: 1rem;'>
                      Go to Flashcards
                 </button>
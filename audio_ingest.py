@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+
+CHUNK_SIZE = 1024 * 1024
+HEADER_SIZE = 64
+TRANSCRIPT_CACHE_DIR = os.path.join("tmp", "transcripts")
+# MediaFormat values Amazon Transcribe accepts
+SUPPORTED_FORMATS = {"mp3", "mp4", "wav", "flac", "ogg", "amr", "webm", "m4a"}
+
+
+@dataclass
+class IngestedAudio:
+    path: str
+    sha256: str
+    media_format: str
+    size: int
+
+    @property
+    def mime_type(self):
+        return {"mp3": "audio/mpeg", "m4a": "audio/mp4"}.get(self.media_format, f"audio/{self.media_format}")
+
+
+def sniff_format(header):
+    """Identify the container from its first bytes; returns None if unrecognised."""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if header[:5] == b"#!AMR":
+        return "amr"
+    if header[4:8] == b"ftyp":
+        brand = header[8:12]
+        return "m4a" if brand in (b"M4A ", b"M4B ") else "mp4"
+    # MP3: ID3v2 tag, or a bare MPEG audio frame sync (11 set bits)
+    if header[:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+def _format_from_name(name):
+    ext = os.path.splitext(name or "")[1].lower().lstrip(".")
+    return ext if ext in SUPPORTED_FORMATS else None
+
+
+def ingest_upload(fileobj, dest_dir="tmp", filename=None, chunk_size=CHUNK_SIZE):
+    """Copy an uploaded file-like object to dest_dir in fixed-size chunks.
+
+    The SHA-256 and the media format are worked out while copying, and the file is
+    stored as <hash>.<format>, so the same recording uploaded twice lands on the same
+    path and never needs to be held in memory as a whole.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+    digest = hashlib.sha256()
+    header = b""
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                if len(header) < HEADER_SIZE:
+                    header += chunk[:HEADER_SIZE - len(header)]
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+        sha256 = digest.hexdigest()
+        media_format = sniff_format(header) or _format_from_name(filename or getattr(fileobj, "name", None))
+        if media_format is None:
+            raise ValueError("Unrecognised audio format")
+        path = os.path.join(dest_dir, f"{sha256[:16]}.{media_format}")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return IngestedAudio(path, sha256, media_format, size)
+
+
+def ingest_path(path, chunk_size=CHUNK_SIZE):
+    # Same hashing and sniffing for a file already on disk, without copying it
+    digest = hashlib.sha256()
+    header = b""
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            if len(header) < HEADER_SIZE:
+                header += chunk[:HEADER_SIZE - len(header)]
+            digest.update(chunk)
+            size += len(chunk)
+    media_format = sniff_format(header) or _format_from_name(path)
+    if media_format is None:
+        raise ValueError(f"Unrecognised audio format: {path}")
+    return IngestedAudio(path, digest.hexdigest(), media_format, size)
+
+
+def _transcript_cache_path(sha256, cache_dir=TRANSCRIPT_CACHE_DIR):
+    return os.path.join(cache_dir, f"{sha256}.json")
+
+
+def cached_transcript(sha256, cache_dir=TRANSCRIPT_CACHE_DIR):
+    try:
+        with open(_transcript_cache_path(sha256, cache_dir), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def store_transcript(sha256, transcript_json, cache_dir=TRANSCRIPT_CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _transcript_cache_path(sha256, cache_dir)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(transcript_json, f)
+    os.replace(f"{path}.tmp", path)
@@ -0,0 +1,52 @@
+# Boilerplate stripping and MinHash near-duplicate removal over synthetic scraped
+# pages: every page carries the same navigation and footer lines, and a share of them
+# are lightly edited mirrors of an earlier page. Time should grow linearly with pages.
+# Run from the repo root: python -m benchmarks.bench_dedup
+import random
+import sys
+import time
+
+from benchmarks.synthetic_transcripts import synthetic_transcript
+from dedup import DedupReport, clean_pages, dedup_chunks
+
+NAV = ["Home | Jobs | Interview Prep | Salaries | Sign in", "Skip to main content"]
+FOOTER = ["Subscribe to our newsletter for weekly interview tips.", "© 2025 Example Media. All rights reserved."]
+
+
+def synthetic_pages(count, mirror_share=0.3, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        if pages and rng.random() < mirror_share:
+            # A mirror: same article, with a few words changed and its own header
+            words = rng.choice(pages).split()
+            for _ in range(3):
+                words[rng.randrange(len(words))] = "edited"
+            body = " ".join(words)
+        else:
+            body = "\n\n".join(synthetic_transcript(120, seed=seed * 100_000 + i * 10 + p) for p in range(4))
+        pages.append("\n".join(NAV + [body] + FOOTER))
+    return pages
+
+
+def main(sizes):
+    print(f"{'pages':>6} {'pages s':>8} {'us/page':>8} {'pages cut':>10} {'bytes cut':>10} "
+          f"{'chunks':>7} {'chunks s':>9} {'chunks cut':>11}")
+    for n in sizes:
+        pages = synthetic_pages(n)
+        start = time.perf_counter()
+        kept, report = clean_pages(pages)
+        page_seconds = time.perf_counter() - start
+
+        chunks = [page[i:i + 500] for page in pages for i in range(0, len(page), 450)]
+        chunk_report = DedupReport()
+        start = time.perf_counter()
+        dedup_chunks(chunks, chunk_report)
+        chunk_seconds = time.perf_counter() - start
+        print(f"{n:>6} {page_seconds:>8.2f} {page_seconds / n * 1e6:>8.0f} "
+              f"{report.pages_removed:>10} {report.bytes_removed / report.bytes_in:>10.1%} "
+              f"{len(chunks):>7} {chunk_seconds:>9.2f} {chunk_report.chunks_removed:>11}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000])
@@ -0,0 +1,55 @@
+# Embedding throughput (chunks/s) of EmbeddingService across models, backends, batch
+# sizes and worker processes, plus a warm-cache pass. Uses a throwaway cache per run.
+# Needs sentence-transformers and the model weights (downloaded on first use).
+# Run from the repo root: python -m benchmarks.bench_embeddings [chunks]
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_transcripts import synthetic_corpus
+from embedding_service import EmbeddingService
+
+CONFIGS = [
+    # (model, backend, batch_size, workers)
+    ("sentence-transformers/all-mpnet-base-v2", "torch", 32, 0),
+    ("sentence-transformers/all-mpnet-base-v2", "torch", 128, 0),
+    ("sentence-transformers/all-mpnet-base-v2", "torch", 64, max(2, (os.cpu_count() or 2) // 2)),
+    ("sentence-transformers/all-MiniLM-L6-v2", "torch", 64, 0),
+    ("sentence-transformers/all-MiniLM-L6-v2", "onnx", 64, 0),
+]
+
+
+def main(count):
+    # About 500 characters each, the size vector_store splits chunks to
+    chunks = synthetic_corpus(count, words=90)
+    print(f"{count} chunks of ~{sum(map(len, chunks)) // count} characters\n")
+    print(f"{'model':<40} {'backend':<8} {'batch':>5} {'workers':>7} {'load s':>7} {'cold/s':>9} {'warm/s':>11}")
+    for model_name, backend, batch_size, workers in CONFIGS:
+        cache_dir = tempfile.mkdtemp(prefix="bench_embeddings_")
+        service = EmbeddingService(model_name, backend, batch_size=batch_size, workers=workers,
+                                   cache_path=os.path.join(cache_dir, "embeddings.db"))
+        try:
+            start = time.perf_counter()
+            service.embed_query("warm up")
+            load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            service.embed_array(chunks)
+            cold = count / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            service.embed_array(chunks)
+            warm = count / (time.perf_counter() - start)
+            print(f"{model_name:<40} {backend:<8} {batch_size:>5} {workers:>7} {load_seconds:>7.1f} "
+                  f"{cold:>9,.0f} {warm:>11,.0f}")
+        except Exception as e:
+            print(f"{model_name:<40} {backend:<8} {batch_size:>5} {workers:>7} failed: {e}")
+        finally:
+            service.close()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
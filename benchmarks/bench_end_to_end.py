@@ -0,0 +1,309 @@
+# End-to-end latency of every slow path with no network access: the scraper against
+# LocalWeb, RAGBot build/generate/evaluate against FakeOpenAI, the AWS transcription
+# flow against FakeS3Client/FakeTranscribeClient, and the spaCy filler analysis.
+# Each stage runs for a number of rounds and reports throughput and p50/p99 per round,
+# followed by the per-span breakdown from tracing (per URL, per LLM call, ...). The
+# stand-ins' latencies and error rates are in STAND_INS.
+# --json saves the results; --baseline compares against a saved run and flags any
+# stage or span whose p50 got more than 20% slower.
+# Stages whose dependencies are missing fall back or are skipped, with the reason:
+# without langchain/chromadb the build uses an in-memory retriever, and transcription
+# and analysis need the spaCy en_core_web_sm model.
+# Run from the repo root: python -m benchmarks.bench_end_to_end [--rounds 5] [--json run.json]
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from benchmarks.bench_retrieval import DIM, HashEmbeddings
+from benchmarks.bench_stream import DECK_REPLY
+from benchmarks.fake_aws import FakeS3Client, FakeTranscribeClient
+from benchmarks.fake_openai import FakeOpenAI, default_reply
+from benchmarks.local_web import LocalWeb
+from benchmarks.synthetic_transcripts import synthetic_corpus
+from tracing import span, tracer
+
+REGRESSION = 1.2
+# Stages and spans faster than this are too noisy to compare between runs
+MIN_COMPARE_SECONDS = 0.01
+STAND_INS = {
+    "web": {"latency": 0.2, "jitter": 0.1, "error_rate": 0.02},
+    "openai": {"latency": 0.4, "jitter": 0.1, "rate_limit_rate": 0.05, "retry_after": 0.1, "token_latency": 0.001},
+    "s3": {"latency": 0.05, "bandwidth": 20 * 1024 * 1024, "error_rate": 0.0},
+    "transcribe": {"durations": (0.5, 1.5), "api_latency": 0.02, "fail_rate": 0.0},
+}
+
+
+class BenchEmbeddings(HashEmbeddings):
+    # HashEmbeddings with the list return types and stats() that RAGBot expects
+    def embed_documents(self, texts):
+        return super().embed_documents(texts).tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def stats(self):
+        return {"encoded": 0, "cache_hits": 0, "chunks_per_second": None}
+
+
+def reply(payload):
+    # Deck generation asks for JSON; everything else is answer feedback
+    return DECK_REPLY if payload.get("response_format") else default_reply(payload)
+
+
+def run_stage(name, rounds, fn):
+    """Call fn(round) `rounds` times; fn returns (items, errors). The code under test's
+    own progress output is swallowed."""
+    latencies, items, errors = [], 0, 0
+    print(f"{name}...")
+    for i in range(rounds):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            done, failed = fn(i)
+            latencies.append(time.perf_counter() - start)
+        items += done
+        errors += failed
+    latencies = np.array(latencies)
+    return {
+        "stage": name,
+        "rounds": rounds,
+        "items": items,
+        "errors": errors,
+        "items_per_second": round(items / latencies.sum(), 2) if latencies.sum() else None,
+        "p50": round(float(np.percentile(latencies, 50)), 4),
+        "p99": round(float(np.percentile(latencies, 99)), 4),
+    }
+
+
+def skipped(name, reason):
+    print(f"{name}: skipped ({reason})")
+    return {"stage": name, "skipped": reason}
+
+
+def scrape_stage(web, workdir, rounds, pages):
+    import scraper
+    from dedup import DedupReport, clean_pages
+
+    # Search hits come from LocalWeb instead of Google
+    scraper.search = lambda prompt, num_results: web.urls(num_results)
+    report = DedupReport()
+    fallback = []
+
+    def one(i):
+        results = scraper.search_pages(f"software engineer interview {i}", num_results=pages)
+        if not fallback:
+            try:
+                scraper.write_corpus(results, os.path.join(workdir, "scraped.txt"), report=report)
+            except ImportError as e:
+                fallback.append(str(e))
+        if fallback:
+            with span("scrape.dedup"):
+                clean_pages([result.text for result in results], report)
+        return len(results), sum(not result.ok for result in results)
+
+    result = run_stage("scrape", rounds, one)
+    result["dedup"] = report.to_dict()
+    if fallback:
+        result["note"] = f"corpus not written, only deduplicated: {fallback[0]}"
+    return result
+
+
+def build_stage(workdir, rounds, chunks, base_url, embeddings):
+    from prompt_budget import compress_texts, count_tokens
+    from rag_bot_clean import RAGBot
+    from retrieval import ArrayCandidates, Retriever
+
+    # About 500 characters per synthetic answer, so roughly one chunk each
+    corpus_path = os.path.join(workdir, "corpus.txt")
+    texts = synthetic_corpus(chunks, words=90)
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(texts))
+    bots = []
+    fallback = []
+
+    def one(i):
+        bot = RAGBot(data_path=corpus_path, persist_dir=os.path.join(workdir, f"chroma_{i}"),
+                     api_key="test", base_url=base_url)
+        bot.embeddings = embeddings
+        if not fallback:
+            try:
+                bot.build_vectorstore()
+            except ImportError as e:
+                fallback.append(str(e))
+        if fallback:
+            with span("vectorstore.build"):
+                # Configured the way build_vectorstore configures it
+                bot.retriever = Retriever(ArrayCandidates(embeddings.embed_documents(texts), texts), embeddings,
+                                          count_tokens=count_tokens, compress=compress_texts)
+        bots.append(bot)
+        return chunks, 0
+
+    result = run_stage("build", rounds, one)
+    if fallback:
+        result["note"] = f"in-memory retriever, Chroma unavailable: {fallback[0]}"
+    return result, bots[-1]
+
+
+def generate_stage(bot, rounds):
+    def one(i):
+        records = bot.generate_qa_records("Software Engineer", "system design", "staff level")
+        return len(records), int(not records)
+
+    def streamed(i):
+        records = list(bot.generate_qa_stream("Software Engineer", "system design", "staff level"))
+        return len(records), int(not records)
+
+    return run_stage("generate", rounds, one), run_stage("generate_stream", rounds, streamed)
+
+
+def evaluate_stage(bot, rounds, answers):
+    pairs = [(record.question, f"My answer to {record.question}") for record in bot.qa_records]
+    pairs = (pairs * (answers // max(1, len(pairs)) + 1))[:answers]
+
+    def one(i):
+        results = bot.evaluate_responses(pairs)
+        return len(results), sum(not result.ok for result in results)
+
+    return run_stage("evaluate", rounds, one)
+
+
+def write_wav(path, seconds, salt):
+    # Silence plus a per-round salt, so every recording hashes differently and misses the
+    # transcript cache
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(b"\x00\x00" * int(16000 * seconds) + salt.to_bytes(8, "little"))
+
+
+def import_transcript():
+    # transcript creates its boto3 clients on import, which needs a region even though the
+    # benchmark swaps them for stand-ins
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    import transcript
+    return transcript
+
+
+def transcribe_stage(web, workdir, rounds, seconds):
+    try:
+        transcript = import_transcript()
+    except Exception as e:
+        return skipped("transcribe", e)
+    from audio_ingest import TRANSCRIPT_CACHE_DIR, ingest_path
+
+    transcript.s3 = FakeS3Client(**STAND_INS["s3"])
+    transcript.transcribe_client = FakeTranscribeClient(transcript_base_url=web.base_url, **STAND_INS["transcribe"])
+    salt = time.time_ns()
+
+    def one(i):
+        path = os.path.join(workdir, f"answer_{i}.wav")
+        write_wav(path, seconds, salt + i)
+        try:
+            # Transcription only; spaCy analysis is timed by the analysis stage
+            transcript.transcribe_audio(ingest_path(path), backend="aws")
+            return 1, 0
+        except Exception as e:
+            print(f"transcription {i} failed: {e}")
+            return 1, 1
+        finally:
+            cached = os.path.join(TRANSCRIPT_CACHE_DIR, f"{ingest_path(path).sha256}.json")
+            if os.path.exists(cached):
+                os.remove(cached)
+
+    return run_stage("transcribe", rounds, one)
+
+
+def analysis_stage(rounds, transcripts, words):
+    try:
+        transcript = import_transcript()
+        transcript.get_nlp()
+    except Exception as e:
+        return skipped("analysis", e)
+    texts = synthetic_corpus(transcripts, words=words)
+    return run_stage("analysis", rounds, lambda i: (len(transcript.analyze_transcripts(texts)), 0))
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    before = {stage["stage"]: stage.get("p50") for stage in baseline["stages"]}
+    before.update((name, h["p50"]) for name, h in baseline["spans"].items())
+    now = {stage["stage"]: stage.get("p50") for stage in results["stages"]}
+    now.update((name, h["p50"]) for name, h in results["spans"].items())
+    print(f"\nAgainst {baseline_path}:")
+    regressions = 0
+    for name in sorted(now):
+        if not now[name] or not before.get(name) or max(now[name], before[name]) < MIN_COMPARE_SECONDS:
+            continue
+        ratio = now[name] / before[name]
+        flag = "  REGRESSION" if ratio > REGRESSION else ""
+        regressions += bool(flag)
+        print(f"  {name:<28} p50 {before[name]:>8.3f}s -> {now[name]:>8.3f}s ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def main(args):
+    tracer.enabled = True
+    tracer.reset()
+    workdir = tempfile.mkdtemp(prefix="bench_end_to_end_")
+    embeddings = BenchEmbeddings(np.random.default_rng(0).normal(size=(50, DIM)).astype(np.float32))
+    stages = []
+    start = time.perf_counter()
+    try:
+        with LocalWeb(**STAND_INS["web"]) as web, FakeOpenAI(reply=reply, **STAND_INS["openai"]) as fake:
+            stages.append(scrape_stage(web, workdir, args.rounds, args.pages))
+            build, bot = build_stage(workdir, args.rounds, args.chunks, fake.base_url, embeddings)
+            stages.append(build)
+            stages.extend(generate_stage(bot, args.rounds))
+            stages.append(evaluate_stage(bot, args.rounds, args.answers))
+            # The stand-ins share one LocalWeb, so its error rate applies to transcript downloads too
+            web.error_rate = 0.0
+            stages.append(transcribe_stage(web, workdir, args.rounds, args.audio_seconds))
+        stages.append(analysis_stage(args.rounds, args.transcripts, args.words))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'stage':<16} {'rounds':>6} {'items':>6} {'errors':>6} {'items/s':>9} {'p50 s':>8} {'p99 s':>8}")
+    for stage in stages:
+        if "skipped" in stage:
+            print(f"{stage['stage']:<16} skipped: {stage['skipped']}")
+            continue
+        print(f"{stage['stage']:<16} {stage['rounds']:>6} {stage['items']:>6} {stage['errors']:>6} "
+              f"{stage['items_per_second']:>9.1f} {stage['p50']:>8.3f} {stage['p99']:>8.3f}")
+        if stage.get("note"):
+            print(f"{'':<16} {stage['note']}")
+    print(f"\n{tracer.summary()}")
+    print(f"\nTotal {time.perf_counter() - start:.1f}s; counters: {tracer.snapshot()['counters']}")
+
+    snapshot = tracer.snapshot()
+    results = {"args": vars(args), "stand_ins": STAND_INS, "stages": stages, "spans": snapshot["spans"],
+               "counters": snapshot["counters"]}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"Results saved to {args.json}")
+    if args.baseline:
+        return compare(results, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark against local stand-ins.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=20, help="search hits scraped per round")
+    parser.add_argument("--chunks", type=int, default=2000, help="corpus size for the vectorstore build")
+    parser.add_argument("--answers", type=int, default=20, help="answers evaluated per round")
+    parser.add_argument("--audio-seconds", type=float, default=60.0)
+    parser.add_argument("--transcripts", type=int, default=200, help="transcripts analysed per round")
+    parser.add_argument("--words", type=int, default=300, help="words per analysed transcript")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    raise SystemExit(1 if main(parser.parse_args()) else 0)
@@ -0,0 +1,44 @@
+# Serial evaluate_user_response loop vs RAGBot.evaluate_responses against a local
+# chat-completions stand-in with simulated latency and rate limiting.
+# Run from the repo root: python -m benchmarks.bench_evaluate [num_answers]
+import sys
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+from rag_bot_clean import RAGBot
+
+
+def make_bot(base_url):
+    bot = RAGBot(api_key="test", base_url=base_url)
+    bot.qa_pairs = {f"Question {i}?": f"Reference answer {i}." for i in range(200)}
+    return bot
+
+
+def main(count):
+    pairs = [(f"Question {i}?", f"Candidate answer {i}.") for i in range(count)]
+
+    with FakeOpenAI(latency=0.3, rate_limit_rate=0.1, seed=1) as fake:
+        bot = make_bot(fake.base_url)
+        start = time.perf_counter()
+        serial = [bot.evaluate_user_response(q, a) for q, a in pairs]
+        serial_time = time.perf_counter() - start
+
+    with FakeOpenAI(latency=0.3, rate_limit_rate=0.1, seed=1) as fake:
+        bot = make_bot(fake.base_url)
+        start = time.perf_counter()
+        results = bot.evaluate_responses(pairs, max_concurrency=8)
+        batch_time = time.perf_counter() - start
+
+        in_order = all(r.question == q for r, (q, _) in zip(results, pairs))
+        failures = [r for r in results if not r.ok]
+        retried = sum(r.attempts - 1 for r in results)
+        print(f"answers:        {count}")
+        print(f"serial:         {serial_time:.2f}s ({sum(f.startswith('Error') for f in serial)} error strings)")
+        print(f"batch:          {batch_time:.2f}s, max in flight {fake.max_in_flight}")
+        print(f"speedup:        {serial_time / batch_time:.1f}x")
+        print(f"order kept:     {in_order}")
+        print(f"retries:        {retried}, failed items: {len(failures)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,57 @@
+# Sequential newspaper download/parse vs fetcher.fetch_all against a local HTTP stand-in.
+# Run from the repo root: python -m benchmarks.bench_fetch [num_urls ...]
+import sys
+import time
+
+from newspaper import Article
+
+from benchmarks.local_web import LocalWeb
+from fetcher import fetch_all
+
+
+def sequential(urls):
+    texts = []
+    for url in urls:
+        try:
+            article = Article(url)
+            article.download()
+            article.parse()
+            texts.append(article.text.strip())
+        except Exception:
+            texts.append("")
+    return texts
+
+
+def concurrent(urls, first_page_times):
+    start = time.perf_counter()
+
+    def on_page(result):
+        if not first_page_times:
+            first_page_times.append(time.perf_counter() - start)
+
+    return [result.text for result in fetch_all(urls, on_page=on_page, max_workers=32, per_host=32)]
+
+
+def main(sizes):
+    with LocalWeb(latency=0.2, jitter=0.1) as web:
+        print(f"{'urls':>6} {'sequential':>12} {'concurrent':>12} {'first page':>12} {'speedup':>8}")
+        for size in sizes:
+            urls = web.urls(size)
+
+            start = time.perf_counter()
+            seq_texts = sequential(urls)
+            seq_time = time.perf_counter() - start
+
+            first_page = []
+            start = time.perf_counter()
+            con_texts = concurrent(urls, first_page)
+            con_time = time.perf_counter() - start
+
+            if seq_texts != con_texts:
+                print(f"warning: extracted text differs at {size} urls")
+            print(f"{size:>6} {seq_time:>11.2f}s {con_time:>11.2f}s {first_page[0]:>11.2f}s "
+                  f"{seq_time / con_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [7, 50, 200])
@@ -0,0 +1,45 @@
+# Filler detection alone on pre-parsed long transcripts: the old per-token if/elif chain
+# plus substring phrase counts vs the compiled FillerMatcher.
+# Run from the repo root: python -m benchmarks.bench_filler_matcher [words_per_transcript] [transcripts]
+import sys
+import time
+
+import spacy
+
+from benchmarks.legacy_fillers import legacy_filler_counts
+from benchmarks.synthetic_transcripts import synthetic_corpus
+from filler_matcher import FillerMatcher, load_lexicon
+
+
+def best_of(fn, docs, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(words, count):
+    nlp = spacy.load("en_core_web_sm", disable=["ner", "lemmatizer"])
+    matcher = FillerMatcher(nlp, load_lexicon("en"))
+    docs = list(nlp.pipe(text.lower() for text in synthetic_corpus(count, words=words)))
+    tokens = sum(len(doc) for doc in docs)
+
+    legacy_time = best_of(legacy_filler_counts, docs)
+    matcher_time = best_of(matcher.count, docs)
+
+    legacy_total = sum(sum(legacy_filler_counts(doc).values()) for doc in docs)
+    matcher_total = sum(sum(matcher.count(doc).values()) for doc in docs)
+    print(f"tokens:           {tokens}")
+    print(f"if/elif chain:    {legacy_time * 1000:.1f}ms  ({tokens / legacy_time / 1e6:.2f}M tokens/s)")
+    print(f"FillerMatcher:    {matcher_time * 1000:.1f}ms  ({tokens / matcher_time / 1e6:.2f}M tokens/s)")
+    print(f"speedup:          {legacy_time / matcher_time:.1f}x")
+    print(f"fillers found:    {legacy_total} before, {matcher_total} after")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 20000, int(args[1]) if len(args) > 1 else 5)
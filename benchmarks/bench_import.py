@@ -0,0 +1,45 @@
+# Startup cost of `import rag_bot_clean`, each measurement in a fresh interpreter.
+#   before: the modules the old rag_bot_clean imported eagerly at module level
+#           (the old import also built the vectorstore and called OpenAI on top of this)
+#   after:  the lazy module as it is now
+#   first use: get_bot(), which loads the persisted index on demand
+# Run from the repo root: python -m benchmarks.bench_import [repeats]
+import statistics
+import subprocess
+import sys
+
+EAGER_IMPORTS = (
+    "import openai, langchain_community.document_loaders, langchain.text_splitter, "
+    "langchain.indexes, langchain_huggingface, langchain_community.vectorstores, transformers"
+)
+
+CASES = {
+    "before (eager imports)": EAGER_IMPORTS,
+    "after (import rag_bot_clean)": "import rag_bot_clean",
+    "after + get_bot()": "import rag_bot_clean; rag_bot_clean.get_bot()",
+}
+
+
+def time_statement(statement):
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def main(repeats):
+    print(f"{'case':<32} {'median':>10} {'min':>10}")
+    for name, statement in CASES.items():
+        try:
+            times = [time_statement(statement) for _ in range(repeats)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<32} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:<32} {statistics.median(times):>9.3f}s {min(times):>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
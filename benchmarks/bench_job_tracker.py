@@ -0,0 +1,72 @@
+# Fixed-interval polling (one thread per job, like the old transcript.main loop) vs
+# TranscriptionJobTracker watching every job from one task, against a fake Transcribe API.
+# Run from the repo root: python -m benchmarks.bench_job_tracker [num_jobs] [fixed_interval]
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_aws import FakeTranscribeClient
+from job_tracker import TranscriptionJobTracker
+
+
+def start_jobs(client, count):
+    names = [f"job_{i}" for i in range(count)]
+    for name in names:
+        client.start_transcription_job(
+            TranscriptionJobName=name, Media={"MediaFileUri": f"s3://bucket/{name}"},
+            MediaFormat="wav", LanguageCode="en-US",
+        )
+    return names
+
+
+def fixed_polling(count, interval):
+    client = FakeTranscribeClient(durations=(0.5, 4.0))
+    names = start_jobs(client, count)
+
+    def poll(name):
+        while True:
+            status = client.get_transcription_job(TranscriptionJobName=name)["TranscriptionJob"]
+            if status["TranscriptionJobStatus"] in ("COMPLETED", "FAILED"):
+                return time.monotonic() - client.finished_at(name)
+            time.sleep(interval)
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        lags = list(pool.map(poll, names))
+    return lags, client.get_calls
+
+
+def tracked(count):
+    client = FakeTranscribeClient(durations=(0.5, 4.0))
+    names = start_jobs(client, count)
+
+    async def run():
+        tracker = TranscriptionJobTracker(client, initial_delay=0.25, max_delay=2.0)
+        observed = {}
+        futures = [
+            tracker.watch(name, on_complete=lambda info: observed.setdefault(
+                info["TranscriptionJobName"], time.monotonic()))
+            for name in names
+        ]
+        await asyncio.gather(*futures)
+        return [observed[name] - client.finished_at(name) for name in names]
+
+    lags = asyncio.run(run())
+    return lags, client.get_calls
+
+
+def report(label, lags, calls):
+    lags = sorted(lags)
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f"{label:<22} mean lag {statistics.mean(lags):.2f}s  p99 lag {p99:.2f}s  get_job calls {calls}")
+
+
+def main(count, interval):
+    report(f"fixed {interval}s polling", *fixed_polling(count, interval))
+    report("adaptive tracker", *tracked(count))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50, float(args[1]) if len(args) > 1 else 5.0)
@@ -0,0 +1,48 @@
+# Prompt size for deck generation and answer evaluation, before and after
+# prompt_budget: retrieved chunks that restate each other (mirrored pages, repeated
+# intros) are compressed sentence by sentence, and evaluation inputs are capped.
+# Token counts use tiktoken when its encoding is available, otherwise the length estimate.
+# Run from the repo root: python -m benchmarks.bench_prompt_budget
+import time
+
+from benchmarks.bench_dedup import synthetic_pages
+from benchmarks.synthetic_transcripts import synthetic_transcript
+from prompt_budget import (EVAL_ANSWER_TOKENS, EVAL_REFERENCE_TOKENS, compress_texts, count_tokens, qa_output_tokens,
+                           truncate_tokens)
+from retrieval import MAX_CONTEXT_TOKENS, Retrieved, pack_context
+
+
+def chunks_from(pages, size=500):
+    return [page[i:i + size] for page in pages for i in range(0, len(page), size)]
+
+
+def main():
+    # Eight retrieved chunks, the retriever's k, from pages that partly mirror each other
+    retrieved = [Retrieved(str(i), text) for i, text in enumerate(chunks_from(synthetic_pages(6, mirror_share=0.5))[:8])]
+
+    raw = "\n\n".join(doc.text for doc in retrieved)
+    packed, used = pack_context(retrieved, MAX_CONTEXT_TOKENS, count_tokens)
+    start = time.perf_counter()
+    texts, dropped = compress_texts([doc.text for doc in retrieved])
+    compress_ms = (time.perf_counter() - start) * 1000
+    compressed = [Retrieved(doc.id, text) for doc, text in zip(retrieved, texts) if text]
+    packed_c, used_c = pack_context(compressed, MAX_CONTEXT_TOKENS, count_tokens)
+
+    print("deck generation context")
+    print(f"  retrieved chunks:        {len(retrieved)} ({count_tokens(raw)} tokens)")
+    print(f"  packed, uncompressed:    {len(packed)} chunks, {used} tokens")
+    print(f"  packed, compressed:      {len(packed_c)} chunks, {used_c} tokens, "
+          f"{dropped} repeated sentences dropped in {compress_ms:.1f} ms")
+    print(f"  max_tokens:              2000 -> {qa_output_tokens()}")
+
+    reference = synthetic_transcript(1500, seed=1)
+    answer = synthetic_transcript(3000, seed=2)
+    print("\nanswer evaluation inputs")
+    print(f"  reference:               {count_tokens(reference)} -> "
+          f"{count_tokens(truncate_tokens(reference, EVAL_REFERENCE_TOKENS))} tokens")
+    print(f"  candidate answer:        {count_tokens(answer)} -> "
+          f"{count_tokens(truncate_tokens(answer, EVAL_ANSWER_TOKENS))} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Retrieval latency and diversity on synthetic corpora of 10k-100k chunks.
+# Compares the old single-query top-3 search with multi-query MMR retrieval, with and
+# without a metadata filter. Vectors are clustered by "page", and a share of each
+# page's chunks are near-copies of one boilerplate chunk that sits close to the page's
+# topic, the way repeated navigation and footer text does. "redundant" counts picks
+# that are near-duplicates (cosine > 0.95) of an earlier pick.
+# Run from the repo root: python -m benchmarks.bench_retrieval [chunks ...]
+import hashlib
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from retrieval import ArrayCandidates, Retriever, build_queries, metadata_where, normalize
+
+DIM = 384
+PAGES = 500
+REPEATS = 20
+
+
+class HashEmbeddings:
+    # Deterministic stand-in for the sentence-transformer: each text maps to a point
+    # near one of the corpus's page centroids
+    def __init__(self, centroids):
+        self.centroids = centroids
+
+    def embed_documents(self, texts):
+        vectors = []
+        for text in texts:
+            seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+            rng = np.random.default_rng(seed)
+            vectors.append(self.centroids[seed % len(self.centroids)] + 0.3 * rng.normal(size=DIM))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def synthetic_corpus(n, seed=0, duplicate_share=0.1):
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(PAGES, DIM)).astype(np.float32)
+    pages = rng.integers(0, PAGES, n)
+    vectors = centroids[pages] + 0.6 * rng.normal(size=(n, DIM)).astype(np.float32)
+    boilerplate = centroids + 0.2 * rng.normal(size=(PAGES, DIM)).astype(np.float32)
+    duplicates = rng.random(n) < duplicate_share
+    vectors[duplicates] = (boilerplate[pages[duplicates]]
+                           + 0.01 * rng.normal(size=(duplicates.sum(), DIM)).astype(np.float32))
+    texts = [f"chunk {i} from page {page} " + "lorem ipsum " * 40 for i, page in enumerate(pages)]
+    metadatas = [{"url": f"https://example.com/{page}", "scraped_at": 1_700_000_000 + int(page) * 60}
+                 for page in pages]
+    return centroids, pages, vectors, texts, metadatas
+
+
+def redundant(vectors, ids):
+    picked = normalize(vectors[[int(i) for i in ids]])
+    similarity = picked @ picked.T
+    return int((np.triu(similarity, k=1) > 0.95).any(axis=0).sum())
+
+
+def timed(fn, repeats=REPEATS):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return result, statistics.median(times) * 1000, times[int(len(times) * 0.95) - 1] * 1000
+
+
+def main(sizes):
+    queries = build_queries("Software Engineer", "Data Structures", "Use STAR format")
+    print(f"{len(queries)} queries per retrieval, k=8, fetch_k=40\n")
+    print(f"{'chunks':>8} {'mode':<22} {'p50 ms':>8} {'p95 ms':>8} {'redundant':>9} {'ctx chars':>10}")
+    for n in sizes:
+        centroids, pages, vectors, texts, metadatas = synthetic_corpus(n)
+        candidates = ArrayCandidates(vectors, texts, metadatas)
+        embeddings = HashEmbeddings(centroids)
+        retriever = Retriever(candidates, embeddings)
+
+        def baseline():
+            query_vector = embeddings.embed_documents(queries[:1])
+            ids, hit_texts, _, _ = candidates.search(query_vector, 3)[0]
+            return [(doc_id, text) for doc_id, text in zip(ids, hit_texts)]
+
+        hits, p50, p95 = timed(baseline)
+        print(f"{n:>8} {'single query top-3':<22} {p50:>8.2f} {p95:>8.2f} "
+              f"{redundant(vectors, [i for i, _ in hits]):>9} {sum(len(t) for _, t in hits):>10}")
+
+        (context, packed), p50, p95 = timed(lambda: retriever.context(queries))
+        print(f"{n:>8} {'multi-query + MMR':<22} {p50:>8.2f} {p95:>8.2f} "
+              f"{redundant(vectors, [d.id for d in packed]):>9} {len(context):>10}")
+
+        retriever.lambda_mult = 1.0
+        (context, packed), p50, p95 = timed(lambda: retriever.context(queries))
+        print(f"{n:>8} {'multi-query, no MMR':<22} {p50:>8.2f} {p95:>8.2f} "
+              f"{redundant(vectors, [d.id for d in packed]):>9} {len(context):>10}")
+        retriever.lambda_mult = 0.5
+
+        where = metadata_where(scraped_after=1_700_000_000 + PAGES * 30)
+        (context, packed), p50, p95 = timed(lambda: retriever.context(queries, where=where))
+        print(f"{n:>8} {'MMR + scraped_at filter':<22} {p50:>8.2f} {p95:>8.2f} "
+              f"{redundant(vectors, [d.id for d in packed]):>9} {len(context):>10}")
+        print()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 30_000, 100_000])
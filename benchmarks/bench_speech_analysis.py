@@ -0,0 +1,48 @@
+# Two spaCy parses per transcript (count_words_spacy + the old analyze_filler_words with
+# substring counts for phrases) vs transcript.analyze_transcripts (one nlp.pipe pass).
+# Run from the repo root: python -m benchmarks.bench_speech_analysis [num_transcripts] [n_process]
+import os
+import sys
+import time
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+import transcript
+from benchmarks.legacy_fillers import legacy_filler_counts
+from benchmarks.synthetic_transcripts import synthetic_corpus
+
+
+def legacy_analysis(text):
+    words = transcript.count_words_spacy(text)
+    counts = legacy_filler_counts(transcript.nlp(text.lower()))
+    return words, sum(counts.values())
+
+
+def main(count, n_process):
+    corpus = synthetic_corpus(count, words=150)
+
+    start = time.perf_counter()
+    legacy = [legacy_analysis(text) for text in corpus]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = transcript.analyze_transcripts(corpus, n_process=1)
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    multi = transcript.analyze_transcripts(corpus, n_process=n_process)
+    multi_time = time.perf_counter() - start
+
+    assert [r["total_words"] for r in single] == [words for words, _ in legacy]
+    assert single == multi
+    print(f"transcripts:                 {count}")
+    print(f"two parses each (before):    {legacy_time:.2f}s  {count / legacy_time:.1f}/s")
+    print(f"single pass, nlp.pipe:       {single_time:.2f}s  {count / single_time:.1f}/s")
+    print(f"single pass, {n_process} processes:    {multi_time:.2f}s  {count / multi_time:.1f}/s")
+    print(f"fillers before/after:        {sum(f for _, f in legacy)} / {sum(r['total_filler_words'] for r in single)}"
+          " (before double-counts phrases and matches inside words)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 500, int(args[1]) if len(args) > 1 else os.cpu_count() or 2)
@@ -0,0 +1,44 @@
+# speech_metrics.compute_metrics on synthetic Transcribe items for long recordings.
+# Run from the repo root: python -m benchmarks.bench_speech_metrics [hours ...]
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_transcripts import synthetic_transcript
+from speech_metrics import compute_metrics
+
+
+def synthetic_items(hours, wpm=150, seed=0):
+    rng = np.random.default_rng(seed)
+    count = int(hours * 60 * wpm)
+    words = synthetic_transcript(count, seed=seed).split()
+    gaps = rng.exponential(60.0 / wpm * 0.3, count)
+    lengths = rng.uniform(0.15, 0.45, count)
+    starts = np.cumsum(gaps + np.concatenate(([0.0], lengths[:-1])))
+    items = []
+    for word, start, length in zip(words, starts, lengths):
+        core = word.rstrip(".")
+        items.append({"start_time": f"{start:.3f}", "end_time": f"{start + length:.3f}",
+                      "alternatives": [{"confidence": "0.99", "content": core}], "type": "pronunciation"})
+        if core != word:
+            items.append({"alternatives": [{"confidence": "0.0", "content": "."}], "type": "punctuation"})
+    return {"results": {"items": items, "transcripts": [{"transcript": " ".join(words)}]}}
+
+
+def main(hours_list):
+    compute_metrics(synthetic_items(0.01))  # warm up imports
+    print(f"{'hours':>6} {'items':>9} {'seconds':>9} {'items/s':>12}")
+    for hours in hours_list:
+        transcript_json = synthetic_items(hours)
+        count = len(transcript_json["results"]["items"])
+        start = time.perf_counter()
+        metrics = compute_metrics(transcript_json)
+        elapsed = time.perf_counter() - start
+        print(f"{hours:>6} {count:>9} {elapsed:>8.3f}s {count / elapsed:>12,.0f}  "
+              f"(wpm {metrics['wpm']}, {metrics['pauses']['long_pauses']} long pauses, "
+              f"{len(metrics['filler_times'])} fillers)")
+
+
+if __name__ == "__main__":
+    main([float(arg) for arg in sys.argv[1:]] or [0.1, 1, 4])
@@ -0,0 +1,47 @@
+# Time-to-first-card for RAGBot.generate_qa (blocking) vs generate_qa_stream against a
+# local chat-completions stand-in that emits one word every few milliseconds.
+# Run from the repo root: python -m benchmarks.bench_stream
+import json
+import time
+
+from benchmarks.fake_openai import FakeOpenAI
+from rag_bot_clean import RAGBot
+
+DECK_REPLY = json.dumps({"cards": [
+    {
+        "id": i,
+        "question": f"Question {i}: how would you explain concept {i} in an interview?",
+        "answer": f"A detailed answer about concept {i} that covers the reasoning, the trade-offs "
+                  f"and why interviewers care about it in practice.",
+    }
+    for i in range(10)
+]})
+
+
+def make_bot(base_url):
+    bot = RAGBot(api_key="test", base_url=base_url)
+    # Skip retrieval; the benchmark is about the completion, not the vectorstore
+    bot._qa_messages = lambda *args: [{"role": "user", "content": "Generate 10 interview questions."}]
+    return bot
+
+
+def main():
+    with FakeOpenAI(latency=0.3, jitter=0.0, token_latency=0.01, reply=lambda payload: DECK_REPLY) as fake:
+        bot = make_bot(fake.base_url)
+        start = time.perf_counter()
+        blocking = bot.generate_qa()
+        blocking_time = time.perf_counter() - start
+
+        streamed = list(bot.generate_qa_stream())
+        stats = bot.last_stream_stats
+
+    print(f"cards:                     {len(blocking)} blocking, {len(streamed)} streamed")
+    print(f"blocking, first card:      {blocking_time:.2f}s")
+    print(f"streaming, first token:    {stats['time_to_first_token']:.2f}s")
+    print(f"streaming, first card:     {stats['time_to_first_card']:.2f}s")
+    print(f"streaming, all cards:      {stats['total']:.2f}s")
+    print(f"same deck:                 {[(r.question, r.answer) for r in streamed] == list(blocking.items())}")
+
+
+if __name__ == "__main__":
+    main()
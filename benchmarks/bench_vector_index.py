@@ -0,0 +1,84 @@
+# Recall@10 versus query latency for the vector_index backends on one synthetic corpus.
+# Ground truth is exact float32 search. The corpus has no near-duplicate chunks here,
+# since ties between copies would make recall depend on tie-breaking. faiss rows are
+# skipped when faiss is not installed.
+# Run from the repo root: python -m benchmarks.bench_vector_index [chunks]
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_retrieval import synthetic_corpus
+from retrieval import normalize
+from vector_index import build_index
+
+K = 10
+QUERIES = 200
+
+CONFIGS = [
+    ("flat", "float32", {}, [{}]),
+    ("flat", "float16", {}, [{}]),
+    ("flat", "int8", {}, [{}]),
+    ("hnsw", "float16", {"M": 16}, [{"ef_search": 16}, {"ef_search": 64}, {"ef_search": 128}]),
+    ("hnsw", "float16", {"M": 32}, [{"ef_search": 16}, {"ef_search": 64}, {"ef_search": 128}]),
+    ("ivfpq", "int8", {}, [{"nprobe": 4}, {"nprobe": 16}, {"nprobe": 64}]),
+]
+
+
+def ground_truth(vectors, queries):
+    scores = normalize(queries) @ normalize(vectors).T
+    return np.argsort(-scores, axis=1)[:, :K]
+
+
+def measure(index, queries, truth):
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        ids = index.search(query[None, :], K)[0][0]
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(int(i) for i in ids) & set(expected.tolist()))
+    latencies = np.array(latencies) * 1000
+    return hits / (len(queries) * K), np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main(n):
+    try:
+        import faiss  # noqa: F401
+        has_faiss = True
+    except ImportError:
+        has_faiss = False
+        print("faiss is not installed; only the flat backends are measured\n")
+
+    centroids, pages, vectors, texts, metadatas = synthetic_corpus(n, duplicate_share=0.0)
+    rng = np.random.default_rng(1)
+    queries = (centroids[rng.integers(0, len(centroids), QUERIES)]
+               + 0.5 * rng.normal(size=(QUERIES, vectors.shape[1]))).astype(np.float32)
+    truth = ground_truth(vectors, queries)
+
+    print(f"{n} chunks, {vectors.shape[1]} dims, {QUERIES} single-vector queries, recall@{K}\n")
+    print(f"{'backend':<8} {'dtype':<8} {'params':<28} {'build s':>8} {'disk MB':>8} "
+          f"{'recall':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    workdir = tempfile.mkdtemp(prefix="bench_vector_index_")
+    try:
+        for i, (backend, dtype, build_params, search_params) in enumerate(CONFIGS):
+            if backend != "flat" and not has_faiss:
+                continue
+            index = build_index(f"{workdir}/{i}", vectors, texts, metadatas, backend=backend, dtype=dtype,
+                                **build_params)
+            build_seconds = index.config["build_seconds"]
+            for params in search_params:
+                index.set_search_params(**params)
+                recall, p50, p99 = measure(index, queries, truth)
+                label = ", ".join(f"{k}={v}" for k, v in {**index.config.get("params", {}), **params}.items()
+                                  if k in ("M", "ef_search", "nlist", "m", "nprobe"))
+                print(f"{backend:<8} {dtype:<8} {label:<28} {build_seconds:>8.2f} {index.nbytes() / 2**20:>8.1f} "
+                      f"{recall:>7.3f} {p50:>8.2f} {p99:>8.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,87 @@
+import os
+import random
+import threading
+import time
+
+
+class FakeS3Client:
+    # Stands in for boto3's s3 client: upload_file reads the file and sleeps `latency`
+    # plus its size over `bandwidth` (bytes/s); `error_rate` of uploads raise.
+    def __init__(self, latency=0.05, bandwidth=20 * 1024 * 1024, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def upload_file(self, Filename, Bucket, Key, Config=None, **kwargs):
+        size = os.path.getsize(Filename)
+        with self._lock:
+            failed = self.random.random() < self.error_rate
+        time.sleep(self.latency + size / self.bandwidth)
+        if failed:
+            raise ConnectionError(f"Simulated upload failure for s3://{Bucket}/{Key}")
+        with self._lock:
+            self.objects[(Bucket, Key)] = size
+
+
+class FakeTranscribeClient:
+    # Stands in for boto3's transcribe client: jobs finish `duration` seconds after
+    # start_transcription_job (drawn from `durations` when given as a (low, high) range)
+    # and jobs whose names are in `fail`, or a `fail_rate` share of all jobs, end as
+    # FAILED. With transcript_base_url (a LocalWeb), the finished job's transcript URI
+    # can actually be downloaded.
+    def __init__(self, durations=(1.0, 3.0), fail=(), api_latency=0.01, seed=0, fail_rate=0.0,
+                 transcript_base_url=None):
+        self.durations = durations
+        self.fail = set(fail)
+        self.fail_rate = fail_rate
+        self.transcript_base_url = transcript_base_url
+        self.api_latency = api_latency
+        self.random = random.Random(seed)
+        self.jobs = {}
+        self.get_calls = 0
+        self._lock = threading.Lock()
+
+    def start_transcription_job(self, TranscriptionJobName, Media, MediaFormat, LanguageCode, **kwargs):
+        low, high = self.durations
+        with self._lock:
+            duration = self.random.uniform(low, high)
+            if self.random.random() < self.fail_rate:
+                self.fail.add(TranscriptionJobName)
+            self.jobs[TranscriptionJobName] = {
+                "started": time.monotonic(),
+                "duration": duration,
+                "media": Media["MediaFileUri"],
+            }
+        return {"TranscriptionJob": self._describe(TranscriptionJobName)}
+
+    def finished_at(self, job_name):
+        job = self.jobs[job_name]
+        return job["started"] + job["duration"]
+
+    def _describe(self, job_name):
+        job = self.jobs[job_name]
+        done = time.monotonic() >= job["started"] + job["duration"]
+        if not done:
+            status = "IN_PROGRESS"
+        elif job_name in self.fail:
+            status = "FAILED"
+        else:
+            status = "COMPLETED"
+        info = {"TranscriptionJobName": job_name, "TranscriptionJobStatus": status}
+        if status == "COMPLETED":
+            base_url = self.transcript_base_url or "https://example.invalid"
+            info["Transcript"] = {"TranscriptFileUri": f"{base_url}/transcript/{job_name}.json"}
+        if status == "FAILED":
+            info["FailureReason"] = "Simulated failure"
+        return info
+
+    def get_transcription_job(self, TranscriptionJobName):
+        time.sleep(self.api_latency)
+        with self._lock:
+            self.get_calls += 1
+            if TranscriptionJobName not in self.jobs:
+                raise KeyError(f"No such job {TranscriptionJobName}")
+            return {"TranscriptionJob": self._describe(TranscriptionJobName)}
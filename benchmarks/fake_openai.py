@@ -0,0 +1,170 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def default_reply(payload):
+    last = payload["messages"][-1]["content"]
+    return f"Feedback for: {last[:60]}"
+
+
+class FakeOpenAI:
+    # Local stand-in for the chat completions endpoint. Point a client at it with
+    # base_url=fake.base_url (or OPENAI_BASE_URL). Each request sleeps `latency`
+    # (+ up to `jitter`) seconds; `rate_limit_rate` / `error_rate` of requests get
+    # a 429 (with Retry-After) or a 500 instead, and requests whose payload matches
+    # `fail` always get a 500. Streamed replies ("stream": true) are sent as
+    # server-sent events, one word every `token_latency` seconds.
+    def __init__(self, latency=0.2, jitter=0.05, rate_limit_rate=0.0, error_rate=0.0,
+                 reply=default_reply, retry_after=0.05, token_latency=0.0, seed=0, fail=None):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.reply = reply
+        self.fail = fail
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    roll = fake.random.random()
+                    delay = fake.latency + fake.random.random() * fake.jitter
+                try:
+                    time.sleep(delay)
+                    if roll < fake.rate_limit_rate:
+                        self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                        {"Retry-After": str(fake.retry_after)})
+                    elif roll < fake.rate_limit_rate + fake.error_rate or fake.fail and fake.fail(payload):
+                        self._send_json(500, {"error": {"message": "Internal error", "type": "server_error"}})
+                    else:
+                        fake.send_completion(self, payload)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def completion_body(self, payload, content, finish_reason="stop"):
+        prompt_tokens = sum(len(m["content"].split()) for m in payload.get("messages", []))
+        completion_tokens = len(content.split())
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def send_completion(self, handler, payload):
+        content = self.reply(payload)
+        finish_reason = "stop"
+        # One word per token: replies longer than max_tokens are cut off like the real API's
+        words = content.split(" ")
+        if payload.get("max_tokens") and len(words) > payload["max_tokens"]:
+            content, finish_reason = " ".join(words[:payload["max_tokens"]]), "length"
+        if payload.get("stream"):
+            self.send_stream(handler, payload, content, finish_reason)
+        else:
+            time.sleep(self.token_latency * len(content.split()))
+            handler._send_json(200, self.completion_body(payload, content, finish_reason))
+
+    def send_stream(self, handler, payload, content, finish_reason="stop"):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+        created = int(time.time())
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "chatcmpl-fake-stream",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": payload.get("model", "gpt-3.5-turbo"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": None,
+                }],
+            }
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+            time.sleep(self.token_latency)
+        done = {
+            "id": "chatcmpl-fake-stream",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": payload.get("model", "gpt-3.5-turbo"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+        }
+        handler.wfile.write(f"data: {json.dumps(done)}\n\n".encode("utf-8"))
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            # Like the real API: a last chunk with no choices that carries the token counts
+            usage = {**done, "choices": [], "usage": self.completion_body(payload, content)["usage"]}
+            handler.wfile.write(f"data: {json.dumps(usage)}\n\n".encode("utf-8"))
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+
+    def start(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,41 @@
+# The filler detection transcript.py used before filler_matcher, kept as a baseline.
+from collections import Counter
+
+FILLER_WORDS = {
+    'um', 'uh', 'like', 'you know', 'sort of', 'kind of', 'basically',
+    'actually', 'literally', 'just', 'really', 'so', 'well', 'right', 'i mean'
+}
+
+
+def is_probable_filler(token):
+    if token.text == 'just':
+        return token.pos_ == 'ADV'
+    elif token.text == 'like':
+        return token.pos_ == 'INTJ' or (token.pos_ == 'VERB' and token.dep_ == 'discourse')
+    elif token.text == 'so':
+        return token.pos_ == 'ADV' and token.dep_ == 'discourse'
+    elif token.text == 'well':
+        return token.pos_ == 'INTJ'
+    elif token.text == 'right':
+        return token.pos_ in {'INTJ', 'ADV'}
+    elif token.text == 'really':
+        return token.pos_ == 'ADV'
+    elif token.text == 'actually':
+        return token.pos_ == 'ADV'
+    elif token.text in {'um', 'uh'}:
+        return True
+    elif token.text in {'you know', 'i mean', 'sort of', 'kind of', 'basically', 'literally'}:
+        return True
+    return False
+
+
+def legacy_filler_counts(doc):
+    counts = Counter()
+    for token in doc:
+        if token.text in FILLER_WORDS and is_probable_filler(token):
+            counts[token.text] += 1
+    for phrase in (f for f in FILLER_WORDS if " " in f):
+        count = doc.text.count(phrase)
+        if count > 0:
+            counts[phrase] += count
+    return counts
@@ -0,0 +1,101 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic_transcripts import synthetic_transcript
+from transcription_backends import build_transcript_json
+
+PARAGRAPH = (
+    "During the onsite loop the interviewer asked me to design a rate limiter and then "
+    "walk through the trade-offs between a token bucket and a sliding window log. "
+    "We spent most of the time on how the counters would be sharded across regions."
+)
+
+
+def article_html(n, paragraphs=12):
+    body = "\n".join(f"<p>{PARAGRAPH} (page {n}, part {i})</p>" for i in range(paragraphs))
+    return (
+        f"<html><head><title>Interview experience {n}</title></head>"
+        f"<body><nav>Home | Jobs | Login</nav><article><h1>Interview experience {n}</h1>"
+        f"{body}</article><footer>Accept cookies</footer></body></html>"
+    )
+
+
+def transcript_json(name, words=300, words_per_second=2.5):
+    # A finished Transcribe result for a synthetic answer, with evenly spaced words
+    text = synthetic_transcript(words, seed=name)
+    timed = [(word, i / words_per_second, (i + 0.8) / words_per_second) for i, word in enumerate(text.split())]
+    return build_transcript_json(timed, job_name=name)
+
+
+class LocalWeb:
+    # Threaded HTTP stand-in for search hits; /page/<n> serves a synthetic article
+    # after `latency` seconds (plus up to `jitter`), failing with `error_rate` probability.
+    # /transcript/<job>.json serves a Transcribe result, for FakeTranscribeClient.
+    def __init__(self, latency=0.2, jitter=0.1, error_rate=0.0, paragraphs=12, transcript_words=300, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.paragraphs = paragraphs
+        self.transcript_words = transcript_words
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.server = None
+        self.thread = None
+
+    def _handler(self):
+        web = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                web.requests += 1
+                time.sleep(web.latency + web.random.random() * web.jitter)
+                if web.random.random() < web.error_rate:
+                    self.send_error(503)
+                    return
+                n = self.path.rsplit("/", 1)[-1]
+                if self.path.startswith("/transcript/"):
+                    body = json.dumps(transcript_json(n.removesuffix(".json"), web.transcript_words)).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    body = article_html(n, web.paragraphs).encode("utf-8")
+                    content_type = "text/html; charset=utf-8"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def urls(self, count):
+        return [f"{self.base_url}/page/{i}" for i in range(count)]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,30 @@
+import random
+
+FILLERS = ["um", "uh", "like", "you know", "sort of", "kind of", "basically", "actually",
+           "literally", "just", "really", "so", "well", "right", "i mean"]
+SENTENCES = [
+    "I designed the cache so that reads never block on writes",
+    "the interviewer asked how I would shard the counters across regions",
+    "we measured the latency before and after the change",
+    "my approach was to start with a brute force solution and then optimize it",
+    "the hardest part of the project was coordinating with three other teams",
+    "I would use a heap to keep track of the smallest element",
+    "in my last role I owned the deployment pipeline end to end",
+]
+
+
+def synthetic_transcript(words=150, filler_rate=0.08, seed=None):
+    rng = random.Random(seed)
+    out = []
+    while len(out) < words:
+        for word in rng.choice(SENTENCES).split():
+            if rng.random() < filler_rate:
+                out.extend(rng.choice(FILLERS).split())
+            out.append(word)
+        out[-1] += "."
+    text = " ".join(out[:words])
+    return text[0].upper() + text[1:]
+
+
+def synthetic_corpus(count, words=150, filler_rate=0.08, seed=0):
+    return [synthetic_transcript(words, filler_rate, seed + i) for i in range(count)]
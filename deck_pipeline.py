@@ -0,0 +1,235 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from deck_store import DECK_DIR, deck_path, save_deck, slugify
+from vector_store import file_hash
+
+CORPUS_DIR = os.getenv("CORPUS_DIR", "corpora")
+# Each job gets its own Chroma directory so embed workers never write to one database
+PIPELINE_PERSIST_DIR = os.path.join(".cache", "chroma_pipeline")
+DEFAULT_CHECKPOINT = os.path.join(".cache", "pipeline", "checkpoint.json")
+STAGES = ("scrape", "embed", "generate")
+
+
+@dataclass
+class PipelineJob:
+    role: str
+    topic: str = ""
+    prompt: str = None
+    goal: str = None
+    num_results: int = 7
+    timings: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.prompt:
+            self.prompt = f"{self.role} {self.topic} interview experience questions".replace("  ", " ")
+
+    @property
+    def key(self):
+        return f"{slugify(self.role) or '_any'}/{slugify(self.topic) or '_all'}"
+
+    @property
+    def corpus_path(self):
+        return os.path.join(CORPUS_DIR, f"{self.key}.txt")
+
+    @property
+    def persist_dir(self):
+        return os.path.join(PIPELINE_PERSIST_DIR, self.key)
+
+
+def load_manifest(path=None):
+    """Jobs from a JSON manifest, or one job per role in roles.ROLES.
+
+    The manifest is a list (or {"jobs": [...]}) of objects with "role" and optional
+    "topic", "prompt", "goal" and "num_results".
+    """
+    if path is None:
+        from roles import ROLES
+        return [PipelineJob(role) for role in ROLES]
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data["jobs"] if isinstance(data, dict) else data
+    return [PipelineJob(**entry) for entry in entries]
+
+
+class Checkpoint:
+    # Completed stages per job with what they produced; rewritten atomically after
+    # every stage so an interrupted run resumes where it stopped
+    def __init__(self, path=DEFAULT_CHECKPOINT):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self.state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.state = {}
+
+    def get(self, job, stage):
+        return self.state.get(job.key, {}).get(stage)
+
+    def mark(self, job, stage, **info):
+        self.state.setdefault(job.key, {})[stage] = {"finished_at": time.time(), **info}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def clear(self, job):
+        self.state.pop(job.key, None)
+
+
+def scrape_stage(job, cache=None):
+    from dedup import DedupReport
+    from scraper import search_pages, write_corpus
+
+    results = search_pages(job.prompt, num_results=job.num_results, cache=cache)
+    os.makedirs(os.path.dirname(job.corpus_path), exist_ok=True)
+    report = DedupReport()
+    pages = write_corpus(results, job.corpus_path, report=report)
+    if not pages:
+        raise RuntimeError(f"No pages could be scraped for {job.prompt!r}")
+    return {"pages": len(pages), "bytes_removed": report.bytes_removed, "source_hash": file_hash(job.corpus_path)}
+
+
+def embed_stage(corpus_path, persist_dir):
+    # Runs in a worker process: chunk and embed the corpus into its persisted collection
+    from rag_bot_clean import RAGBot
+
+    bot = RAGBot(data_path=corpus_path, persist_dir=persist_dir)
+    bot.build_vectorstore()
+    return {"source_hash": file_hash(corpus_path), "embedding": bot.embeddings.stats()}
+
+
+def generate_stage(job):
+    from rag_bot_clean import get_bot
+
+    # The collection was synced by embed_stage, so this opens it without re-embedding
+    source_hash = file_hash(job.corpus_path)
+    bot = get_bot(job.corpus_path, job.persist_dir)
+    records = bot.generate_qa_records(job.role, job.topic, job.goal)
+    if not records:
+        raise RuntimeError("No cards were generated")
+    cards = [{"question": record.question, "answer": record.answer, "feedback": ""} for record in records]
+    return {"cards": len(cards), "deck": save_deck(cards, job.role, job.topic),
+            "source_hash": source_hash}
+
+
+def _timed(stage_fn, *args):
+    # Stage time measured where the stage runs, so queueing for a worker is not counted
+    start = time.perf_counter()
+    info = stage_fn(*args)
+    return info, round(time.perf_counter() - start, 2)
+
+
+def _done(checkpoint, job, stage):
+    entry = checkpoint.get(job, stage)
+    if entry is None:
+        return False
+    if stage == "scrape":
+        return os.path.exists(job.corpus_path)
+    # Embeddings and decks are still valid only if they came from the current corpus
+    if not os.path.exists(job.corpus_path) or entry.get("source_hash") != file_hash(job.corpus_path):
+        return False
+    if stage == "embed":
+        return True
+    return os.path.exists(entry.get("deck") or deck_path(job.role, job.topic, DECK_DIR))
+
+
+def run_pipeline(jobs, stages=STAGES, checkpoint=None, scrape_workers=2, embed_workers=2, generate_workers=4,
+                 force=False):
+    """Run scrape -> embed -> generate for every job, with the stages overlapping.
+
+    Each stage has its own pool: scraping and generation are network-bound and use
+    threads, embedding is CPU-bound and uses worker processes. A job moves to the
+    next pool as soon as its current stage finishes, so one role is being embedded
+    while the next is still scraping and a third is generating. Stages already in
+    the checkpoint are skipped unless force is set. Returns {job key: outcome}.
+    """
+    from page_cache import PageCache
+
+    checkpoint = checkpoint or Checkpoint()
+    if force:
+        for job in jobs:
+            checkpoint.clear(job)
+    page_cache = PageCache()
+    start = time.perf_counter()
+    outcomes = {}
+    pools = {
+        "scrape": ThreadPoolExecutor(scrape_workers, thread_name_prefix="scrape"),
+        # spawn, since forking a process that is running scrape threads is unsafe
+        "embed": ProcessPoolExecutor(embed_workers, mp_context=multiprocessing.get_context("spawn")),
+        "generate": ThreadPoolExecutor(generate_workers, thread_name_prefix="generate"),
+    }
+    running = {}
+
+    def advance(job, after=None):
+        # Submit the job's next stage that is requested and not already checkpointed
+        remaining = STAGES[STAGES.index(after) + 1:] if after else STAGES
+        for stage in remaining:
+            if stage not in stages:
+                continue
+            if _done(checkpoint, job, stage):
+                print(f"[{job.key}] {stage}: already done, skipping")
+                continue
+            if stage == "scrape":
+                future = pools[stage].submit(_timed, scrape_stage, job, page_cache)
+            elif stage == "embed":
+                future = pools[stage].submit(_timed, embed_stage, job.corpus_path, job.persist_dir)
+            else:
+                future = pools[stage].submit(_timed, generate_stage, job)
+            running[future] = (job, stage)
+            return
+        outcomes[job.key] = {"status": "done", "timings": job.timings}
+
+    try:
+        for job in jobs:
+            advance(job)
+        while running:
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                job, stage = running.pop(future)
+                try:
+                    info, job.timings[stage] = future.result()
+                except Exception as e:
+                    print(f"[{job.key}] {stage} failed: {e}")
+                    outcomes[job.key] = {"status": "failed", "stage": stage, "error": str(e),
+                                         "timings": job.timings}
+                    continue
+                checkpoint.mark(job, stage, **info)
+                print(f"[{job.key}] {stage} done in {job.timings[stage]}s: "
+                      f"{ {k: v for k, v in info.items() if k != 'embedding'} }")
+                advance(job, stage)
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    stage_seconds = sum(sum(o["timings"].values()) for o in outcomes.values())
+    done = sum(o["status"] == "done" for o in outcomes.values())
+    print(f"\n{done}/{len(jobs)} jobs done in {elapsed:.1f}s "
+          f"({stage_seconds:.1f}s of stage time, {stage_seconds / elapsed if elapsed else 0:.1f}x faster than running them serially)")
+    return outcomes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape, embed and generate a flashcard deck per role/topic.")
+    parser.add_argument("--manifest", help="JSON list of {role, topic, prompt, goal, num_results}; "
+                                           "defaults to one job per role in roles.py")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of " + ",".join(STAGES))
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--scrape-workers", type=int, default=2)
+    parser.add_argument("--embed-workers", type=int, default=2)
+    parser.add_argument("--generate-workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="ignore the checkpoint and redo every stage")
+    args = parser.parse_args()
+
+    stages = tuple(stage.strip() for stage in args.stages.split(",") if stage.strip())
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    run_pipeline(load_manifest(args.manifest), stages, Checkpoint(args.checkpoint), args.scrape_workers,
+                 args.embed_workers, args.generate_workers, args.force)
@@ -0,0 +1,109 @@
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+from qa_parser import qa_id
+
+DECK_DIR = os.getenv("DECK_DIR", "decks")
+# The deck every role falls back to when nothing more specific has been generated
+DEFAULT_DECK = "interview_combined_20250517_190401.json"
+
+
+def slugify(value):
+    return re.sub(r"[^a-z0-9]+", "-", (value or "").lower()).strip("-")
+
+
+def deck_path(role=None, topic=None, deck_dir=DECK_DIR):
+    # decks/<role>/<topic>.json, or decks/<role>/_all.json for a role-wide deck
+    return os.path.join(deck_dir, slugify(role) or "_any", f"{slugify(topic) or '_all'}.json")
+
+
+@dataclass
+class Deck:
+    path: str
+    cards: list
+    role: str = None
+    topic: str = None
+    index: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if not self.index:
+            self.index = {card["id"]: position for position, card in enumerate(self.cards)}
+
+    def __len__(self):
+        return len(self.cards)
+
+    def find(self, question):
+        """Return the card for a question (matched case- and whitespace-insensitively) or None."""
+        position = self.index.get(qa_id(question))
+        return None if position is None else self.cards[position]
+
+
+def _card(question, answer, feedback=""):
+    return {"id": qa_id(question), "question": question, "answer": answer, "feedback": feedback}
+
+
+def parse_deck(data):
+    """Normalise the deck formats the app has written into a list of cards.
+
+    Accepts the combined feedback list ([{"question", "ai_answer", "feedback"}]),
+    plain card lists ([{"question", "answer"}]), {"cards": [...]} with optional role
+    and topic, and the {"question": "answer"} dictionary the Q&A generator used to emit.
+    """
+    meta = {}
+    if isinstance(data, dict) and "cards" in data:
+        meta = {"role": data.get("role"), "topic": data.get("topic")}
+        data = data["cards"]
+    if isinstance(data, dict):
+        items = [{"question": q, "answer": a} for q, a in data.items()]
+    else:
+        items = data
+
+    cards = []
+    seen = set()
+    for item in items:
+        question = (item.get("question") or "").strip()
+        if not question:
+            continue
+        card = _card(question, item.get("answer", item.get("ai_answer", "")), item.get("feedback", ""))
+        if card["id"] in seen:
+            continue
+        seen.add(card["id"])
+        cards.append(card)
+    return cards, meta
+
+
+def load_deck(path):
+    with open(path, "r", encoding="utf-8") as f:
+        cards, meta = parse_deck(json.load(f))
+    return Deck(path, cards, **meta)
+
+
+def save_deck(cards, role=None, topic=None, deck_dir=DECK_DIR):
+    path = deck_path(role, topic, deck_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {"role": role, "topic": topic,
+               "cards": [{k: card.get(k, "") for k in ("question", "answer", "feedback")} for card in cards]}
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=4)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def resolve_deck(role=None, topic=None, deck_dir=DECK_DIR, default=DEFAULT_DECK):
+    """Path of the most specific deck for role/topic: exact, then role-wide, then the default.
+
+    Decks live at fixed paths derived from the role and topic, so resolving one is a few
+    stat calls no matter how many decks exist.
+    """
+    for candidate in (deck_path(role, topic, deck_dir), deck_path(role, None, deck_dir)):
+        if os.path.exists(candidate):
+            return candidate
+    return default if default and os.path.exists(default) else None
+
+
+def deck_version(path):
+    # Cache key for a deck file; a rewrite changes the mtime and usually the size
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,194 @@
+import math
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_WORDS = 5
+SIMILARITY_THRESHOLD = 0.8
+# A line is navigation, banner or footer text when it is on at least this share of the
+# pages (and never fewer than BOILERPLATE_MIN_PAGES) and looks like page furniture
+BOILERPLATE_MIN_SHARE = 0.3
+BOILERPLATE_MIN_PAGES = 3
+BOILERPLATE_MAX_LINE = 200
+# Header and footer region: this many non-empty lines at each end of a page
+BOILERPLATE_EDGE_LINES = 3
+_WORD = re.compile(r"\w+")
+_TEMPLATE_MARK = re.compile(r"[|©»•·]")
+
+
+@dataclass
+class DedupReport:
+    pages_in: int = 0
+    pages_removed: int = 0
+    boilerplate_lines: int = 0
+    bytes_in: int = 0
+    bytes_removed: int = 0
+    chunks_in: int = 0
+    chunks_removed: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+    def summary(self):
+        share = self.bytes_removed / self.bytes_in * 100 if self.bytes_in else 0.0
+        return (f"removed {self.pages_removed}/{self.pages_in} near-duplicate pages, "
+                f"{self.boilerplate_lines} boilerplate lines, {self.bytes_removed:,} of {self.bytes_in:,} bytes "
+                f"({share:.1f}%), {self.chunks_removed}/{self.chunks_in} near-duplicate chunks")
+
+
+def _normalize_line(line):
+    return " ".join(line.lower().split())
+
+
+class MinHashLSH:
+    """Near-duplicate filter over word shingles.
+
+    Each text becomes a MinHash signature of num_perm values computed with numpy over
+    its shingle hashes, and is bucketed by `bands` bands of that signature. A text is
+    a duplicate if a previously added text shares a bucket with it and their
+    signatures agree on at least `threshold` of positions (estimated Jaccard
+    similarity). Work is linear in the total number of shingles plus the size of the
+    buckets a text lands in.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=SIMILARITY_THRESHOLD, shingle_words=SHINGLE_WORDS,
+                 seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, arithmetic mod 2**64
+        self._a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_words = shingle_words
+        self._buckets = [dict() for _ in range(bands)]
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._count = 0
+
+    def signature(self, text):
+        words = _WORD.findall(text.lower())
+        n = self.shingle_words
+        shingles = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        with np.errstate(over="ignore"):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def find(self, signature):
+        """Index of an added text similar to signature, or None."""
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        if not candidates:
+            return None
+        # Compare against every candidate at once rather than one signature at a time
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        agreement = (self._signatures[candidates] == signature).mean(axis=1)
+        best = int(agreement.argmax())
+        return int(candidates[best]) if agreement[best] >= self.threshold else None
+
+    def add(self, signature):
+        index = self._count
+        if index == len(self._signatures):
+            grown = np.empty((max(64, 2 * index), self._signatures.shape[1]), dtype=np.uint32)
+            grown[:index] = self._signatures
+            self._signatures = grown
+        self._signatures[index] = signature
+        self._count += 1
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(index)
+        return index
+
+    def is_duplicate(self, text):
+        """True if text nearly duplicates something added before; otherwise adds it."""
+        signature = self.signature(text)
+        if self.find(signature) is not None:
+            return True
+        self.add(signature)
+        return False
+
+
+def strip_boilerplate(pages, min_share=BOILERPLATE_MIN_SHARE, min_pages=BOILERPLATE_MIN_PAGES,
+                      max_line=BOILERPLATE_MAX_LINE, edge_lines=BOILERPLATE_EDGE_LINES):
+    """Drop template lines repeated across pages; returns (pages, lines removed).
+
+    A line goes when it is on at least min_share of the pages (and min_pages), is
+    short, and looks like page furniture: it has a separator or copyright mark, or it
+    sits in the first or last edge_lines lines on most pages that carry it. Questions
+    and sentences that recur inside article bodies, such as a common interview
+    question, are kept.
+    """
+    counts = Counter()
+    edge_counts = Counter()
+    for page in pages:
+        lines = [_normalize_line(line) for line in page.splitlines() if line.strip()]
+        counts.update(set(lines))
+        edge_counts.update(set(lines[:edge_lines] + lines[-edge_lines:]))
+    threshold = max(min_pages, math.ceil(min_share * len(pages)))
+    boilerplate = {
+        line for line, count in counts.items()
+        if count >= threshold and len(line) <= max_line and not line.endswith("?")
+        and (_TEMPLATE_MARK.search(line) or 2 * edge_counts[line] >= count)
+    }
+    if not boilerplate:
+        return list(pages), 0
+    cleaned = []
+    removed = 0
+    for page in pages:
+        kept = []
+        for line in page.splitlines():
+            if line.strip() and _normalize_line(line) in boilerplate:
+                removed += 1
+            else:
+                kept.append(line)
+        cleaned.append(re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip())
+    return cleaned, removed
+
+
+def clean_pages(pages, report=None, **lsh_kwargs):
+    """Drop pages that nearly duplicate an earlier page (mirrors, syndicated copies),
+    then strip boilerplate lines repeated across the pages that are left.
+
+    Mirrors go first so their shared article text is not mistaken for boilerplate.
+    Returns (texts, report) with one text per input page, None where a page was dropped.
+    """
+    report = report if report is not None else DedupReport()
+    bytes_in = sum(len(page.encode("utf-8")) for page in pages)
+
+    lsh = MinHashLSH(**lsh_kwargs)
+    survivors = []
+    for index, page in enumerate(pages):
+        if page.strip() and not lsh.is_duplicate(page):
+            survivors.append(index)
+        else:
+            report.pages_removed += bool(page.strip())
+    cleaned, boilerplate_lines = strip_boilerplate([pages[i] for i in survivors])
+
+    kept = [None] * len(pages)
+    for index, page in zip(survivors, cleaned):
+        kept[index] = page or None
+    report.pages_in += len(pages)
+    report.boilerplate_lines += boilerplate_lines
+    report.bytes_in += bytes_in
+    report.bytes_removed += bytes_in - sum(len(page.encode("utf-8")) for page in kept if page)
+    return kept, report
+
+
+def dedup_chunks(texts, report=None, **lsh_kwargs):
+    """Indices of texts to keep, dropping near-duplicates of earlier chunks."""
+    report = report if report is not None else DedupReport()
+    lsh = MinHashLSH(**lsh_kwargs)
+    keep = [i for i, text in enumerate(texts) if not lsh.is_duplicate(text)]
+    report.chunks_in += len(texts)
+    report.chunks_removed += len(texts) - len(keep)
+    return keep, report
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from tracing import span
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "embeddings.db")
+# HuggingFaceEmbeddings' default; EMBEDDING_MODEL=sentence-transformers/all-MiniLM-L6-v2
+# is about five times faster on CPU at some cost in retrieval quality
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
+# "torch", or "onnx" / "openvino" to run an exported graph through sentence-transformers
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Worker processes for large jobs; 0 encodes on the calling thread
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "0"))
+# Below this many uncached texts the worker pool costs more than it saves
+POOL_MIN_TEXTS = 512
+CACHE_LOOKUP_BATCH = 500
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingService(Embeddings):
+    """Sentence-transformer embeddings with a disk cache keyed by text hash.
+
+    The model loads on first use and is shared by everything holding this service
+    (see get_embedding_service). Only texts missing from the cache are encoded, in
+    batches of batch_size, across `workers` CPU processes when there are enough of
+    them. stats() reports how many texts were served from the cache and the encoding
+    throughput in chunks per second.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, backend=EMBEDDING_BACKEND, batch_size=EMBEDDING_BATCH_SIZE,
+                 workers=EMBEDDING_WORKERS, cache_path=DEFAULT_CACHE_PATH, normalize=False):
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_size = batch_size
+        self.workers = workers
+        self.normalize = normalize
+        self.model_key = f"{model_name}|{backend}|{int(normalize)}"
+        self._model = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self._stats = {"requested": 0, "cache_hits": 0, "encoded": 0, "encode_seconds": 0.0}
+        self._db = None
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(cache_path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )"""
+            )
+            self._db.commit()
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                start = time.perf_counter()
+                self._model = SentenceTransformer(self.model_name, device="cpu", backend=self.backend)
+                print(f"Loaded embedding model {self.model_name} ({self.backend}) "
+                      f"in {time.perf_counter() - start:.1f}s")
+            return self._model
+
+    def _cached(self, keys):
+        found = {}
+        if self._db is None:
+            return found
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique), CACHE_LOOKUP_BATCH):
+                batch = unique[i:i + CACHE_LOOKUP_BATCH]
+                rows = self._db.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN "
+                    f"({', '.join('?' for _ in batch)})",
+                    [self.model_key, *batch],
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+        return found
+
+    def _store(self, keys, vectors):
+        if self._db is None:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(self.model_key, key, np.asarray(vector, dtype=np.float32).tobytes())
+                 for key, vector in zip(keys, vectors)],
+            )
+
+    def _encode(self, texts):
+        model = self.model
+        start = time.perf_counter()
+        with span("embed.encode", texts=len(texts)):
+            if self.workers > 1 and len(texts) >= POOL_MIN_TEXTS:
+                if self._pool is None:
+                    self._pool = model.start_multi_process_pool(["cpu"] * self.workers)
+                vectors = model.encode_multi_process(
+                    texts, self._pool, batch_size=self.batch_size,
+                    chunk_size=max(self.batch_size, len(texts) // (self.workers * 4)),
+                    normalize_embeddings=self.normalize,
+                )
+            else:
+                vectors = model.encode(texts, batch_size=self.batch_size, normalize_embeddings=self.normalize,
+                                       convert_to_numpy=True, show_progress_bar=False)
+        with self._lock:
+            self._stats["encoded"] += len(texts)
+            self._stats["encode_seconds"] += time.perf_counter() - start
+        return np.asarray(vectors, dtype=np.float32)
+
+    def embed_array(self, texts):
+        """Embed texts as a float32 matrix, encoding only those not already cached."""
+        texts = list(texts)
+        keys = [text_key(text) for text in texts]
+        found = self._cached(keys)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self._encode(list(missing.values()))
+            self._store(list(missing), vectors)
+            found.update(zip(missing, vectors))
+        with self._lock:
+            self._stats["requested"] += len(texts)
+            self._stats["cache_hits"] += len(texts) - len(missing)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def embed_documents(self, texts):
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text):
+        return self.embed_array([text])[0].tolist()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        seconds = stats["encode_seconds"]
+        stats["encode_seconds"] = round(seconds, 3)
+        stats["chunks_per_second"] = round(stats["encoded"] / seconds, 1) if seconds else None
+        return stats
+
+    def close(self):
+        if self._pool is not None:
+            self._model.stop_multi_process_pool(self._pool)
+            self._pool = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name=EMBEDDING_MODEL, backend=EMBEDDING_BACKEND, **kwargs):
+    # One service, and so one copy of the model weights, per (model, backend) per process
+    key = (model_name, backend)
+    with _services_lock:
+        if key not in _services:
+            _services[key] = EmbeddingService(model_name, backend, **kwargs)
+        return _services[key]
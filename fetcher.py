@@ -0,0 +1,142 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import aiohttp
+from newspaper import Article, Config
+
+from tracing import traced, tracer
+
+# Defaults sized for a single prompt's worth of search hits; raise max_workers
+# when fanning out to hundreds of URLs.
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 15
+DEFAULT_PARSE_WORKERS = 4
+
+
+@dataclass
+class FetchResult:
+    index: int
+    url: str
+    html: str = ""
+    text: str = ""
+    error: str = None
+    elapsed: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+@traced("scrape.parse")
+def parse_html(url, html):
+    # Same extraction newspaper does after Article.download(), minus the request
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+    return article.text.strip()
+
+
+async def _fetch_one(session, semaphore, host_limits, per_host, loop, parse_pool, cache, index, url):
+    start = time.perf_counter()
+    cached_page = cache.get(url) if cache is not None else None
+    if cached_page is not None and cached_page.fresh:
+        cache.record_hit(cached_page)
+        tracer.record("scrape.fetch", time.perf_counter() - start, url=url, cached=True)
+        return FetchResult(index, url, html=cached_page.html, text=cached_page.text,
+                           elapsed=time.perf_counter() - start, cached=True)
+    if cache is not None:
+        # Counted at lookup so failed and revalidated fetches show up in the hit rate too
+        cache.record_miss()
+
+    host = urlsplit(url).netloc.lower()
+    if host not in host_limits:
+        host_limits[host] = asyncio.Semaphore(per_host)
+    # Queue per host before the request starts so the timeout only covers the request itself
+    async with semaphore, host_limits[host]:
+        # scrape.fetch spans start here, so they measure the request rather than the queue
+        request_start = time.perf_counter()
+        try:
+            request_headers = cached_page.validators() if cached_page is not None else None
+            async with session.get(url, headers=request_headers) as resp:
+                if resp.status == 304 and cached_page is not None:
+                    cache.mark_revalidated(cached_page)
+                    tracer.record("scrape.fetch", time.perf_counter() - request_start, url=url, cached=True)
+                    return FetchResult(index, url, html=cached_page.html, text=cached_page.text,
+                                       elapsed=time.perf_counter() - start, cached=True)
+                if resp.status >= 400:
+                    raise aiohttp.ClientResponseError(
+                        resp.request_info, resp.history, status=resp.status, message=resp.reason
+                    )
+                html = await resp.text(errors="replace")
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+            # Download only; parsing is timed separately as scrape.parse
+            tracer.record("scrape.fetch", time.perf_counter() - request_start, url=url, cached=False)
+            text = await loop.run_in_executor(parse_pool, parse_html, url, html)
+            elapsed = time.perf_counter() - start
+            if cache is not None:
+                cache.put(url, html, text, etag=etag, last_modified=last_modified, fetch_seconds=elapsed)
+            return FetchResult(index, url, html=html, text=text, elapsed=elapsed)
+        except Exception as e:
+            tracer.record("scrape.fetch", time.perf_counter() - request_start, url=url, error=type(e).__name__)
+            return FetchResult(index, url, error=str(e) or type(e).__name__,
+                               elapsed=time.perf_counter() - start)
+
+
+async def stream_pages(urls, max_workers=DEFAULT_MAX_WORKERS, per_host=DEFAULT_PER_HOST,
+                       timeout=DEFAULT_TIMEOUT, parse_workers=DEFAULT_PARSE_WORKERS, cache=None):
+    """Yield a FetchResult for each URL as soon as it has been downloaded and parsed.
+
+    With a PageCache, fresh entries are served without touching the network or the
+    parser, and stale ones are revalidated with their ETag/Last-Modified.
+    """
+    urls = list(urls)
+    if not urls:
+        return
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_workers)
+    host_limits = {}
+    # One pooled connector for the whole batch so repeated hosts reuse keep-alive sockets
+    connector = aiohttp.TCPConnector(limit=max_workers, limit_per_host=per_host, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    headers = {"User-Agent": Config().browser_user_agent}
+
+    with ThreadPoolExecutor(max_workers=parse_workers) as parse_pool:
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                         headers=headers) as session:
+            tasks = [
+                asyncio.create_task(_fetch_one(session, semaphore, host_limits, per_host, loop,
+                                               parse_pool, cache, i, url))
+                for i, url in enumerate(urls)
+            ]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+
+async def fetch_pages(urls, on_page=None, **kwargs):
+    results = [None] * len(urls)
+    async for result in stream_pages(urls, **kwargs):
+        results[result.index] = result
+        if on_page is not None:
+            on_page(result)
+    return results
+
+
+def fetch_all(urls, on_page=None, **kwargs):
+    """Fetch and parse every URL concurrently; results come back in input order.
+
+    on_page is called with each FetchResult in completion order, so callers can
+    start consuming text before the slowest page has arrived.
+    """
+    urls = list(urls)
+    return asyncio.run(fetch_pages(urls, on_page=on_page, **kwargs))
@@ -0,0 +1,123 @@
+import json
+import os
+from collections import Counter
+
+from spacy.matcher import PhraseMatcher
+
+FILLER_LANGUAGE = os.getenv("FILLER_LANGUAGE", "en")
+FILLER_LEXICON_PATH = os.getenv("FILLER_LEXICON_PATH")
+# Lexicon conditions are POS/dependency labels, so the tagger and parser must match the
+# lexicon's language; SPACY_MODEL overrides the pipeline picked for FILLER_LANGUAGE
+SPACY_MODEL = os.getenv("SPACY_MODEL")
+SPACY_MODELS = {
+    "en": "en_core_web_sm",
+    "de": "de_core_news_sm",
+    "es": "es_core_news_sm",
+    "fr": "fr_core_news_sm",
+    "it": "it_core_news_sm",
+    "nl": "nl_core_news_sm",
+    "pt": "pt_core_news_sm",
+}
+
+# Each entry is a filler phrase plus optional "when" alternatives. An alternative lists
+# the POS tags and/or dependency labels the phrase's first token must have; the
+# phrase counts if any alternative holds, or always when there is no "when".
+DEFAULT_LEXICONS = {
+    "en": [
+        {"phrase": "um"},
+        {"phrase": "uh"},
+        {"phrase": "basically"},
+        {"phrase": "literally"},
+        {"phrase": "you know"},
+        {"phrase": "i mean"},
+        {"phrase": "sort of"},
+        {"phrase": "kind of"},
+        {"phrase": "just", "when": [{"pos": ["ADV"]}]},
+        {"phrase": "like", "when": [{"pos": ["INTJ"]}, {"pos": ["VERB"], "dep": ["discourse"]}]},
+        {"phrase": "so", "when": [{"pos": ["ADV"], "dep": ["discourse"]}]},
+        {"phrase": "well", "when": [{"pos": ["INTJ"]}]},
+        {"phrase": "right", "when": [{"pos": ["INTJ", "ADV"]}]},
+        {"phrase": "really", "when": [{"pos": ["ADV"]}]},
+        {"phrase": "actually", "when": [{"pos": ["ADV"]}]},
+    ],
+}
+
+
+def load_lexicon(language=FILLER_LANGUAGE, path=FILLER_LEXICON_PATH):
+    """Return the filler lexicon from a JSON file (a list of entries) or the built-in one."""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if language not in DEFAULT_LEXICONS:
+        raise ValueError(f"No built-in filler lexicon for {language!r}; pass a lexicon file")
+    return DEFAULT_LEXICONS[language]
+
+
+def load_pipeline(language=FILLER_LANGUAGE, model=SPACY_MODEL):
+    """Load the spaCy pipeline for language, with only the components filler detection reads."""
+    import spacy
+
+    model = model or SPACY_MODELS.get(language)
+    if model is None:
+        raise ValueError(f"No spaCy pipeline known for {language!r}; set SPACY_MODEL")
+    # Filler detection needs POS tags and dependencies only; named entities and lemmas are never read
+    nlp = spacy.load(model, disable=["ner", "lemmatizer"])
+    if nlp.lang != language:
+        raise ValueError(f"spaCy pipeline {model!r} is for {nlp.lang!r}, not the {language!r} filler lexicon")
+    return nlp
+
+
+def _conditions(entry, strings):
+    # None means the phrase always counts; otherwise (pos ids, dep ids) alternatives,
+    # stored as the integer ids spaCy uses internally so checks avoid string lookups
+    conditions = []
+    for condition in entry.get("when") or []:
+        pos = frozenset(strings[label] for label in condition.get("pos") or ()) or None
+        dep = frozenset(strings[label] for label in condition.get("dep") or ()) or None
+        conditions.append((pos, dep))
+    return conditions or None
+
+
+class FillerMatcher:
+    # Candidates come from one PhraseMatcher pass over the lowercased tokens; only those
+    # hits are checked against the lexicon's POS/dependency conditions. Overlapping hits
+    # are resolved longest-first in a single left-to-right sweep, so "you know" is one
+    # filler and its tokens are not counted again on their own.
+    def __init__(self, nlp, lexicon):
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        self.phrases = []
+        self._conditions = {}
+        for entry in lexicon:
+            phrase = " ".join(entry["phrase"].lower().split())
+            self.matcher.add(phrase, [nlp.make_doc(phrase)])
+            self.phrases.append(phrase)
+            self._conditions[nlp.vocab.strings[phrase]] = (phrase, _conditions(entry, nlp.vocab.strings))
+
+    def matches(self, doc):
+        """Return accepted, non-overlapping (phrase, start, end) token offsets in order."""
+        hits = []
+        tags = None
+        for match_id, start, end in self.matcher(doc):
+            phrase, conditions = self._conditions[match_id]
+            if conditions is not None:
+                if tags is None:
+                    tags = doc.to_array(["POS", "DEP"]).tolist()
+                pos, dep = tags[start]
+                if not any((p is None or pos in p) and (d is None or dep in d) for p, d in conditions):
+                    continue
+            hits.append((start, start - end, phrase))
+        hits.sort()
+
+        accepted = []
+        covered_to = 0
+        for start, neg_length, phrase in hits:
+            if start >= covered_to:
+                covered_to = start - neg_length
+                accepted.append((phrase, start, covered_to))
+        return accepted
+
+    def spans(self, doc):
+        return [(phrase, doc[start:end]) for phrase, start, end in self.matches(doc)]
+
+    def count(self, doc):
+        return Counter(phrase for phrase, _, _ in self.matches(doc))
@@ -0,0 +1,196 @@
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from tracing import span, tracer
+
+DEFAULT_DB_PATH = os.path.join(".cache", "jobs.db")
+DEFAULT_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Running tasks allowed per session, so one user cannot occupy every worker
+DEFAULT_MAX_PER_SESSION = int(os.getenv("JOB_MAX_PER_SESSION", "1"))
+RESULT_TTL = 7 * 24 * 60 * 60
+
+# Handlers are "module:function" strings resolved on first use, so the page that
+# submits work never pays for importing spaCy or boto3 itself.
+HANDLERS = {
+    "transcribe": "transcript:run_transcription",
+}
+
+TERMINAL_STATES = {"done", "failed"}
+
+
+class JobQueue:
+    """Persistent task queue served by a pool of worker threads.
+
+    Tasks and their results live in SQLite, so a page rerun (or a restart) can look
+    up a session's tasks at any time without waiting on the work itself. Workers take
+    the oldest queued task whose session is below max_per_session running tasks,
+    which keeps concurrent users from starving each other.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, workers=DEFAULT_WORKERS, max_per_session=DEFAULT_MAX_PER_SESSION,
+                 handlers=None, poll_interval=0.5):
+        self.db_path = db_path
+        self.max_per_session = max_per_session
+        self.handlers = dict(HANDLERS, **(handlers or {}))
+        self.poll_interval = poll_interval
+        self._resolved = {}
+        self._claim_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )"""
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_state_created ON tasks(state, created_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_session ON tasks(session_id, created_at)")
+            # Anything still "running" was interrupted by a previous process
+            db.execute("UPDATE tasks SET state = 'queued', started_at = NULL WHERE state = 'running'")
+            db.execute("DELETE FROM tasks WHERE finished_at IS NOT NULL AND finished_at < ?",
+                       (time.time() - RESULT_TTL,))
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _connect(self):
+        # One short-lived connection per call; WAL lets readers and the writer overlap
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return _Connection(db)
+
+    def submit(self, session_id, kind, **payload):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown task kind {kind!r}; choose from {sorted(self.handlers)}")
+        task_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO tasks (task_id, session_id, kind, payload, state, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (task_id, session_id, kind, json.dumps(payload), time.time()),
+            )
+        self._wakeup.set()
+        return task_id
+
+    def get(self, task_id):
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return _task(row) if row else None
+
+    def session_tasks(self, session_id, kind=None):
+        query = "SELECT * FROM tasks WHERE session_id = ?"
+        params = [session_id]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        with self._connect() as db:
+            rows = db.execute(query + " ORDER BY created_at", params).fetchall()
+        return [_task(row) for row in rows]
+
+    def position(self, task_id):
+        # Number of queued tasks ahead of this one, for "waiting" messages
+        with self._connect() as db:
+            row = db.execute(
+                """SELECT COUNT(*) FROM tasks WHERE state = 'queued'
+                   AND created_at < (SELECT created_at FROM tasks WHERE task_id = ?)""",
+                (task_id,),
+            ).fetchone()
+        return row[0]
+
+    def stats(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def shutdown(self, wait=True):
+        self._stopping.set()
+        self._wakeup.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _claim(self):
+        with self._claim_lock, self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                """SELECT task_id, kind, payload, created_at FROM tasks AS t
+                   WHERE state = 'queued'
+                   AND (SELECT COUNT(*) FROM tasks WHERE session_id = t.session_id AND state = 'running') < ?
+                   ORDER BY created_at LIMIT 1""",
+                (self.max_per_session,),
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE tasks SET state = 'running', started_at = ? WHERE task_id = ?",
+                           (time.time(), row["task_id"]))
+            db.execute("COMMIT")
+        return row
+
+    def _finish(self, task_id, result=None, error=None):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE tasks SET state = ?, result = ?, error = ?, finished_at = ? WHERE task_id = ?",
+                ("failed" if error else "done", None if error else json.dumps(result), error, time.time(), task_id),
+            )
+        # A finished task may unblock another task from the same session
+        self._wakeup.set()
+
+    def _handler(self, kind):
+        if kind not in self._resolved:
+            module_name, func_name = self.handlers[kind].split(":")
+            self._resolved[kind] = getattr(importlib.import_module(module_name), func_name)
+        return self._resolved[kind]
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            row = self._claim()
+            if row is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            tracer.record("job.queue_wait", time.time() - row["created_at"], kind=row["kind"])
+            try:
+                with span(f"job.{row['kind']}", task_id=row["task_id"]):
+                    result = self._handler(row["kind"])(**json.loads(row["payload"]))
+            except Exception as e:
+                print(f"Task {row['task_id']} ({row['kind']}) failed: {e}")
+                traceback.print_exc()
+                self._finish(row["task_id"], error=str(e) or type(e).__name__)
+            else:
+                self._finish(row["task_id"], result=result)
+
+
+class _Connection:
+    # sqlite3's own context manager commits but never closes
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, *exc):
+        self.db.close()
+
+
+def _task(row):
+    task = dict(row)
+    task["payload"] = json.loads(task["payload"])
+    task["result"] = json.loads(task["result"]) if task["result"] else None
+    return task
@@ -0,0 +1,149 @@
+import asyncio
+import inspect
+import threading
+import time
+
+from transcription_backends import TranscriptionError
+
+TERMINAL_STATUSES = {"COMPLETED", "FAILED"}
+
+
+class _TrackedJob:
+    def __init__(self, name, future, delay, callbacks):
+        self.name = name
+        self.future = future
+        self.delay = delay
+        self.next_poll = time.monotonic() + delay
+        self.callbacks = callbacks
+        self.polls = 0
+
+
+class TranscriptionJobTracker:
+    """Watches many Transcribe jobs from a single poller task.
+
+    Each job is polled soon after it starts and then at a geometrically growing
+    interval (initial_delay * backoff**n, capped at max_delay), so short clips are
+    picked up quickly and long jobs cost few API calls. watch() returns a future per
+    job that resolves to the TranscriptionJob dict, or raises TranscriptionError if
+    the job fails. on_complete callbacks (plain functions or coroutines) receive the
+    job dict when it finishes, including failures.
+    """
+
+    def __init__(self, transcribe_client, initial_delay=0.5, max_delay=10.0, backoff=1.6, on_complete=None):
+        self.transcribe_client = transcribe_client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.on_complete = on_complete
+        self.polls = 0
+        self._jobs = {}
+        self._wakeup = None
+        self._poller = None
+
+    def watch(self, job_name, on_complete=None):
+        loop = asyncio.get_running_loop()
+        if job_name in self._jobs:
+            return self._jobs[job_name].future
+        callbacks = [cb for cb in (self.on_complete, on_complete) if cb is not None]
+        job = _TrackedJob(job_name, loop.create_future(), self.initial_delay, callbacks)
+        self._jobs[job_name] = job
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._poller is None or self._poller.done():
+            self._poller = loop.create_task(self._poll_loop())
+        return job.future
+
+    async def wait(self, job_name, timeout=None):
+        return await asyncio.wait_for(asyncio.shield(self.watch(job_name)), timeout)
+
+    @property
+    def pending(self):
+        return sorted(self._jobs)
+
+    async def _poll_loop(self):
+        while self._jobs:
+            self._wakeup.clear()
+            soonest = min(job.next_poll for job in self._jobs.values())
+            delay = soonest - time.monotonic()
+            if delay > 0:
+                try:
+                    # A newly watched job may need polling sooner than anything queued
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            now = time.monotonic()
+            due = [job for job in self._jobs.values() if job.next_poll <= now]
+            await asyncio.gather(*(self._poll(job) for job in due))
+
+    async def _poll(self, job):
+        try:
+            response = await asyncio.to_thread(
+                self.transcribe_client.get_transcription_job, TranscriptionJobName=job.name
+            )
+        except Exception as e:
+            self._finish(job)
+            if not job.future.done():
+                job.future.set_exception(e)
+            return
+        self.polls += 1
+        job.polls += 1
+        job_info = response["TranscriptionJob"]
+        status = job_info["TranscriptionJobStatus"]
+        if status not in TERMINAL_STATUSES:
+            job.delay = min(job.delay * self.backoff, self.max_delay)
+            job.next_poll = time.monotonic() + job.delay
+            return
+
+        self._finish(job)
+        for callback in job.callbacks:
+            try:
+                result = callback(job_info)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Completion callback for {job.name} failed: {e}")
+        if job.future.done():
+            return
+        if status == "COMPLETED":
+            job.future.set_result(job_info)
+        else:
+            reason = job_info.get("FailureReason", "unknown reason")
+            job.future.set_exception(TranscriptionError(f"Transcription job {job.name} failed: {reason}"))
+
+    def _finish(self, job):
+        self._jobs.pop(job.name, None)
+
+
+_loop = None
+_trackers = {}
+_shared_lock = threading.Lock()
+
+
+def _background_loop():
+    global _loop
+    with _shared_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="transcribe-tracker", daemon=True).start()
+        return _loop
+
+
+def shared_tracker(transcribe_client, **tracker_kwargs):
+    # One long-lived tracker per client and settings, driven by the background loop
+    key = (transcribe_client, tuple(sorted(tracker_kwargs.items())))
+    with _shared_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = TranscriptionJobTracker(transcribe_client, **tracker_kwargs)
+        return tracker
+
+
+def wait_for_job(transcribe_client, job_name, timeout=None, **tracker_kwargs):
+    # Blocking helper for synchronous callers such as the transcription backends. Every
+    # caller hands its job to the shared tracker, so concurrent transcriptions are polled
+    # together by one task and only the caller's thread waits on its own future.
+    loop = _background_loop()
+    tracker = shared_tracker(transcribe_client, **tracker_kwargs)
+    return asyncio.run_coroutine_threadsafe(tracker.wait(job_name, timeout), loop).result()
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_cache.db")
+DEFAULT_MAX_ENTRIES = 5000
+# Seconds a response is served for; decks regenerate after this even if the prompt is unchanged
+DEFAULT_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+
+
+@dataclass
+class CacheTicket:
+    # Everything a miss needs to store the eventual response without recomputing it
+    key: str
+    namespace: str
+    prompt_text: str
+    embedding: object = None
+    semantic: bool = False
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Persistent cache of chat completions.
+
+    Exact lookups key on (model, messages, sampling params). With an embedder and a
+    similarity_threshold, a lookup made with semantic=True falls back on a miss to
+    the most similar cached prompt that shares the same model, params, system
+    prompt and scope, if its cosine similarity clears the threshold. Only callers
+    whose answer may be reused for a reworded prompt (deck generation) should ask
+    for that, with everything that must match exactly (role, topic, ...) as scope.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                 embedder=None, similarity_threshold=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder
+        # Vectors from different embedding models are not comparable, so each gets its own namespace
+        self.embedding_key = getattr(embedder, "model_key", None)
+        self.similarity_threshold = similarity_threshold
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                prompt_text TEXT NOT NULL,
+                embedding BLOB,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_namespace ON responses(namespace)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+        self._db.commit()
+
+    @property
+    def semantic(self):
+        return self.embedder is not None and self.similarity_threshold is not None
+
+    def _ticket(self, model, messages, params, semantic, scope):
+        key = _digest({"model": model, "messages": messages, "params": params})
+        # Semantic matches only make sense between prompts built from the same template
+        system = [m["content"] for m in messages if m["role"] == "system"]
+        namespace = _digest({"model": model, "params": params, "system": system, "scope": scope,
+                             "embedding": self.embedding_key})
+        prompt_text = "\n".join(m["content"] for m in messages if m["role"] != "system")
+        return CacheTicket(key, namespace, prompt_text, semantic=semantic and self.semantic)
+
+    def _expired_before(self):
+        return time.time() - self.ttl if self.ttl else 0.0
+
+    def lookup(self, model, messages, params, semantic=False, scope=None):
+        """Return (response or None, ticket); pass the ticket to store() after a miss."""
+        ticket = self._ticket(model, messages, params, semantic, scope)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?",
+                (ticket.key, self._expired_before()),
+            ).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, ticket.key))
+                self._db.commit()
+                self.exact_hits += 1
+                return row[0], ticket
+
+        if ticket.semantic:
+            response = self._semantic_lookup(ticket)
+            if response is not None:
+                return response, ticket
+
+        with self._lock:
+            self.misses += 1
+        return None, ticket
+
+    def _semantic_lookup(self, ticket):
+        query = np.asarray(self.embedder.embed_query(ticket.prompt_text), dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        ticket.embedding = query
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, embedding FROM responses WHERE namespace = ? AND embedding IS NOT NULL AND created >= ?",
+                (ticket.namespace, self._expired_before()),
+            ).fetchall()
+        rows = [(key, blob) for key, blob in rows if len(blob) == query.nbytes]
+        if not rows:
+            return None
+        matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (rows[best][0],)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), rows[best][0]))
+            self._db.commit()
+            self.semantic_hits += 1
+        return row[0]
+
+    def store(self, ticket, response):
+        if ticket.semantic and ticket.embedding is None:
+            embedding = np.asarray(self.embedder.embed_query(ticket.prompt_text), dtype=np.float32)
+            ticket.embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        blob = ticket.embedding.astype(np.float32).tobytes() if ticket.embedding is not None else None
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                """INSERT OR REPLACE INTO responses
+                   (key, namespace, prompt_text, embedding, response, created, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (ticket.key, ticket.namespace, ticket.prompt_text, blob, response, now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self.ttl:
+            self.evictions += self._db.execute(
+                "DELETE FROM responses WHERE created < ?", (self._expired_before(),)
+            ).rowcount
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self.evictions += self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (count - self.max_entries,),
+            ).rowcount
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": entries,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "pages")
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class CachedPage:
+    url: str
+    content_hash: str
+    html: str
+    text: str
+    etag: str = None
+    last_modified: str = None
+    fetched_at: float = 0.0
+    fetch_seconds: float = 0.0
+    fresh: bool = False
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    # Index rows map url -> content hash; the HTML and the text newspaper extracted
+    # from it are stored once per hash under blobs/, so mirrored pages share storage.
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.fetch_seconds_saved = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL,
+                fetch_seconds REAL NOT NULL DEFAULT 0
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages(last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_content_hash ON pages(content_hash)")
+        self._db.commit()
+
+    def _blob_path(self, content_hash, ext):
+        return os.path.join(self.cache_dir, "blobs", content_hash[:2], f"{content_hash}.{ext}")
+
+    def _read_blob(self, content_hash, ext):
+        with open(self._blob_path(content_hash, ext), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _write_blob(self, content_hash, ext, data):
+        path = self._blob_path(content_hash, ext)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        """Return the cached page for url (fresh or stale), or None if it was never cached."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, etag, last_modified, fetched_at, fetch_seconds FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            content_hash, etag, last_modified, fetched_at, fetch_seconds = row
+            try:
+                html = self._read_blob(content_hash, "html")
+                text = self._read_blob(content_hash, "txt")
+            except FileNotFoundError:
+                self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        return CachedPage(
+            url, content_hash, html, text, etag, last_modified, fetched_at, fetch_seconds,
+            fresh=time.time() - fetched_at < self.ttl,
+        )
+
+    def put(self, url, html, text, etag=None, last_modified=None, fetch_seconds=0.0):
+        content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        self._write_blob(content_hash, "html", html)
+        self._write_blob(content_hash, "txt", text)
+        size = len(html.encode("utf-8")) + len(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                """INSERT OR REPLACE INTO pages
+                   (url, content_hash, etag, last_modified, fetched_at, last_access, size, fetch_seconds)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (url, content_hash, etag, last_modified, now, now, size, fetch_seconds),
+            )
+            self._db.commit()
+            self._evict()
+        return content_hash
+
+    def mark_revalidated(self, page):
+        # Server answered 304: the stored copy is current again for another TTL. The
+        # lookup already counted as a miss; revalidated is the share of misses saved a download
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), page.url))
+            self._db.commit()
+            self.revalidated += 1
+
+    def record_hit(self, page):
+        with self._lock:
+            self.hits += 1
+            self.fetch_seconds_saved += page.fetch_seconds
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def total_bytes(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _evict(self):
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT url, content_hash, size FROM pages ORDER BY last_access").fetchall()
+        for url, content_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            still_used = self._db.execute(
+                "SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)
+            ).fetchone()
+            if not still_used:
+                for ext in ("html", "txt"):
+                    try:
+                        os.remove(self._blob_path(content_hash, ext))
+                    except FileNotFoundError:
+                        pass
+        self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            total_bytes = self.total_bytes()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "fetch_seconds_saved": round(self.fetch_seconds_saved, 3),
+            "bytes": total_bytes,
+        }
+
+    def close(self):
+        self._db.close()
@@ -1,16 +1,41 @@
 import streamlit as st
-import json
-import os
+import time
+import uuid
+
+from audio_ingest import SUPPORTED_FORMATS, ingest_upload
+from deck_store import deck_version, load_deck, resolve_deck, save_deck
+from job_queue import JobQueue, TERMINAL_STATES
+from results_store import ResultsStore
+from tracing import tracer
 
 st.set_page_config(page_title="Flashcard Practice", layout="wide")
 
 st.title("Flashcard Practice")
 
+
+@st.cache_resource
+def get_job_queue():
+    # One worker pool per server process, shared by every session
+    return JobQueue()
+
+
+@st.cache_resource
+def get_results_store():
+    return ResultsStore()
+
+
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
 # Display user context
 
 query = st.query_params
 name = query.get("name", "Anonymous")
 role = query.get("role", "Not specified")
+topic = query.get("topic", "")
+if not st.session_state.get("session_recorded"):
+    get_results_store().start_session(name, role, topic, query.get("goal"), session_id=st.session_state.session_id)
+    st.session_state.session_recorded = True
 st.markdown(
     f"""
     <p style='font-size: 1rem; margin-top: -10px;'>
@@ -22,23 +47,57 @@ st.markdown(
 st.markdown("<div style='margin-top: 30px'></div>", unsafe_allow_html=True)
 
 
-# === Load flashcards from local JSON file (with full question text as keys) ===
-if os.path.exists("interview_combined_20250517_190401.json"):
-    with open("interview_combined_20250517_190401.json", "r") as f:
-        raw_data = json.load(f)
+# === Load the deck for this role/topic; parsed once per file version ===
+@st.cache_data
+def cached_deck(path, version):
+    return load_deck(path)
+
 
-    # Convert to flashcard format using 'question' and 'ai_answer'
-    flashcards = [
-        {"question": item["question"], "answer": item["ai_answer"], "feedback": item["feedback"]}
-        for item in raw_data
-    ]
+deck_file = resolve_deck(role, topic)
+deck = cached_deck(deck_file, deck_version(deck_file)) if deck_file else None
+if deck and deck.cards:
+    flashcards = deck.cards
 else:
     flashcards = [{"question": "No flashcards loaded.", "answer": "", "feedback": ""}]
 
+# === Generate a fresh deck from the scraped corpus, showing cards as they stream in ===
+if st.button("Generate New Cards", key="generate_button"):
+    from rag_bot_clean import get_bot
+
+    first_card = st.empty()
+    progress = st.empty()
+    generated = []
+    with st.spinner("Generating flashcards..."):
+        bot = get_bot()
+        for record in bot.generate_qa_stream(role, topic, query.get("goal")):
+            generated.append({"id": record.id, "question": record.question, "answer": record.answer,
+                              "feedback": ""})
+            if len(generated) == 1:
+                first_card.info(f"**First card:** {record.question}")
+            progress.caption(f"{len(generated)} cards generated so far")
+
+    stats = bot.last_stream_stats
+    if generated:
+        st.session_state.generated_cards = generated
+        st.session_state.card_index = 0
+        if "role" in query:
+            # Saved as this role/topic's deck; the new mtime invalidates cached_deck
+            save_deck(generated, role, topic)
+        progress.caption(
+            f"{len(generated)} cards generated. First card after {stats['time_to_first_card']}s, "
+            f"full deck after {stats['total']}s."
+        )
+    else:
+        progress.error("No flashcards could be generated.")
+
+if st.session_state.get("generated_cards"):
+    flashcards = st.session_state.generated_cards
+
 # === Initialize session state for card navigation ===
 if "card_index" not in st.session_state:
     st.session_state.card_index = 0
 
+st.session_state.card_index = min(st.session_state.card_index, len(flashcards) - 1)
 card = flashcards[st.session_state.card_index]
 
 # Flashcard Display
@@ -103,50 +162,113 @@ with st.container():
         st.write(card["answer"])
 
 
+# === Typed answer with live feedback ===
+st.markdown("### Or Type Your Answer")
+typed_answer = st.text_area("Your answer", key="typed_answer")
+if st.button("Get Live Feedback", key="live_feedback_button") and typed_answer.strip():
+    from rag_bot_clean import get_bot
+
+    st.markdown("### Feedback")
+    feedback_text = st.write_stream(
+        get_bot().evaluate_user_response_stream(card["question"], typed_answer, card["answer"])
+    )
+    get_results_store().add_answer(st.session_state.session_id, card["question"], typed_answer, card["answer"],
+                                   feedback=feedback_text)
+
+
 # === Upload Audio and Load Local Feedback JSON ===
 st.markdown("### Upload Your Recorded Answer")
 
-uploaded_audio = st.file_uploader("Upload your `.wav` or `.mp3` audio file", type=["wav", "mp3"])
+uploaded_audio = st.file_uploader("Upload your recorded answer", type=sorted(SUPPORTED_FORMATS))
 
 if uploaded_audio is not None:
-    st.audio(uploaded_audio, format="audio/wav")
-    local_audio_path = os.path.join("tmp", uploaded_audio.name)
-    os.makedirs("tmp", exist_ok=True)
-    with open(local_audio_path, "wb") as f:
-        f.write(uploaded_audio.read())
-    st.session_state["uploaded_audio_path"] = local_audio_path
+    # Copy to tmp/ in chunks once per upload; the stored name is the content hash, so
+    # duplicate uploads reuse the same file and cached transcript
+    upload_id = getattr(uploaded_audio, "file_id", uploaded_audio.name)
+    if st.session_state.get("uploaded_audio_id") != upload_id:
+        st.session_state["uploaded_audio"] = ingest_upload(uploaded_audio, "tmp", filename=uploaded_audio.name)
+        st.session_state["uploaded_audio_id"] = upload_id
+    audio = st.session_state["uploaded_audio"]
+    st.audio(audio.path, format=audio.mime_type)
+    local_audio_path = audio.path
+    st.session_state["uploaded_audio_path"] = audio.path
+    st.session_state["uploaded_audio_format"] = audio.media_format
+    st.session_state["uploaded_audio_sha256"] = audio.sha256
 
     if st.button("Transcribe and Show Feedback"):
-        from transcript import run_transcription
-        run_transcription(local_audio_path)
-audio_name = uploaded_audio.name
+        # Runs on the job queue's workers; the status panel below picks up the result
+        st.session_state["transcription_task"] = get_job_queue().submit(
+            st.session_state.session_id, "transcribe", audio_path=audio.path
+        )
+        st.session_state["transcription_question"] = card
 
-if uploaded_audio:
-    st.audio(uploaded_audio, format="audio/wav")
 
-    if st.button("Submit and Show Feedback"):
-        try:
-            import json
+def show_transcription_results(result):
+    st.markdown("### Speech Analysis")
+    st.write(result["transcript"])
+    cols = st.columns(4)
+    cols[0].metric("Words per minute", result["wpm"])
+    cols[1].metric("Duration (s)", result["duration"])
+    cols[2].metric("Filler words", result["total_filler_words"])
+    cols[3].metric("Long pauses", result["pauses"]["long_pauses"])
+    if result["filler_word_counts"]:
+        st.bar_chart(result["filler_word_counts"])
+    if result["rolling_wpm"]:
+        st.line_chart({"Rolling WPM": result["rolling_wpm"]})
 
-            # Load local feedback file
-            if os.path.exists("interview_combined_20250517_190401.json"):
-                with open("interview_combined_20250517_190401.json", "r") as f:
-                    feedback_list = json.load(f)
 
-                current_question = card["question"]
+def record_transcription(result, question_card):
+    store = get_results_store()
+    with store.batch():
+        answer_id = store.add_answer(st.session_state.session_id, question_card["question"], result["transcript"],
+                                     question_card["answer"], kind="audio")
+        store.add_transcript(answer_id, result["transcript"], result["audio_sha256"], result["duration"],
+                             {"wpm": result["wpm"], "total_words": result["total_words"],
+                              "total_filler_words": result["total_filler_words"], "rate_std": result["rate_std"],
+                              **{f"pause_{k}": v for k, v in result["pauses"].items()}})
 
-                # Find feedback matching current question
-                match = next((entry for entry in feedback_list if entry["question"] == current_question), None)
 
-                if match:
-                    st.success("Feedback loaded")
+task_id = st.session_state.get("transcription_task")
+if task_id:
+    queue = get_job_queue()
+    polling = queue.get(task_id)["state"] not in TERMINAL_STATES
+
+    # Only this panel reruns while the task is in flight; each rerun is one SQLite read
+    @st.fragment(run_every=2 if polling else None)
+    def transcription_status():
+        task = queue.get(task_id)
+        if task["state"] == "queued":
+            st.info(f"Waiting for a transcription worker ({queue.position(task_id)} ahead)...")
+        elif task["state"] == "running":
+            st.info(f"Transcribing... {time.time() - task['started_at']:.0f}s elapsed")
+        elif polling:
+            # Finished since the last full run; rerun the page once so polling stops
+            st.rerun()
+        elif task["state"] == "failed":
+            st.error(f"Transcription failed: {task['error']}")
+        else:
+            result = task["result"]
+            if st.session_state.get("transcription_recorded") != task_id:
+                record_transcription(result, st.session_state.get("transcription_question", card))
+                st.session_state["transcription_recorded"] = task_id
+            show_transcription_results(result)
+
+    transcription_status()
+
+if uploaded_audio:
+    if st.button("Submit and Show Feedback"):
+        match = deck.find(card["question"]) if deck else None
+        if match and match.get("feedback"):
+            st.success("Feedback loaded")
 
-                    st.markdown("### Feedback")
-                    st.warning(match.get("feedback", "No feedback found."))
-                else:
-                    st.error("No matching feedback found for this question.")
-            else:
-                st.error("file not found.")
+            st.markdown("### Feedback")
+            st.warning(match["feedback"])
+        else:
+            st.error("No matching feedback found for this question.")
 
-        except Exception as e:
-            st.error(f"Failed to load or parse feedback: {e}")
+if tracer.enabled:
+    # Process-wide stage timings, only when started with TRACING=1
+    with st.sidebar.expander("Stage timings"):
+        st.code(tracer.summary())
+        st.download_button("Download JSON", tracer.to_json(), "trace.json", "application/json")
+        st.download_button("Download Prometheus", tracer.to_prometheus(), "trace.prom", "text/plain")
@@ -0,0 +1,130 @@
+import math
+import os
+import re
+import threading
+
+# gpt-3.5-turbo's context window, shared by the prompt and the completion
+CONTEXT_WINDOW = int(os.getenv("CONTEXT_WINDOW", "16385"))
+# Deck size the generation prompt asks for and the completion tokens allowed per card;
+# generate_qa's max_tokens is sized from these instead of a flat 2000
+QA_CARDS = 10
+QA_TOKENS_PER_CARD = int(os.getenv("QA_TOKENS_PER_CARD", "160"))
+QA_JSON_OVERHEAD = 40
+# Evaluation prompts cap the reference and the candidate's answer; feedback is short
+EVAL_REFERENCE_TOKENS = int(os.getenv("EVAL_REFERENCE_TOKENS", "600"))
+EVAL_ANSWER_TOKENS = int(os.getenv("EVAL_ANSWER_TOKENS", "800"))
+EVAL_MAX_TOKENS = 300
+# Chat format overhead per message and for priming the reply (OpenAI's published counts)
+TOKENS_PER_MESSAGE = 3
+REPLY_PRIMING_TOKENS = 3
+# compress_texts drops sentences this similar to an earlier one (shared distinct words)
+SENTENCE_SIMILARITY = 0.8
+MIN_SENTENCE_WORDS = 5
+TRUNCATION_MARK = " [...]"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"\w+")
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding(model):
+    # tiktoken needs the encoding file, downloaded on first use; without it (or without
+    # tiktoken) token counts fall back to the four-characters-per-token estimate
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+
+                try:
+                    _encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                print(f"tiktoken unavailable ({type(e).__name__}); estimating token counts from length")
+                _encoding = False
+        return _encoding
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English prose
+    return math.ceil(len(text) / 4)
+
+
+def count_tokens(text, model="gpt-3.5-turbo"):
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if not encoding:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages, model="gpt-3.5-turbo"):
+    """Prompt tokens a chat request will be billed for, counted locally."""
+    return sum(TOKENS_PER_MESSAGE + count_tokens(message["content"], model) for message in messages) \
+        + REPLY_PRIMING_TOKENS
+
+
+def truncate_tokens(text, max_tokens, model="gpt-3.5-turbo"):
+    """text cut to at most max_tokens, ending on a sentence or word where possible."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    budget = max_tokens - count_tokens(TRUNCATION_MARK, model)
+    encoding = _get_encoding(model)
+    if encoding:
+        head = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+    else:
+        head = text[:budget * 4]
+    cut = max(head.rfind(". "), head.rfind("\n"))
+    if cut < len(head) // 2:
+        cut = head.rfind(" ")
+    return (head[:cut + 1] if cut > 0 else head).rstrip() + TRUNCATION_MARK
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+def compress_texts(texts, similarity=SENTENCE_SIMILARITY):
+    """Drop sentences that repeat an earlier sentence from any of the texts.
+
+    Retrieved chunks from different pages often restate the same point word for word
+    or nearly so. A sentence is dropped when it matches one already kept, or when the
+    two share at least `similarity` of the larger one's distinct words. Returns
+    (texts, sentences dropped); a text left empty comes back as "".
+    """
+    kept_words = []
+    seen = set()
+    out = []
+    dropped = 0
+    for text in texts:
+        sentences = []
+        for sentence in split_sentences(text):
+            words = frozenset(_WORD.findall(sentence.lower()))
+            if not words:
+                continue
+            # Near matches only for sentences long enough for word overlap to mean anything
+            duplicate = words in seen or len(words) >= MIN_SENTENCE_WORDS and any(
+                len(words & other) >= similarity * max(len(words), len(other))
+                for other in kept_words if similarity * len(words) <= len(other) <= len(words) / similarity
+            )
+            if duplicate:
+                dropped += 1
+                continue
+            seen.add(words)
+            kept_words.append(words)
+            sentences.append(sentence)
+        out.append(" ".join(sentences))
+    return out, dropped
+
+
+def qa_output_tokens(cards=QA_CARDS, tokens_per_card=QA_TOKENS_PER_CARD):
+    return cards * tokens_per_card + QA_JSON_OVERHEAD
+
+
+def context_budget(template_tokens, max_tokens, cap, window=CONTEXT_WINDOW):
+    """Tokens left for retrieved context once the prompt template and the completion
+    are accounted for, never more than cap."""
+    return max(0, min(cap, window - template_tokens - max_tokens))
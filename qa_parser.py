@@ -0,0 +1,142 @@
+import ast
+import hashlib
+import json
+from dataclasses import dataclass, asdict
+
+
+@dataclass(frozen=True)
+class QARecord:
+    id: str
+    question: str
+    answer: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def qa_id(question):
+    # Stable across regenerations so the same question maps to the same card
+    return hashlib.sha1(" ".join(question.lower().split()).encode("utf-8")).hexdigest()[:12]
+
+
+def make_record(question, answer):
+    if not isinstance(question, str) or not isinstance(answer, str):
+        return None
+    question, answer = question.strip(), answer.strip()
+    if not question or not answer:
+        return None
+    return QARecord(qa_id(question), question, answer)
+
+
+class IncrementalQAParser:
+    # Pulls Q&A records out of model output as it streams in. The expected shape is
+    # {"cards": [{"id": ..., "question": "...", "answer": "..."}, ...]}; every JSON
+    # object that closes is validated on its own, so one malformed or truncated card
+    # is dropped without losing the rest. The older {"question": "answer"} dictionary
+    # format is still understood for cached responses.
+    def __init__(self):
+        self.records = []
+        self.rejected = 0
+        self._seen = set()
+        self._buffer = []
+        self._starts = []
+        self._brackets = 0
+        self._quote = None
+        self._escaped = False
+        self._literal_start = None
+        self._pending_key = None
+        self._expect_value = False
+
+    @property
+    def pairs(self):
+        return [(record.question, record.answer) for record in self.records]
+
+    def feed(self, chunk):
+        """Consume the next piece of text; return the records completed by it."""
+        completed = []
+        for ch in chunk:
+            pos = len(self._buffer)
+            self._buffer.append(ch)
+
+            if self._quote is not None:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == self._quote:
+                    self._quote = None
+                    self._close_literal(pos, completed)
+                continue
+
+            depth = len(self._starts)
+            if depth and ch in ("'", '"'):
+                self._quote = ch
+                self._literal_start = pos
+            elif ch == "{":
+                self._starts.append(pos)
+                self._reset_pair()
+            elif ch == "}":
+                if self._starts:
+                    start = self._starts.pop()
+                    self._close_object(start, pos, completed)
+                self._reset_pair()
+            elif ch == "[":
+                self._brackets += 1
+                self._reset_pair()
+            elif ch == "]":
+                self._brackets = max(self._brackets - 1, 0)
+            elif depth == 1 and ch == ":" and self._pending_key is not None:
+                self._expect_value = True
+            elif ch == ",":
+                self._reset_pair()
+        return completed
+
+    def _reset_pair(self):
+        self._pending_key = None
+        self._expect_value = False
+
+    def _add(self, record, completed):
+        if record is None:
+            self.rejected += 1
+            return
+        if record.id in self._seen:
+            return
+        self._seen.add(record.id)
+        self.records.append(record)
+        completed.append(record)
+
+    def _close_object(self, start, end, completed):
+        text = "".join(self._buffer[start:end + 1])
+        try:
+            value = json.loads(text, strict=False)
+        except json.JSONDecodeError:
+            if "question" in text:
+                self.rejected += 1
+            return
+        if isinstance(value, dict) and ("question" in value or "answer" in value):
+            self._add(make_record(value.get("question"), value.get("answer")), completed)
+
+    def _close_literal(self, end, completed):
+        # Legacy format: "question": "answer" pairs directly inside a top-level dict
+        if len(self._starts) != 1 or self._brackets:
+            return
+        # The model writes raw newlines inside answers; literal_eval needs them escaped
+        literal = "".join(self._buffer[self._literal_start:end + 1]).replace("\r", "").replace("\n", "\\n")
+        try:
+            value = ast.literal_eval(literal)
+        except (ValueError, SyntaxError):
+            self._reset_pair()
+            return
+        if self._expect_value and self._pending_key is not None:
+            key = self._pending_key
+            self._reset_pair()
+            if key.lower() not in ("id", "question", "answer"):
+                self._add(make_record(key, value), completed)
+            return
+        self._pending_key = value
+
+
+def parse_qa_records(text):
+    parser = IncrementalQAParser()
+    parser.feed(text)
+    return parser.records
@@ -1,6 +1,9 @@
-from rag_bot_clean import qa_pairs, bot, combined_data
-import json
-from datetime import datetime
+from rag_bot_clean import get_bot, get_qa_pairs
+from results_store import ResultsStore
+
+bot = get_bot()
+qa_pairs = get_qa_pairs()
+combined_data = []
 
 class feedback:
     user_answers = {}
@@ -9,18 +12,25 @@ class feedback:
         user_input = input("Your answer: ")  # Placeholder for user's input
         user_answers[question] = user_input
 
-    for question, ai_answer in qa_pairs.items():
-        user_answer = user_answers.get(question, "")
-        feedback = bot.evaluate_user_response(question, user_answer)
+    results = bot.evaluate_responses(user_answers.items())
 
-        combined_data.append({
+    for (question, ai_answer), result in zip(qa_pairs.items(), results):
+        entry = {
             "question": question,
             "ai_answer": ai_answer,
-            "feedback": feedback
-        })
+            "feedback": result.feedback
+        }
+        if not result.ok:
+            print(f"Could not evaluate \"{question}\": {result.error}")
+            entry["error"] = result.error
+        combined_data.append(entry)
 
-    combined_path = f"interview_combined_.json"
-    with open(combined_path, "w") as f:
-        json.dump(combined_data, f, indent=4)
+    store = ResultsStore()
+    with store.batch():
+        session_id = store.start_session(source="qandafeedback")
+        for entry in combined_data:
+            store.add_answer(session_id, entry["question"], user_answers.get(entry["question"]),
+                             entry["ai_answer"], feedback=entry["feedback"], error=entry.get("error"))
+    store.close()
 
-    print(f"\nCombined data saved to {combined_path}")
\ No newline at end of file
+    print(f"\nSession {session_id} saved to {store.path}")
\ No newline at end of file
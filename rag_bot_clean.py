@@ -1,26 +1,183 @@
 import os
-import json
-from openai import OpenAI
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
 from datetime import datetime
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.indexes import VectorstoreIndexCreator
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
 from dotenv import load_dotenv 
-from transformers import AutoTokenizer  # Add this
+from prompt_budget import (EVAL_ANSWER_TOKENS, EVAL_MAX_TOKENS, EVAL_REFERENCE_TOKENS, QA_CARDS, compress_texts,
+                           context_budget, count_message_tokens, count_tokens, qa_output_tokens, truncate_tokens)
+from tracing import add, span
 
+# openai, langchain, chromadb and transformers are imported inside the methods that
+# need them so that importing this module stays cheap.
 
 # Set tokenizer parallelism to false to avoid warnings
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+DEFAULT_DATA_PATH = "raw_model_output.txt"
+CHAT_MODEL = "gpt-3.5-turbo"
+QA_RESPONSE_FORMAT = {"type": "json_object"}
+# Set to a cosine similarity (e.g. 0.95) to also serve near-identical generation prompts from
+# the cache; evaluations always need an exact match on the candidate's answer
+LLM_CACHE_SIMILARITY = os.getenv("LLM_CACHE_SIMILARITY")
+EVAL_MAX_CONCURRENCY = 8
+EVAL_MAX_RETRIES = 5
+EVAL_BACKOFF_BASE = 0.5
+EVAL_BACKOFF_MAX = 20.0
+
+
+@dataclass
+class EvaluationResult:
+    question: str
+    user_answer: str
+    feedback: str = None
+    error: str = None
+    attempts: int = 0
+
+    @property
+    def ok(self):
+        return self.error is None
+
 
 class RAGBot:
-    def __init__(self, data_path="raw_model_output.txt"):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self, data_path=DEFAULT_DATA_PATH, persist_dir=None, api_key=None, base_url=None,
+                 cache=None):
+        self.api_key = api_key or OPENAI_API_KEY
+        self.base_url = base_url
+        self.cache = cache
+        self._client = None
+        self._async_client = None
         self.index = None
+        self.retriever = None
+        self.vectorstore = None
+        self.embeddings = None
         self.data_path = data_path
+        self.persist_dir = persist_dir
+        self.qa_pairs = {}
+        self.qa_records = []
+        self.last_stream_stats = {}
+        # Running token totals for this bot; per-call stats are returned by the _chat helpers
+        self.token_stats = {"calls": 0, "cached_calls": 0, "truncated_calls": 0, "prompt_tokens": 0,
+                            "completion_tokens": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            # Retries are handled by _aevaluate_one so the backoff policy lives in one place
+            self._async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._async_client
+
+    def _record_call(self, messages, max_tokens, content, usage=None, cached=False, finish_reason=None):
+        # Token counts per call: the server's usage block when there is one, otherwise
+        # counted locally with prompt_budget. Cache hits are not billed.
+        stats = {
+            "prompt_tokens": usage.prompt_tokens if usage else count_message_tokens(messages, CHAT_MODEL),
+            "completion_tokens": usage.completion_tokens if usage else count_tokens(content, CHAT_MODEL),
+            "max_tokens": max_tokens,
+            "finish_reason": finish_reason,
+            "truncated": finish_reason == "length",
+            "cached": cached,
+            "counted_locally": usage is None,
+        }
+        with self._stats_lock:
+            self.token_stats["calls"] += 1
+            self.token_stats["truncated_calls"] += stats["truncated"]
+            if cached:
+                self.token_stats["cached_calls"] += 1
+            else:
+                self.token_stats["prompt_tokens"] += stats["prompt_tokens"]
+                self.token_stats["completion_tokens"] += stats["completion_tokens"]
+        if not cached:
+            add("llm.prompt_tokens", stats["prompt_tokens"])
+            add("llm.completion_tokens", stats["completion_tokens"])
+        if stats["truncated"]:
+            # Output budget too small for this reply; it is returned as is but never cached
+            add("llm.truncated")
+            print(f"Response cut off at max_tokens={max_tokens}; raise the output budget if this repeats")
+        return stats
+
+    def _chat(self, messages, temperature, max_tokens, semantic=False, scope=None, **extra):
+        # semantic lets the cache answer a reworded prompt, but only one with the same scope;
+        # only deck generation asks for it
+        params = {"temperature": temperature, "max_tokens": max_tokens, **extra}
+        ticket = None
+        if self.cache is not None:
+            cached, ticket = self.cache.lookup(CHAT_MODEL, messages, params, semantic, scope)
+            if cached is not None:
+                return cached, self._record_call(messages, max_tokens, cached, cached=True)
+        with span("llm.chat", max_tokens=max_tokens):
+            response = self.client.chat.completions.create(model=CHAT_MODEL, messages=messages, **params)
+        choice = response.choices[0]
+        stats = self._record_call(messages, max_tokens, choice.message.content, response.usage,
+                                  finish_reason=choice.finish_reason)
+        if ticket is not None and not stats["truncated"]:
+            self.cache.store(ticket, choice.message.content)
+        return choice.message.content, stats
+
+    async def _achat(self, messages, temperature, max_tokens, semantic=False, scope=None, **extra):
+        params = {"temperature": temperature, "max_tokens": max_tokens, **extra}
+        ticket = None
+        if self.cache is not None:
+            # SQLite and the embedder block, so keep them off the event loop
+            cached, ticket = await asyncio.to_thread(self.cache.lookup, CHAT_MODEL, messages, params, semantic,
+                                                     scope)
+            if cached is not None:
+                return cached, self._record_call(messages, max_tokens, cached, cached=True)
+        with span("llm.chat", max_tokens=max_tokens):
+            response = await self.async_client.chat.completions.create(model=CHAT_MODEL, messages=messages, **params)
+        choice = response.choices[0]
+        stats = self._record_call(messages, max_tokens, choice.message.content, response.usage,
+                                  finish_reason=choice.finish_reason)
+        if ticket is not None and not stats["truncated"]:
+            await asyncio.to_thread(self.cache.store, ticket, choice.message.content)
+        return choice.message.content, stats
+
+    def _chat_stream(self, messages, temperature, max_tokens, semantic=False, scope=None, call_stats=None,
+                     **extra):
+        # call_stats, when given, is filled with this call's token stats once the stream ends
+        params = {"temperature": temperature, "max_tokens": max_tokens, **extra}
+        ticket = None
+        if self.cache is not None:
+            cached, ticket = self.cache.lookup(CHAT_MODEL, messages, params, semantic, scope)
+            if cached is not None:
+                stats = self._record_call(messages, max_tokens, cached, cached=True)
+                if call_stats is not None:
+                    call_stats.update(stats)
+                yield cached
+                return
+        usage = None
+        finish_reason = None
+        with span("llm.chat_stream", max_tokens=max_tokens):
+            # include_usage adds a final chunk with token counts and no choices
+            stream = self.client.chat.completions.create(model=CHAT_MODEL, messages=messages, stream=True,
+                                                         stream_options={"include_usage": True}, **params)
+            parts = []
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        stats = self._record_call(messages, max_tokens, "".join(parts), usage, finish_reason=finish_reason)
+        if call_stats is not None:
+            call_stats.update(stats)
+        if ticket is not None and not stats["truncated"]:
+            self.cache.store(ticket, "".join(parts))
 
     def build_vectorstore(self):
         try:
@@ -28,141 +185,344 @@ class RAGBot:
             if not os.path.exists(self.data_path):
                 raise FileNotFoundError(f"Data file not found: {self.data_path}")
                 
-            loader = TextLoader(self.data_path)
-            splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-            self.index = VectorstoreIndexCreator(
-                embedding=HuggingFaceEmbeddings(),
-                text_splitter=splitter,
-                vectorstore_cls=Chroma
-            ).from_loaders([loader])
-            print("Vectorstore built successfully.")
+            from langchain.indexes.vectorstore import VectorStoreIndexWrapper
+            from embedding_service import get_embedding_service
+            from vector_store import sync_vectorstore, DEFAULT_PERSIST_DIR
+            from retrieval import ChromaCandidates, Retriever
+            from vector_index import CHROMA_HNSW, VECTOR_BACKEND, sync_index
+
+            if self.embeddings is None:
+                self.embeddings = get_embedding_service()
+            persist_dir = self.persist_dir or DEFAULT_PERSIST_DIR
+            with span("vectorstore.build"):
+                self.vectorstore, stats = sync_vectorstore(
+                    self.data_path, self.embeddings, persist_dir=persist_dir, collection_metadata=CHROMA_HNSW
+                )
+            self.index = VectorStoreIndexWrapper(vectorstore=self.vectorstore)
+            candidates = ChromaCandidates(self.vectorstore)
+            if VECTOR_BACKEND != "chroma":
+                # Chroma stays the source of truth; a quantized, memory-mapped copy serves queries
+                index_path = os.path.join(persist_dir, f"{stats['collection']}.{VECTOR_BACKEND}")
+                candidates = sync_index(self.vectorstore, index_path, stats["source_hash"],
+                                        model_key=stats["embedding"]) or candidates
+            self.retriever = Retriever(candidates, self.embeddings,
+                                       count_tokens=lambda text: count_tokens(text, CHAT_MODEL),
+                                       compress=compress_texts)
+            if stats["warm"]:
+                print(f"Loaded persisted vectorstore ({stats['chunks']} chunks) in {stats['seconds']}s.")
+            else:
+                print(f"Vectorstore synced: {stats['added']} chunks embedded, {stats['deleted']} removed, "
+                      f"{stats['chunks']} total in {stats['seconds']}s.")
+                embedding_stats = self.embeddings.stats()
+                if embedding_stats["encoded"]:
+                    print(f"Embeddings: {embedding_stats['encoded']} encoded at "
+                          f"{embedding_stats['chunks_per_second']} chunks/s, "
+                          f"{embedding_stats['cache_hits']} served from cache.")
         except Exception as e:
             print(f"Error building vectorstore: {str(e)}")
             raise
 
-    def generate_qa(self):
-        try:
-            # Get relevant context
-            query = "Generate technical interview questions and answers. The questions should grammatically be asked and extremely similar to an interview question. Answers should be intricate and successful in answering the question. Answer professionally, in complete sentences, and intelligently with ONLY correct responses."
-            print("Performing similarity search...")
-            results = self.index.vectorstore.similarity_search(query, k=3)
-            context = "\n".join([doc.page_content for doc in results])
-            print(f"Found {len(results)} relevant documents")
+    def _qa_messages(self, role=None, topic=None, goal=None, where=None):
+        from retrieval import build_queries
+
+        queries = build_queries(role, topic, goal)
+        focus = ", ".join(part for part in queries[1:] if part)
+        focus = f"\n        Focus on: {focus}." if focus else ""
+
+        # Get relevant context: one query per piece of setup, reranked for diversity,
+        # with repeated sentences dropped, and packed into what the context window has
+        # left after the template and the expected deck (up to the retriever's cap)
+        budget = context_budget(count_message_tokens(self._qa_prompt("", focus), CHAT_MODEL), qa_output_tokens(),
+                                self.retriever.max_context_tokens)
+        print(f"Retrieving context for {len(queries)} queries...")
+        context, results = self.retriever.context(queries, where=where, max_tokens=budget)
+        stats = self.retriever.last_stats
+        print(f"Found {len(results)} relevant documents ({stats['candidates']} candidates, "
+              f"{stats['context_tokens']}/{budget} context tokens, "
+              f"{stats.get('sentences_dropped', 0)} repeated sentences dropped)")
+        return self._qa_prompt(context, focus)
+
+    def _qa_prompt(self, context, focus=""):
+        prompt = f"""Based on the following interview experience context, generate {QA_CARDS} technical interview questions and their detailed answers.
+        The questions should be based on the actual content of the interview experience.{focus}
+        Each answer should be detailed and explain the reasoning and importance of the concept.
+
+        Context: {context}
 
-            # Create prompt
-            prompt = f"""Based on the following interview experience context, generate 10 technical interview questions and their detailed answers.
-            The questions should be based on the actual content of the interview experience.
-            Each answer should be detailed and explain the reasoning and importance of the concept.
+        Return ONLY a JSON object of this shape:
+        {{"cards": [{{"id": 1, "question": "...", "answer": "..."}}, ...]}}
+        - "question" is a specific question about the interview experience or technical concepts mentioned
+        - "answer" is a detailed answer that explains the concept and its importance
 
-            Context: {context}
+        Output:"""
 
-            Return ONLY a Python dictionary where:
-            - Keys are specific questions about the interview experience or technical concepts mentioned
-            - Values are detailed answers that explain the concepts and their importance
-            - Format: {{"Question": "Detailed answer"}}
+        return [
+            {"role": "system", "content": "You are a technical interview question generator. Generate questions and answers based on the provided interview experience. Make answers detailed and informative. Always reply with valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
 
-            Output:"""
+    def _set_records(self, records):
+        self.qa_records = records
+        self.qa_pairs = {record.question: record.answer for record in records}
+
+    def generate_qa_records(self, role=None, topic=None, goal=None, where=None):
+        """Generate a deck as a list of QARecord; malformed entries are skipped individually."""
+        from qa_parser import IncrementalQAParser
+
+        try:
+            messages = self._qa_messages(role, topic, goal, where)
 
             # Generate response using OpenAI
             print("Generating response from OpenAI...")
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a technical interview question generator. Generate questions and answers based on the provided interview experience. Make answers detailed and informative."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            
-            # Extract the response text
-            response_text = response.choices[0].message.content
-            print("Raw model response received")
-            
-            # Extract dictionary from response
-            try:
-                # Find the dictionary in the response
-                start = response_text.find('{')
-                end = response_text.rfind('}') + 1
-                if start != -1 and end != 0:
-                    dict_str = response_text[start:end]
-                    # Clean up any potential formatting issues
-                    dict_str = dict_str.replace('\n', ' ').replace('\r', '')
-                    qa_dict = eval(dict_str)
-                    if isinstance(qa_dict, dict) and len(qa_dict) > 0:
-                        print(f"Successfully parsed {len(qa_dict)} Q&A pairs")
-                        return qa_dict
-                print("No valid dictionary found in response")
-                print("Raw response:", response_text)
-                return {}
-            except Exception as e:
-                print(f"Error parsing response: {str(e)}")
+            response_text, call = self._chat(messages=messages, temperature=0.7, max_tokens=qa_output_tokens(),
+                                             semantic=True, scope=_deck_scope(role, topic, goal, where),
+                                             response_format=QA_RESPONSE_FORMAT)
+            print(f"Raw model response received ({call['prompt_tokens']} prompt + "
+                  f"{call['completion_tokens']}/{call['max_tokens']} completion tokens)")
+
+            parser = IncrementalQAParser()
+            parser.feed(response_text)
+            if parser.rejected:
+                print(f"Skipped {parser.rejected} malformed Q&A entries")
+            if not parser.records:
+                print("No valid Q&A pairs found in response")
                 print("Raw response:", response_text)
-                return {}
+                return []
+            print(f"Successfully parsed {len(parser.records)} Q&A pairs")
+            self._set_records(parser.records)
+            return parser.records
         except Exception as e:
             print(f"Error in generate_qa: {str(e)}")
-            return {}
+            return []
+
+    def generate_qa(self, role=None, topic=None, goal=None, where=None):
+        records = self.generate_qa_records(role, topic, goal, where)
+        return {record.question: record.answer for record in records}
+
+    def generate_qa_stream(self, role=None, topic=None, goal=None, where=None):
+        """Yield QARecords as soon as each one is complete in the streamed output.
+
+        Timing for the run (time to first token, time to first card, total) is left in
+        self.last_stream_stats.
+        """
+        from qa_parser import IncrementalQAParser
+
+        messages = self._qa_messages(role, topic, goal, where)
+        print("Streaming response from OpenAI...")
+        parser = IncrementalQAParser()
+        start = time.perf_counter()
+        stats = {"time_to_first_token": None, "time_to_first_card": None, "cards": 0}
+        self.last_stream_stats = stats
+        call = {}
+        for delta in self._chat_stream(messages=messages, temperature=0.7, max_tokens=qa_output_tokens(),
+                                       semantic=True, scope=_deck_scope(role, topic, goal, where), call_stats=call,
+                                       response_format=QA_RESPONSE_FORMAT):
+            if stats["time_to_first_token"] is None:
+                stats["time_to_first_token"] = round(time.perf_counter() - start, 3)
+            for record in parser.feed(delta):
+                if stats["time_to_first_card"] is None:
+                    stats["time_to_first_card"] = round(time.perf_counter() - start, 3)
+                stats["cards"] += 1
+                yield record
+        stats["total"] = round(time.perf_counter() - start, 3)
+        stats["rejected"] = parser.rejected
+        stats.update(prompt_tokens=call.get("prompt_tokens"), completion_tokens=call.get("completion_tokens"),
+                     truncated=call.get("truncated", False))
+        self._set_records(parser.records)
+        print(f"Streamed {stats['cards']} Q&A pairs; first card after {stats['time_to_first_card']}s, "
+              f"done after {stats['total']}s")
+
+    def _evaluation_messages(self, question, user_answer, reference=None):
+        # Long references and rambling answers are cut so every evaluation costs about the same
+        reference = truncate_tokens(reference or self.qa_pairs.get(question, 'N/A'), EVAL_REFERENCE_TOKENS, CHAT_MODEL)
+        user_answer = truncate_tokens(user_answer, EVAL_ANSWER_TOKENS, CHAT_MODEL)
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You are an expert technical interviewer. Compare the candidate's response "
+                    "to the correct answer and provide constructive, concise feedback."
+                )
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"Question: {question}\n\n"
+                    f"Correct Answer: {reference}\n\n"
+                    f"Candidate Answer: {user_answer}\n\n"
+                    "Please give clear, actionable feedback on how well the answer matches the correct answer, "
+                    "mentioning what was done well and what could be improved."
+                )
+            }
+        ]
 
     def evaluate_user_response(self, question, user_answer):
         try:
-            # Format prompt as chat messages
-            messages = [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert technical interviewer. Compare the candidate's response "
-                        "to the correct answer and provide constructive, concise feedback."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        f"Question: {question}\n\n"
-                        f"Correct Answer: {qa_pairs.get(question, 'N/A')}\n\n"
-                        f"Candidate Answer: {user_answer}\n\n"
-                        "Please give clear, actionable feedback on how well the answer matches the correct answer, "
-                        "mentioning what was done well and what could be improved."
-                    )
-                }
-            ]
-
             # Call OpenAI API to evaluate
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
+            feedback, _ = self._chat(
+                messages=self._evaluation_messages(question, user_answer),
                 temperature=0.5,
-                max_tokens=300
+                max_tokens=EVAL_MAX_TOKENS
             )
-
-            feedback = response.choices[0].message.content.strip()
-            return feedback
+            return feedback.strip()
 
         except Exception as e:
             return f"Error evaluating response: {str(e)}"
 
+    def evaluate_user_response_stream(self, question, user_answer, reference=None):
+        # Yields feedback text as it is generated; suitable for st.write_stream
+        yield from self._chat_stream(
+            messages=self._evaluation_messages(question, user_answer, reference),
+            temperature=0.5,
+            max_tokens=EVAL_MAX_TOKENS
+        )
+
+    async def _aevaluate_one(self, semaphore, question, user_answer, max_retries):
+        import openai
+
+        result = EvaluationResult(question, user_answer)
+        retryable = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+        while True:
+            result.attempts += 1
+            try:
+                async with semaphore:
+                    feedback, _ = await self._achat(
+                        messages=self._evaluation_messages(question, user_answer),
+                        temperature=0.5,
+                        max_tokens=EVAL_MAX_TOKENS
+                    )
+                result.feedback = feedback.strip()
+                return result
+            except retryable as e:
+                if result.attempts > max_retries:
+                    result.error = f"{type(e).__name__}: {e}"
+                    return result
+                # Back off outside the semaphore so waiting retries don't hold a request slot
+                await asyncio.sleep(_retry_delay(e, result.attempts))
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+                return result
+
+    async def aevaluate_responses(self, pairs, max_concurrency=EVAL_MAX_CONCURRENCY,
+                                  max_retries=EVAL_MAX_RETRIES):
+        semaphore = asyncio.Semaphore(max_concurrency)
+        return await asyncio.gather(*(
+            self._aevaluate_one(semaphore, question, user_answer, max_retries)
+            for question, user_answer in pairs
+        ))
+
+    def evaluate_responses(self, pairs, max_concurrency=EVAL_MAX_CONCURRENCY, max_retries=EVAL_MAX_RETRIES):
+        """Evaluate many (question, user_answer) pairs concurrently.
+
+        Returns one EvaluationResult per pair, in input order. Rate limits, connection
+        errors and 5xx responses are retried with exponential backoff; anything that
+        still fails is reported on its own result via .error.
+        """
+        # A fresh event loop per call, so the async client is opened and closed inside it
+        async def run():
+            try:
+                return await self.aevaluate_responses(list(pairs), max_concurrency, max_retries)
+            finally:
+                if self._async_client is not None:
+                    await self._async_client.close()
+                    self._async_client = None
+
+        self._async_client = None
+        return asyncio.run(run())
+
+
+def _deck_scope(role, topic, goal, where):
+    # A cached deck may answer a reworded prompt only for the same setup; the shared
+    # template and context otherwise make every role's prompt look alike to the embedder
+    return {"role": role, "topic": topic, "goal": goal, "where": where}
+
+
+def _retry_delay(error, attempt):
+    # Honour Retry-After when the server sends one, otherwise full-jitter exponential backoff
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), EVAL_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(EVAL_BACKOFF_MAX, EVAL_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+# Shared bots are built on first use and memoized per data file. _bots_lock only guards
+# the dicts; building a bot or its deck holds that key's own lock, so other keys never wait
+_bots = {}
+_key_locks = {}
+_bots_lock = threading.Lock()
+
+
+def _key_lock(key):
+    with _bots_lock:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = threading.Lock()
+        return lock
+
+
+def get_bot(data_path=DEFAULT_DATA_PATH, persist_dir=None):
+    key = (data_path, persist_dir)
+    with _bots_lock:
+        bot = _bots.get(key)
+    if bot is not None:
+        return bot
+    with _key_lock(key):
+        with _bots_lock:
+            bot = _bots.get(key)
+        if bot is None:
+            from llm_cache import LLMCache
+
+            bot = RAGBot(data_path=data_path, persist_dir=persist_dir)
+            bot.build_vectorstore()
+            if LLM_CACHE_SIMILARITY:
+                bot.cache = LLMCache(embedder=bot.embeddings, similarity_threshold=float(LLM_CACHE_SIMILARITY))
+            else:
+                bot.cache = LLMCache()
+            with _bots_lock:
+                _bots[key] = bot
+    return bot
+
+
+def get_qa_pairs(data_path=DEFAULT_DATA_PATH, persist_dir=None):
+    bot = get_bot(data_path, persist_dir)
+    if not bot.qa_pairs:
+        with _key_lock(("qa_pairs", data_path, persist_dir)):
+            if not bot.qa_pairs:
+                bot.generate_qa()
+    return bot.qa_pairs
+
+
+def __getattr__(name):
+    # Keeps `from rag_bot_clean import bot, qa_pairs` working without import-time work
+    if name == "bot":
+        return get_bot()
+    if name == "qa_pairs":
+        return get_qa_pairs()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Initialize global objects so they can be imported
-bot = RAGBot(data_path="raw_model_output.txt")
-bot.build_vectorstore()
-qa_pairs = bot.generate_qa()
-combined_data = []
 
 if __name__ == "__main__":
     try:
         # Initialize and run RAG bot
-        bot = RAGBot(data_path="raw_model_output.txt")
-        bot.build_vectorstore()
+        bot = get_bot()
         
         # Generate Q&A pairs
-        qa_pairs = bot.generate_qa()
+        qa_pairs = get_qa_pairs()
         
-        # Save to JSON
+        # Save to the question bank
         if qa_pairs:
-            output_path = f"interview_qna.json"
-            
-            with open(output_path, "w") as f:
-                json.dump(qa_pairs, f, indent=4)
-            print(f"\nQ&A pairs saved to {output_path}")
+            from results_store import ResultsStore
+
+            store = ResultsStore()
+            with store.batch():
+                for q, a in qa_pairs.items():
+                    store.add_question(q, a)
+            store.close()
+            print(f"\nQ&A pairs saved to {store.path}")
             
             # Print results
             print("\nGenerated Questions and Answers:")
@@ -0,0 +1,290 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from qa_parser import qa_id
+
+DEFAULT_DB_PATH = os.path.join(".cache", "results.db")
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        created_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(user_id),
+        role TEXT,
+        topic TEXT,
+        goal TEXT,
+        source TEXT,
+        started_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS questions (
+        question_id TEXT PRIMARY KEY,
+        question TEXT NOT NULL,
+        reference_answer TEXT,
+        role TEXT,
+        topic TEXT,
+        created_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS answers (
+        answer_id TEXT PRIMARY KEY,
+        session_id TEXT NOT NULL REFERENCES sessions(session_id),
+        question_id TEXT NOT NULL REFERENCES questions(question_id),
+        answer TEXT,
+        kind TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS transcripts (
+        answer_id TEXT PRIMARY KEY REFERENCES answers(answer_id),
+        audio_sha256 TEXT,
+        transcript TEXT NOT NULL,
+        duration REAL,
+        created_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS metrics (
+        answer_id TEXT NOT NULL REFERENCES answers(answer_id),
+        name TEXT NOT NULL,
+        value REAL,
+        PRIMARY KEY (answer_id, name)
+    )""",
+    """CREATE TABLE IF NOT EXISTS feedback (
+        answer_id TEXT PRIMARY KEY REFERENCES answers(answer_id),
+        feedback TEXT,
+        error TEXT,
+        created_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS sessions_user ON sessions(user_id, started_at)",
+    "CREATE INDEX IF NOT EXISTS sessions_role_topic ON sessions(role, topic, started_at)",
+    "CREATE INDEX IF NOT EXISTS questions_role_topic ON questions(role, topic)",
+    "CREATE INDEX IF NOT EXISTS answers_session ON answers(session_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS answers_question ON answers(question_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS transcripts_audio ON transcripts(audio_sha256)",
+    "CREATE INDEX IF NOT EXISTS metrics_name ON metrics(name, value)",
+]
+
+
+class ResultsStore:
+    """Users, practice sessions, answers, transcripts, speech metrics and feedback.
+
+    Rows are inserted, except that recording a transcript again for the same answer
+    replaces its transcript and metrics. Inside a batch() block writes are buffered
+    and run in one transaction when the block exits, so recording a whole practice
+    run costs a single commit. Outside a batch every call commits on its own.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._pending = []
+        self._depth = 0
+        self._users = {}
+        self._sessions = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            with self._db:
+                for sql, params in pending:
+                    self._db.execute(sql, params)
+
+    def _execute(self, sql, params):
+        with self._lock:
+            self._pending.append((sql, params))
+            if self._depth == 0:
+                self.flush()
+
+    def _insert(self, table, row, ignore=False, replace=False):
+        columns = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        verb = "INSERT OR IGNORE" if ignore else "INSERT OR REPLACE" if replace else "INSERT"
+        self._execute(f"{verb} INTO {table} ({columns}) VALUES ({marks})", tuple(row.values()))
+
+    def user_id(self, name):
+        name = (name or "Anonymous").strip() or "Anonymous"
+        with self._lock:
+            if name not in self._users:
+                with self._db:
+                    self._db.execute("INSERT OR IGNORE INTO users (name, created_at) VALUES (?, ?)",
+                                     (name, time.time()))
+                row = self._db.execute("SELECT user_id FROM users WHERE name = ?", (name,)).fetchone()
+                self._users[name] = row[0]
+            return self._users[name]
+
+    def start_session(self, user=None, role=None, topic=None, goal=None, source="app", session_id=None,
+                      started_at=None):
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            self._sessions.setdefault(session_id, (role, topic))
+        self._insert("sessions", {
+            "session_id": session_id, "user_id": self.user_id(user), "role": role, "topic": topic,
+            "goal": goal, "source": source, "started_at": started_at or time.time(),
+        }, ignore=True)
+        return session_id
+
+    def add_question(self, question, reference_answer=None, role=None, topic=None):
+        question_id = qa_id(question)
+        self._insert("questions", {
+            "question_id": question_id, "question": question, "reference_answer": reference_answer,
+            "role": role, "topic": topic, "created_at": time.time(),
+        }, ignore=True)
+        return question_id
+
+    def _session_context(self, session_id):
+        # (role, topic) of a session; sessions from earlier runs are read back once
+        with self._lock:
+            if session_id not in self._sessions:
+                row = self._db.execute("SELECT role, topic FROM sessions WHERE session_id = ?",
+                                       (session_id,)).fetchone()
+                self._sessions[session_id] = tuple(row) if row else (None, None)
+            return self._sessions[session_id]
+
+    def add_answer(self, session_id, question, answer, reference_answer=None, kind="typed", feedback=None,
+                   error=None, created_at=None, answer_id=None):
+        created_at = created_at or time.time()
+        answer_id = answer_id or uuid.uuid4().hex
+        role, topic = self._session_context(session_id)
+        with self.batch():
+            question_id = self.add_question(question, reference_answer, role, topic)
+            self._insert("answers", {
+                "answer_id": answer_id, "session_id": session_id, "question_id": question_id,
+                "answer": answer, "kind": kind, "created_at": created_at,
+            }, ignore=True)
+            if feedback is not None or error is not None:
+                self.add_feedback(answer_id, feedback, error, created_at)
+        return answer_id
+
+    def add_feedback(self, answer_id, feedback, error=None, created_at=None):
+        self._insert("feedback", {
+            "answer_id": answer_id, "feedback": feedback, "error": error, "created_at": created_at or time.time(),
+        }, ignore=True)
+
+    def add_transcript(self, answer_id, transcript, audio_sha256=None, duration=None, metrics=None):
+        # Re-recording an answer replaces its transcript and metrics
+        with self.batch():
+            self._insert("transcripts", {
+                "answer_id": answer_id, "audio_sha256": audio_sha256, "transcript": transcript,
+                "duration": duration, "created_at": time.time(),
+            }, replace=True)
+            self._execute("DELETE FROM metrics WHERE answer_id = ?", (answer_id,))
+            # Only scalar metrics are stored as rows; series stay with the caller
+            for name, value in (metrics or {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self._insert("metrics", {"answer_id": answer_id, "name": name, "value": float(value)})
+
+    def sessions(self, user=None, role=None, topic=None, limit=50):
+        query = ("SELECT s.*, u.name AS user, COUNT(a.answer_id) AS answers FROM sessions s "
+                 "JOIN users u ON u.user_id = s.user_id LEFT JOIN answers a ON a.session_id = s.session_id")
+        clauses, params = [], []
+        if user is not None:
+            clauses.append("s.user_id = ?")
+            params.append(self.user_id(user))
+        if role is not None:
+            clauses.append("s.role = ?")
+            params.append(role)
+        if topic is not None:
+            clauses.append("s.topic = ?")
+            params.append(topic)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " GROUP BY s.session_id ORDER BY s.started_at DESC LIMIT ?"
+        params.append(limit)
+        self.flush()
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, params)]
+
+    def session_answers(self, session_id):
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(
+                """SELECT a.answer_id, a.kind, a.answer, a.created_at, q.question, q.reference_answer,
+                          f.feedback, f.error, t.transcript, t.duration
+                   FROM answers a
+                   JOIN questions q ON q.question_id = a.question_id
+                   LEFT JOIN feedback f ON f.answer_id = a.answer_id
+                   LEFT JOIN transcripts t ON t.answer_id = a.answer_id
+                   WHERE a.session_id = ? ORDER BY a.created_at""",
+                (session_id,),
+            ).fetchall()
+            answers = [dict(row) for row in rows]
+            for answer in answers:
+                answer["metrics"] = dict(self._db.execute(
+                    "SELECT name, value FROM metrics WHERE answer_id = ?", (answer["answer_id"],)
+                ).fetchall())
+        return answers
+
+    def import_combined(self, path, user=None, role=None, topic=None):
+        """Import a qandafeedback-style file ([{"question", "ai_answer", "feedback"}]) as one session."""
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        started_at = os.path.getmtime(path)
+        with self.batch():
+            session_id = self.start_session(user, role, topic, source=f"import:{os.path.basename(path)}",
+                                            session_id=f"import-{qa_id(os.path.abspath(path))}",
+                                            started_at=started_at)
+            # Ids derive from the file and position, so importing a file twice is a no-op
+            for position, entry in enumerate(entries):
+                self.add_answer(session_id, entry["question"], entry.get("user_answer"), entry.get("ai_answer"),
+                                kind="imported", feedback=entry.get("feedback"), error=entry.get("error"),
+                                created_at=started_at, answer_id=f"{session_id}-{position}")
+        return session_id, len(entries)
+
+    def import_qna(self, path, role=None, topic=None):
+        """Import a generated {"question": "answer"} file into the question bank."""
+        with open(path, "r", encoding="utf-8") as f:
+            pairs = json.load(f)
+        with self.batch():
+            for question, answer in pairs.items():
+                self.add_question(question, answer, role, topic)
+        return len(pairs)
+
+
+def import_files(store, paths, user=None, role=None, topic=None):
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            print(f"{path}: {store.import_qna(path, role, topic)} questions imported")
+        else:
+            session_id, count = store.import_combined(path, user, role, topic)
+            print(f"{path}: {count} answers imported into session {session_id}")
+
+
+if __name__ == "__main__":
+    # python results_store.py interview_combined_20250517_190401.json interview_qna.json
+    store = ResultsStore()
+    import_files(store, sys.argv[1:])
+    store.close()
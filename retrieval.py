@@ -0,0 +1,254 @@
+import json
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from prompt_budget import estimate_tokens
+from tracing import span
+
+DEFAULT_QA_QUERY = "Generate technical interview questions and answers. The questions should grammatically be asked and extremely similar to an interview question. Answers should be intricate and successful in answering the question. Answer professionally, in complete sentences, and intelligently with ONLY correct responses."
+RETRIEVAL_K = 8
+RETRIEVAL_FETCH_K = 40
+MMR_LAMBDA = 0.5
+MAX_CONTEXT_TOKENS = 1500
+CONTEXT_SEPARATOR = "\n\n"
+
+
+@dataclass
+class Retrieved:
+    id: str
+    text: str
+    metadata: dict = field(default_factory=dict)
+    score: float = 0.0
+
+
+def build_queries(role=None, topic=None, goal=None, base_query=DEFAULT_QA_QUERY):
+    """The generic question-generation query plus one per piece of setup from Home.py."""
+    queries = [base_query]
+    role = role if role and role not in ("Not specified", "Select a role...") else None
+    if role and topic:
+        queries.append(f"{topic} interview questions for a {role}")
+    elif role:
+        queries.append(f"Technical interview experience for a {role} position")
+    elif topic:
+        queries.append(f"{topic} interview questions")
+    if goal:
+        queries.append(f"How to answer interview questions well: {goal}")
+    return queries
+
+
+def metadata_where(urls=None, scraped_after=None, scraped_before=None):
+    """Chroma `where` filter on the chunk metadata written by vector_store.split_chunks."""
+    clauses = []
+    if urls:
+        clauses.append({"url": {"$in": list(urls)}})
+    if scraped_after is not None:
+        clauses.append({"scraped_at": {"$gte": scraped_after}})
+    if scraped_before is not None:
+        clauses.append({"scraped_at": {"$lte": scraped_before}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches_where(metadata, where):
+    # Evaluates the subset of Chroma's filter language that metadata_where produces
+    if not where:
+        return True
+    if "$and" in where:
+        return all(matches_where(metadata, clause) for clause in where["$and"])
+    if "$or" in where:
+        return any(matches_where(metadata, clause) for clause in where["$or"])
+    for key, condition in where.items():
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$ne" and value == expected:
+                return False
+            if op == "$in" and value not in expected:
+                return False
+            if op == "$nin" and value in expected:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte") and value is None:
+                return False
+            if op == "$gt" and not value > expected:
+                return False
+            if op == "$gte" and not value >= expected:
+                return False
+            if op == "$lt" and not value < expected:
+                return False
+            if op == "$lte" and not value <= expected:
+                return False
+    return True
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def mmr_select(relevance, doc_vectors, k, lambda_mult=MMR_LAMBDA):
+    """Maximal marginal relevance over unit-length doc_vectors.
+
+    Picks k indices, each maximising lambda * relevance - (1 - lambda) * the highest
+    similarity to anything already picked. The running maximum is updated with one
+    matrix-vector product per pick, so the cost is O(k * n * dim).
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k == 0:
+        return []
+    relevance = np.asarray(relevance, dtype=np.float32)
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected = []
+    for _ in range(k):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy if selected else relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, doc_vectors @ doc_vectors[best], out=redundancy)
+    return selected
+
+
+def pack_context(docs, max_tokens=MAX_CONTEXT_TOKENS, count_tokens=estimate_tokens, separator=CONTEXT_SEPARATOR):
+    """Take docs in order while they fit in max_tokens; returns (packed docs, tokens used).
+
+    A doc that does not fit is skipped rather than ending the packing, so a shorter
+    one further down can still use the remaining budget.
+    """
+    packed = []
+    used = 0
+    separator_tokens = count_tokens(separator)
+    for doc in docs:
+        cost = count_tokens(doc.text) + (separator_tokens if packed else 0)
+        if used + cost > max_tokens:
+            continue
+        packed.append(doc)
+        used += cost
+    return packed, used
+
+
+class ChromaCandidates:
+    # Nearest neighbours for several query vectors from one Chroma query call,
+    # returned together with their stored embeddings so MMR needs no re-embedding
+    def __init__(self, vectorstore):
+        self.collection = vectorstore._collection
+
+    def search(self, query_vectors, n, where=None):
+        result = self.collection.query(
+            query_embeddings=np.asarray(query_vectors).tolist(), n_results=n, where=where,
+            include=["documents", "metadatas", "embeddings"],
+        )
+        return [
+            (ids, texts, metadatas, np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+            for ids, texts, metadatas, embeddings in zip(
+                result["ids"], result["documents"], result["metadatas"], result["embeddings"]
+            )
+        ]
+
+
+class ArrayCandidates:
+    # Exact search over an in-memory matrix; used for small corpora and benchmarks
+    def __init__(self, vectors, texts, metadatas=None, ids=None):
+        self.vectors = normalize(vectors)
+        self.texts = list(texts)
+        self.metadatas = list(metadatas) if metadatas is not None else [{} for _ in self.texts]
+        self.ids = list(ids) if ids is not None else [str(i) for i in range(len(self.texts))]
+        self._filtered = {}
+
+    def _positions(self, where):
+        key = json.dumps(where, sort_keys=True)
+        if key not in self._filtered:
+            self._filtered[key] = np.flatnonzero([matches_where(m, where) for m in self.metadatas])
+        return self._filtered[key]
+
+    def search(self, query_vectors, n, where=None):
+        vectors = self.vectors
+        positions = np.arange(len(self.ids))
+        if where:
+            positions = self._positions(where)
+            vectors = vectors[positions]
+        n = min(n, len(positions))
+        if n == 0:
+            return [([], [], [], np.empty((0, self.vectors.shape[1]), dtype=np.float32)) for _ in query_vectors]
+        scores = normalize(query_vectors) @ vectors.T
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, n - 1)[:n] if n < len(row) else np.arange(len(row))
+            top = top[np.argsort(-row[top])]
+            picked = positions[top]
+            results.append((
+                [self.ids[i] for i in picked], [self.texts[i] for i in picked],
+                [self.metadatas[i] for i in picked], self.vectors[picked],
+            ))
+        return results
+
+
+class Retriever:
+    """Multi-query retrieval with MMR reranking and token-budgeted context packing.
+
+    Every query is embedded in one batch and searched for fetch_k candidates; the
+    union is scored by its best similarity to any query and reranked with MMR so the
+    k chunks returned cover different parts of the corpus instead of repeating the
+    same paragraph. With compress (such as prompt_budget.compress_texts), sentences the
+    chosen chunks repeat are dropped before packing, so the budget goes further.
+    """
+
+    def __init__(self, candidates, embeddings, k=RETRIEVAL_K, fetch_k=RETRIEVAL_FETCH_K, lambda_mult=MMR_LAMBDA,
+                 max_context_tokens=MAX_CONTEXT_TOKENS, count_tokens=estimate_tokens, compress=None):
+        self.candidates = candidates
+        self.embeddings = embeddings
+        self.k = k
+        self.fetch_k = fetch_k
+        self.lambda_mult = lambda_mult
+        self.max_context_tokens = max_context_tokens
+        self.count_tokens = count_tokens
+        self.compress = compress
+        self.last_stats = {}
+
+    def retrieve(self, queries, where=None, k=None):
+        if isinstance(queries, str):
+            queries = [queries]
+        with span("retrieval.embed_queries", queries=len(queries)):
+            query_vectors = normalize(self.embeddings.embed_documents(list(queries)))
+
+        seen = {}
+        texts, metadatas, vectors = [], [], []
+        with span("retrieval.search", fetch_k=self.fetch_k):
+            hits = self.candidates.search(query_vectors, self.fetch_k, where)
+        for ids, hit_texts, hit_metadatas, hit_vectors in hits:
+            for doc_id, text, metadata, vector in zip(ids, hit_texts, hit_metadatas, hit_vectors):
+                if doc_id not in seen:
+                    seen[doc_id] = len(texts)
+                    texts.append(text)
+                    metadatas.append(metadata or {})
+                    vectors.append(vector)
+        if not texts:
+            self.last_stats = {"queries": len(queries), "candidates": 0, "selected": 0}
+            return []
+
+        with span("retrieval.mmr", candidates=len(texts)):
+            doc_vectors = normalize(np.stack(vectors))
+            relevance = (doc_vectors @ query_vectors.T).max(axis=1)
+            selected = mmr_select(relevance, doc_vectors, k or self.k, self.lambda_mult)
+        ids = list(seen)
+        self.last_stats = {"queries": len(queries), "candidates": len(texts), "selected": len(selected)}
+        return [Retrieved(ids[i], texts[i], metadatas[i], float(relevance[i])) for i in selected]
+
+    def context(self, queries, where=None, max_tokens=None):
+        """Packed context string for a prompt, plus the chunks that made it in."""
+        docs = self.retrieve(queries, where)
+        if self.compress is not None and docs:
+            texts, dropped = self.compress([doc.text for doc in docs])
+            docs = [replace(doc, text=text) for doc, text in zip(docs, texts) if text]
+            self.last_stats["sentences_dropped"] = dropped
+        packed, used = pack_context(docs, self.max_context_tokens if max_tokens is None else max_tokens,
+                                    self.count_tokens)
+        self.last_stats.update(packed=len(packed), context_tokens=used)
+        return CONTEXT_SEPARATOR.join(doc.text for doc in packed), packed
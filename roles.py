@@ -0,0 +1,8 @@
+# Roles offered on the setup page; the batch deck pipeline builds a deck for each
+ROLES = [
+    "Software Engineer",
+    "Product Manager",
+    "Data Scientist",
+    "UX Designer",
+    "Business Analyst",
+]
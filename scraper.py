@@ -3,8 +3,13 @@ from bs4 import BeautifulSoup
 from googlesearch import search
 import re
 import os
+import json
+import time
 from dotenv import load_dotenv
-from newspaper import Article
+from fetcher import fetch_all, DEFAULT_MAX_WORKERS
+from page_cache import PageCache
+from dedup import DedupReport
+from tracing import span
 from urllib.parse import urlencode
 from datetime import datetime
 
@@ -12,36 +17,75 @@ from datetime import datetime
 load_dotenv()
 API_KEY = os.getenv("SCRAPER_API")
 
-def search_websites(prompt):
-    websites = []
-    text = []
-    for url in search(prompt, num_results=7):
+PAGE_SEPARATOR = "\n\n---\n\n"
+
+
+def search_pages(prompt, num_results=7, max_workers=DEFAULT_MAX_WORKERS, on_page=None, cache=None):
+    with span("scrape.search"):
+        urls = list(search(prompt, num_results=num_results))
+    for url in urls:
         print(f"Fetching: {url}")
-        try:
-            article = Article(url)
-            article.download()
-            article.parse()
 
-            websites.append(article.html)
-            text.append(article.text.strip())
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
-            text.append('')
+    def report(result):
+        if not result.ok:
+            print(f"Error processing {result.url}: {result.error}")
+        if on_page is not None:
+            on_page(result)
 
-    return text
+    # Pages finish in any order; keep the text in search-rank order like the sequential version
+    with span("scrape.fetch_all", urls=len(urls)):
+        return fetch_all(urls, on_page=report, max_workers=max_workers, cache=cache)
+
+
+def search_websites(prompt, num_results=7, max_workers=DEFAULT_MAX_WORKERS, on_page=None, cache=None):
+    results = search_pages(prompt, num_results, max_workers, on_page, cache)
+    return [result.text for result in results]
 
-# --- MAIN EXECUTION ---
-prompt = input("Enter your prompt: ")
-texts = search_websites(prompt)
 
-# Join all scraped text into one string
-combined_text = "\n\n---\n\n".join(texts)
+def write_corpus(results, output_path, scraped_at=None, dedup=True, report=None):
+    """Write the joined page text plus the per-page sidecar that vector_store reads.
 
-# Save to file
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-raw_output_path = f"raw_model_output.txt"
+    With dedup, repeated boilerplate lines and near-duplicate pages are removed first;
+    pass a dedup.DedupReport as report to collect what was dropped.
+    """
+    from vector_store import pages_path
+
+    texts = [result.text or "" for result in results]
+    if dedup:
+        from dedup import clean_pages
+        with span("scrape.dedup"):
+            texts = [text or "" for text in clean_pages(texts, report)[0]]
+
+    scraped_at = int(scraped_at or time.time())
+    parts = []
+    pages = []
+    offset = 0
+    for result, text in zip(results, texts):
+        if parts:
+            offset += len(PAGE_SEPARATOR)
+        if text:
+            pages.append({"url": result.url, "scraped_at": scraped_at, "start": offset, "end": offset + len(text)})
+        parts.append(text)
+        offset += len(text)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(PAGE_SEPARATOR.join(parts))
+    with open(pages_path(output_path), "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(json.dumps(page) + "\n")
+    return pages
+
+# --- MAIN EXECUTION ---
+if __name__ == "__main__":
+    prompt = input("Enter your prompt: ")
+    page_cache = PageCache()
+    results = search_pages(prompt, cache=page_cache)
+    print(f"Page cache: {page_cache.stats()}")
 
-with open(raw_output_path, "w", encoding="utf-8") as f:
-    f.write(combined_text)
+    # Save the joined text to file, with page boundaries in the sidecar
+    raw_output_path = f"raw_model_output.txt"
+    dedup_report = DedupReport()
+    write_corpus(results, raw_output_path, report=dedup_report)
+    print(f"Dedup: {dedup_report.summary()}")
 
-print(f"Raw model output saved to {raw_output_path}")
\ No newline at end of file
+    print(f"Raw model output saved to {raw_output_path}")
\ No newline at end of file
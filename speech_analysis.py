@@ -73,11 +73,13 @@ def get_job(job_name, transcribe_client):
         return job
     
 
-#job1 = transcribe_text("test2", s3_uri, "mp4", "en-US", transcribe_client)
-#print(job1)
+if __name__ == "__main__":
+    # Fetching the job used to happen on import, so any importer paid for two network calls
+    #job1 = transcribe_text("test2", s3_uri, "mp4", "en-US", transcribe_client)
+    #print(job1)
 
-transcript_uri = get_job("test2", transcribe_client)["Transcript"]["TranscriptFileUri"]
-transcript_json = requests.get(transcript_uri).json()
-transcript_text = transcript_json["results"]["transcripts"][0]["transcript"]
+    transcript_uri = get_job("test2", transcribe_client)["Transcript"]["TranscriptFileUri"]
+    transcript_json = requests.get(transcript_uri).json()
+    transcript_text = transcript_json["results"]["transcripts"][0]["transcript"]
 
-print(transcript_text)
\ No newline at end of file
+    print(transcript_text)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import numpy as np
+
+DEFAULT_WINDOW = 30.0
+DEFAULT_STEP = 5.0
+LONG_PAUSE = 1.0
+PAUSE_BINS = (0.0, 0.25, 0.5, 1.0, 2.0, np.inf)
+
+
+def default_fillers():
+    # Without POS tags, only the lexicon entries that always count are safe to match
+    from filler_matcher import load_lexicon
+    return [entry["phrase"] for entry in load_lexicon() if not entry.get("when")]
+
+
+def items_to_columns(items):
+    """Turn Transcribe results.items into columnar arrays (punctuation rows dropped)."""
+    words = [
+        (item.get("start_time", "nan"), item.get("end_time", "nan"), item["alternatives"][0]["content"])
+        for item in items
+        if item.get("type") == "pronunciation" and item.get("alternatives")
+    ]
+    if not words:
+        return {"start": np.empty(0), "end": np.empty(0), "content": np.empty(0, dtype=str)}
+    start, end, content = zip(*words)
+    return {
+        "start": np.asarray(start, dtype=float),
+        "end": np.asarray(end, dtype=float),
+        "content": np.char.lower(np.asarray(content, dtype=str)),
+    }
+
+
+def filler_mask(content, fillers):
+    # Marks the first word of every filler occurrence; phrases are compared on shifted views
+    mask = np.zeros(len(content), dtype=bool)
+    for phrase in fillers:
+        words = phrase.lower().split()
+        n = len(words)
+        if n == 0 or n > len(content):
+            continue
+        hit = content[:len(content) - n + 1] == words[0]
+        for offset, word in enumerate(words[1:], start=1):
+            hit &= content[offset:len(content) - n + 1 + offset] == word
+        mask[:len(hit)] |= hit
+    return mask
+
+
+def _pause_stats(pauses, long_pause):
+    if not len(pauses):
+        return {"count": 0, "total": 0.0, "mean": 0.0, "median": 0.0, "p90": 0.0, "max": 0.0,
+                "long_pauses": 0, "histogram": [0] * (len(PAUSE_BINS) - 1)}
+    p50, p90 = np.percentile(pauses, [50, 90])
+    return {
+        "count": int(len(pauses)),
+        "total": round(float(pauses.sum()), 3),
+        "mean": round(float(pauses.mean()), 3),
+        "median": round(float(p50), 3),
+        "p90": round(float(p90), 3),
+        "max": round(float(pauses.max()), 3),
+        "long_pauses": int((pauses >= long_pause).sum()),
+        "histogram": np.histogram(pauses, bins=PAUSE_BINS)[0].tolist(),
+    }
+
+
+def compute_metrics(transcript_json, window=DEFAULT_WINDOW, step=DEFAULT_STEP, long_pause=LONG_PAUSE,
+                    fillers=None):
+    """Pause distribution, rolling WPM, filler density over time and rate variance.
+
+    Every statistic is computed with array operations over the word timestamps, so cost
+    stays flat per word even for hour-long recordings.
+    """
+    columns = items_to_columns(transcript_json.get("results", {}).get("items", []))
+    start, end, content = columns["start"], columns["end"], columns["content"]
+    order = np.argsort(start, kind="stable")
+    start, end, content = start[order], end[order], content[order]
+
+    duration = float(np.nanmax(end)) if len(end) else 0.0
+    pauses = np.clip(start[1:] - end[:-1], 0.0, None) if len(start) > 1 else np.empty(0)
+
+    # Windows end every `step` seconds and the last one at the end of the audio, so it
+    # is never padded with silence; early windows are shorter than `window`
+    window_ends = np.append(np.arange(step, duration, step), duration) if duration else np.empty(0)
+    window_starts = np.clip(window_ends - window, 0.0, None)
+    window_lengths = window_ends - window_starts
+    words_in_window = np.searchsorted(start, window_ends) - np.searchsorted(start, window_starts)
+    rolling_wpm = np.divide(words_in_window * 60.0, window_lengths,
+                            out=np.zeros(len(window_ends)), where=window_lengths > 0)
+
+    mask = filler_mask(content, default_fillers() if fillers is None else fillers)
+    filler_starts = start[mask]
+    fillers_in_window = np.searchsorted(filler_starts, window_ends) - np.searchsorted(filler_starts, window_starts)
+    filler_density = np.divide(fillers_in_window, words_in_window,
+                               out=np.zeros(len(window_ends)), where=words_in_window > 0)
+
+    # Variance over full-length windows only; partial leading windows would skew it
+    full = window_lengths >= window
+    steady_wpm = rolling_wpm[full] if full.any() else rolling_wpm
+    mean_wpm = float(steady_wpm.mean()) if len(steady_wpm) else 0.0
+
+    return {
+        "duration": round(duration, 3),
+        "words": int(len(start)),
+        "wpm": round(len(start) / (duration / 60), 1) if duration else 0.0,
+        "pauses": _pause_stats(pauses, long_pause),
+        "window_ends": window_ends,
+        "rolling_wpm": rolling_wpm,
+        "filler_times": filler_starts,
+        "filler_density": filler_density,
+        "rate_mean": round(mean_wpm, 1),
+        "rate_std": round(float(steady_wpm.std()), 1) if len(steady_wpm) else 0.0,
+        "rate_variance": round(float(steady_wpm.var()), 1) if len(steady_wpm) else 0.0,
+        "rate_cv": round(float(steady_wpm.std()) / mean_wpm, 3) if mean_wpm else 0.0,
+    }
+
+
+def print_metrics(metrics):
+    pauses = metrics["pauses"]
+    print("\n=== Timing Analysis ===")
+    print(f"Duration: {metrics['duration']} seconds, {metrics['words']} words, {metrics['wpm']} WPM overall")
+    print(f"Pauses: median {pauses['median']}s, p90 {pauses['p90']}s, longest {pauses['max']}s, "
+          f"{pauses['long_pauses']} over {LONG_PAUSE}s")
+    if len(metrics["rolling_wpm"]):
+        print(f"Rolling WPM: min {metrics['rolling_wpm'].min():.0f}, max {metrics['rolling_wpm'].max():.0f}, "
+              f"std {metrics['rate_std']} (cv {metrics['rate_cv']})")
+    if len(metrics["filler_density"]) and metrics["filler_density"].max() > 0:
+        peak = int(np.argmax(metrics["filler_density"]))
+        print(f"Filler density peaks at {metrics['filler_density'][peak] * 100:.1f}% "
+              f"in the window ending {metrics['window_ends'][peak]:.0f}s")
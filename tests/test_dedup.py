@@ -0,0 +1,44 @@
+from dedup import clean_pages
+
+NAV = "Home | Jobs | Interview Prep | Sign in"
+FOOTER = "Subscribe to our newsletter for weekly interview tips."
+
+
+def article(topic):
+    return "\n".join(
+        f"In the {topic} round, part {i}, the interviewer asked about {topic} trade-offs and "
+        f"how the design would change if traffic grew by a factor of {i + 2} over a year."
+        for i in range(8)
+    )
+
+
+def test_keeps_one_copy_of_a_mirrored_article():
+    original = article("caching")
+    other = article("sharding")
+    pages = [
+        original,
+        original + "\nShared by a mirror site",
+        "Mirror copy\n" + original,
+        other,
+    ]
+
+    kept, report = clean_pages(pages)
+
+    assert kept == [original, None, None, other]
+    assert report.pages_removed == 2
+    assert report.boilerplate_lines == 0
+
+
+def test_strips_page_furniture_but_not_repeated_questions():
+    pages = [
+        "\n".join([NAV, article(topic), "Tell me about yourself.", article(topic + " follow-up"), FOOTER])
+        for topic in ("caching", "sharding", "queueing", "indexing")
+    ]
+
+    kept, report = clean_pages(pages)
+
+    assert report.pages_removed == 0
+    for page in kept:
+        lines = page.splitlines()
+        assert NAV not in lines and FOOTER not in lines
+        assert "Tell me about yourself." in lines
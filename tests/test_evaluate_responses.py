@@ -0,0 +1,62 @@
+import pytest
+
+import rag_bot_clean
+from benchmarks.fake_openai import FakeOpenAI
+from rag_bot_clean import RAGBot
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(rag_bot_clean, "EVAL_BACKOFF_BASE", 0.01)
+
+
+def make_bot(fake):
+    bot = RAGBot(api_key="test", base_url=fake.base_url)
+    bot.qa_pairs = {f"q{i}": f"reference {i}" for i in range(50)}
+    return bot
+
+
+def pairs(count):
+    return [(f"q{i}", f"answer {i}") for i in range(count)]
+
+
+def test_results_come_back_in_input_order():
+    with FakeOpenAI(latency=0.01, jitter=0.1, seed=3) as fake:
+        results = make_bot(fake).evaluate_responses(pairs(12), max_concurrency=6)
+
+    assert [r.question for r in results] == [q for q, _ in pairs(12)]
+    for result, (question, _) in zip(results, pairs(12)):
+        assert result.ok
+        assert result.feedback.startswith(f"Feedback for: Question: {question}\n")
+
+
+def test_rate_limits_and_server_errors_are_retried():
+    with FakeOpenAI(latency=0.01, rate_limit_rate=0.3, error_rate=0.2, seed=1) as fake:
+        results = make_bot(fake).evaluate_responses(pairs(20), max_retries=10)
+
+    assert all(r.ok for r in results)
+    assert all(r.attempts >= 1 for r in results)
+    assert sum(r.attempts for r in results) == fake.requests
+    assert fake.requests > len(results)
+
+
+def test_persistent_failure_is_reported_on_its_own_item():
+    def fail(payload):
+        return "Question: q3\n" in payload["messages"][-1]["content"]
+
+    with FakeOpenAI(latency=0.01, fail=fail) as fake:
+        results = make_bot(fake).evaluate_responses(pairs(6), max_retries=2)
+
+    failed = results[3]
+    assert not failed.ok and failed.feedback is None
+    assert "InternalServerError" in failed.error
+    assert failed.attempts == 3
+    assert all(r.ok and r.attempts == 1 for i, r in enumerate(results) if i != 3)
+
+
+def test_concurrency_stays_within_the_limit():
+    with FakeOpenAI(latency=0.05, rate_limit_rate=0.2, seed=2) as fake:
+        results = make_bot(fake).evaluate_responses(pairs(30), max_concurrency=4, max_retries=10)
+
+    assert all(r.ok for r in results)
+    assert 1 < fake.max_in_flight <= 4
@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+import job_tracker
+from benchmarks.fake_aws import FakeTranscribeClient
+from transcription_backends import TranscriptionError
+
+
+def test_concurrent_waits_share_one_tracker():
+    client = FakeTranscribeClient(durations=(0.2, 0.5), fail=("job3",))
+    results = {}
+
+    def run(name):
+        client.start_transcription_job(name, {"MediaFileUri": f"s3://bucket/{name}"}, "m4a", "en-US")
+        try:
+            results[name] = job_tracker.wait_for_job(client, name, initial_delay=0.05, max_delay=0.2)
+        except TranscriptionError as e:
+            results[name] = e
+
+    threads = [threading.Thread(target=run, args=(f"job{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert isinstance(results.pop("job3"), TranscriptionError)
+    assert all(info["TranscriptionJobStatus"] == "COMPLETED" for info in results.values())
+    trackers = [t for (c, _), t in job_tracker._trackers.items() if c is client]
+    assert len(trackers) == 1 and not trackers[0].pending
+
+
+def test_wait_times_out():
+    client = FakeTranscribeClient(durations=(5.0, 5.0))
+    client.start_transcription_job("slow", {"MediaFileUri": "s3://bucket/slow"}, "m4a", "en-US")
+    with pytest.raises(TimeoutError):
+        job_tracker.wait_for_job(client, "slow", timeout=0.2, initial_delay=0.05)
@@ -0,0 +1,220 @@
+import atexit
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Off unless TRACING=1 (or TRACE_OUTPUT is set); disabled spans cost one attribute check
+TRACING = os.getenv("TRACING", "").lower() in ("1", "true", "yes") or bool(os.getenv("TRACE_OUTPUT"))
+# Written at exit: JSON, or Prometheus text format when the path ends in .prom
+TRACE_OUTPUT = os.getenv("TRACE_OUTPUT")
+METRIC_PREFIX = "inteltiber"
+# Seconds; spans from a 1 ms cache hit to a multi-minute transcription job
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+RECENT_SPANS = 500
+# Fields every recorded span has; attributes with these names are kept as "attr.<name>"
+SPAN_FIELDS = ("name", "parent", "started_at", "seconds", "error")
+
+_parent = contextvars.ContextVar("trace_parent", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        # Linear interpolation inside the bucket holding the q-th observation
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Tracer:
+    """Span timings aggregated into one latency histogram per span name, plus counters.
+
+    span() times a block and records it under its name (e.g. "scrape.fetch"); nested
+    spans remember their parent, and the most recent spans are kept with their
+    attributes for a per-request breakdown. add() accumulates counters such as token
+    counts. Everything is thread-safe and exported by to_json() or to_prometheus().
+    When disabled, span() hands back a shared no-op context manager and add() returns
+    immediately.
+    """
+
+    def __init__(self, enabled=TRACING, recent=RECENT_SPANS):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._recent = deque(maxlen=recent)
+
+    @contextmanager
+    def _span(self, name, attrs):
+        parent = _parent.get()
+        token = _parent.set(name)
+        started_at = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            _parent.reset(token)
+            self._record(name, seconds, parent, started_at, error, attrs)
+
+    def span(self, name, **attrs):
+        """Time a block as `name`; the yielded dict can take attributes set inside it."""
+        if not self.enabled:
+            return _NOOP
+        return self._span(name, attrs)
+
+    def record(self, name, seconds, parent=None, started_at=None, error=None, **attrs):
+        self._record(name, seconds, parent, started_at, error, attrs)
+
+    def _record(self, name, seconds, parent, started_at, error, attrs):
+        if not self.enabled:
+            return
+        entry = {"name": name, "parent": parent, "started_at": started_at, "seconds": round(seconds, 6),
+                 "error": error}
+        # An attribute such as seconds= must not overwrite the span's own fields
+        for key, value in attrs.items():
+            entry[f"attr.{key}" if key in SPAN_FIELDS else key] = value
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+            if error is not None:
+                self._counters[f"{name}.errors"] = self._counters.get(f"{name}.errors", 0) + 1
+            self._recent.append(entry)
+
+    def add(self, name, value=1):
+        if not self.enabled or not value:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._recent.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "spans": {name: h.to_dict() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+                "recent": list(self._recent),
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, default=str)
+
+    def to_prometheus(self, prefix=METRIC_PREFIX):
+        """Prometheus text exposition: one histogram labelled by span, one counter by name."""
+        lines = [f"# HELP {prefix}_span_seconds Time spent in each traced stage.",
+                 f"# TYPE {prefix}_span_seconds histogram"]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {histogram.sum}')
+                lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {histogram.count}')
+            lines += [f"# HELP {prefix}_events_total Counters recorded by traced stages (tokens, errors).",
+                      f"# TYPE {prefix}_events_total counter"]
+            for name, value in sorted(self._counters.items()):
+                lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One line per span name, slowest total first."""
+        spans = self.snapshot()["spans"]
+        rows = [f"{'span':<28} {'count':>6} {'total s':>9} {'p50 s':>8} {'p99 s':>8}"]
+        for name, h in sorted(spans.items(), key=lambda item: -item[1]["sum"]):
+            rows.append(f"{name:<28} {h['count']:>6} {h['sum']:>9.3f} {h['p50']:>8.3f} {h['p99']:>8.3f}")
+        return "\n".join(rows)
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus() if path.endswith(".prom") else self.to_json())
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+tracer = Tracer()
+
+
+def span(name, **attrs):
+    return tracer.span(name, **attrs)
+
+
+def add(name, value=1):
+    tracer.add(name, value)
+
+
+def traced(name):
+    """Decorator form of span() for whole functions."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+if TRACE_OUTPUT:
+    atexit.register(lambda: tracer.write(TRACE_OUTPUT))
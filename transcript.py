@@ -1,16 +1,18 @@
 import os
 import boto3
+from boto3.s3.transfer import TransferConfig
 from dotenv import load_dotenv
-import requests
 import re
-import time
-from collections import Counter
-import spacy
+import threading
+import uuid
+from itertools import repeat
+from filler_matcher import FillerMatcher, load_lexicon, load_pipeline
+from speech_metrics import compute_metrics, print_metrics
+from audio_ingest import ingest_path, cached_transcript, store_transcript
 from datetime import datetime
-from amazon_transcribe.client import TranscribeStreamingClient
-from amazon_transcribe.handlers import TranscriptResultStreamHandler
-from amazon_transcribe.model import TranscriptEvent
 import json
+from transcription_backends import get_backend, TranscriptionError
+from tracing import span, traced
 
 load_dotenv()
 access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
@@ -20,20 +22,25 @@ region = os.getenv("AWS_REGION")
 transcribe_client = boto3.client('transcribe', region_name=region, aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key)
 s3 = boto3.client('s3', region_name=region, aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key)
 s3_bucket = 'forenses-transcribe'
+# Files over the threshold go up as parallel multipart uploads, streamed from disk part by part
+s3_transfer_config = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024,
+                                    max_concurrency=4)
 
 def upload_to_s3(file_name, bucket, object_name=None):
     if object_name is None:
         object_name = file_name
     try:
-        s3.upload_file(file_name, bucket, object_name)
+        with span("transcribe.upload", bytes=os.path.getsize(file_name)):
+            s3.upload_file(file_name, bucket, object_name, Config=s3_transfer_config)
     except Exception as e:
         print(e)
         return False
     return True
 
 def generate_unique_job_name(base_name="transcribe_job"):
+    # The random suffix keeps uploads started in the same second from colliding
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    return f"{base_name}_{timestamp}"
+    return f"{base_name}_{timestamp}_{uuid.uuid4().hex[:12]}"
 
 def transcribe_text(job_name, media_uri, media_format, language_code, transcribe_client, vocabulary_name=None):
     try:
@@ -62,12 +69,34 @@ def get_job(job_name, transcribe_client):
         print(f"Couldn't get job {job_name}.")
         raise
 
-nlp = spacy.load("en_core_web_sm")
-
-filler_words = {
-    'um', 'uh', 'like', 'you know', 'sort of', 'kind of', 'basically',
-    'actually', 'literally', 'just', 'really', 'so', 'well', 'right', 'i mean'
-}
+# The spaCy pipeline and filler lexicon (for FILLER_LANGUAGE, or a JSON lexicon file, see
+# filler_matcher) load on first analysis, so transcription alone never needs the model
+_nlp = None
+_filler_matcher = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    global _nlp, _filler_matcher
+    with _nlp_lock:
+        if _nlp is None:
+            nlp = load_pipeline()
+            _filler_matcher = FillerMatcher(nlp, load_lexicon())
+            _nlp = nlp
+        return _nlp
+
+def get_filler_matcher():
+    get_nlp()
+    return _filler_matcher
+
+def __getattr__(name):
+    # Keeps transcript.nlp, transcript.filler_matcher and transcript.filler_words working
+    if name == "nlp":
+        return get_nlp()
+    if name == "filler_matcher":
+        return get_filler_matcher()
+    if name == "filler_words":
+        return set(get_filler_matcher().phrases)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_audio_duration_from_transcript(transcript_json):
     items = transcript_json.get("results", {}).get("items", [])
@@ -77,61 +106,42 @@ def get_audio_duration_from_transcript(transcript_json):
     return 0.0
 
 def count_words_spacy(transcript_text):
-    doc = nlp(transcript_text.lower())
+    doc = get_nlp()(transcript_text.lower())
     return len([t for t in doc if not t.is_punct])
 
-def is_probable_filler(token):
-    if token.text == 'just':
-        return token.pos_ == 'ADV'
-    elif token.text == 'like':
-        return token.pos_ == 'INTJ' or (token.pos_ == 'VERB' and token.dep_ == 'discourse')
-    elif token.text == 'so':
-        return token.pos_ == 'ADV' and token.dep_ == 'discourse'
-    elif token.text == 'well':
-        return token.pos_ == 'INTJ'
-    elif token.text == 'right':
-        return token.pos_ in {'INTJ', 'ADV'}
-    elif token.text == 'really':
-        return token.pos_ == 'ADV'
-    elif token.text == 'actually':
-        return token.pos_ == 'ADV'
-    elif token.text in {'um', 'uh'}:
-        return True
-    elif token.text in {'you know', 'i mean', 'sort of', 'kind of', 'basically', 'literally'}:
-        return True
-    return False
-
-def analyze_filler_words(transcript_text):
-    doc = nlp(transcript_text.lower())
-    total_words = len([t for t in doc if not t.is_punct])
-    filler_counts = Counter()
-    total_filler_words = 0
-
-    for token in doc:
-        if token.text in filler_words and is_probable_filler(token):
-            filler_counts[token.text] += 1
-            total_filler_words += 1
-
-    text_str = doc.text
-    multi_word_fillers = [f for f in filler_words if " " in f]
-    for mwf in multi_word_fillers:
-        count = text_str.count(mwf)
-        if count > 0:
-            filler_counts[mwf] += count
-            total_filler_words += count
+def analyze_doc(doc, duration=None):
+    words = [t for t in doc if not t.is_punct]
+    total_words = len(words)
+    filler_counts = get_filler_matcher().count(doc)
 
+    total_filler_words = sum(filler_counts.values())
     filler_percentages = {
         word: round((count / total_words) * 100, 2)
         for word, count in filler_counts.items()
-    }
+    } if total_words else {}
 
     return {
         'total_words': total_words,
         'filler_word_counts': filler_counts,
         'filler_word_percentages': filler_percentages,
-        'total_filler_words': total_filler_words
+        'total_filler_words': total_filler_words,
+        'duration': duration,
+        'wpm': round(total_words / (duration / 60)) if duration else 0
     }
 
+@traced("speech.analyze")
+def analyze_transcript(transcript_text, duration=None):
+    # Single spaCy pass for word count, filler stats and WPM
+    return analyze_doc(get_nlp()(transcript_text.lower()), duration)
+
+@traced("speech.analyze_batch")
+def analyze_transcripts(transcript_texts, durations=None, n_process=1, batch_size=64):
+    docs = get_nlp().pipe((text.lower() for text in transcript_texts), n_process=n_process, batch_size=batch_size)
+    return [analyze_doc(doc, duration) for doc, duration in zip(docs, durations or repeat(None))]
+
+def analyze_filler_words(transcript_text):
+    return analyze_transcript(transcript_text)
+
 def print_analysis(analysis_results):
     print("\n=== Filler Word Analysis ===")
     print(f"Total words in transcript: {analysis_results['total_words']}")
@@ -150,53 +160,82 @@ def print_analysis(analysis_results):
     total_percentage = (analysis_results['total_filler_words'] / analysis_results['total_words']) * 100
     print(f"Overall filler word percentage: {total_percentage:.2f}%")
 
-def main():
-    local_file = st.session_state.get("uploaded_audio_path", "tmp/default.wav")
-    s3_key = os.path.basename(local_file)
-
-    if not upload_to_s3(local_file, s3_bucket, s3_key):
-        print("Failed to upload file to S3.")
-        return
-
-    job_name = generate_unique_job_name()
-    media_uri = f"s3://{s3_bucket}/{s3_key}"
+def report_transcript(transcript_json):
+    transcript_text = transcript_json["results"]["transcripts"][0]["transcript"]
+    transcript_time = round(get_audio_duration_from_transcript(transcript_json), 2)
+    analysis_results = analyze_transcript(transcript_text, transcript_time)
+    transcript_words = analysis_results['total_words']
+    transcript_wpm = analysis_results['wpm']
+
+    print("\nTranscription result:")
+    print(transcript_text)
+
+    print("\nNumber of Words: ")
+    print(transcript_words)
+
+    print("\nTime: ")
+    print(f"{transcript_time} seconds")
+
+    print("\nWPM: ")
+    print(transcript_wpm)
+
+    print_analysis(analysis_results)
+    print_metrics(compute_metrics(transcript_json))
+
+def transcribe_audio(audio, backend=None, on_partial=None):
+    # Recordings are keyed by content hash, so re-uploading the same file skips transcription
+    transcript_json = cached_transcript(audio.sha256)
+    if transcript_json is not None:
+        print(f"Using cached transcript for {audio.path}")
+        return transcript_json
+
+    with span("transcribe.total", backend=backend or "default"):
+        for transcript_json in get_backend(backend).stream(audio.path, audio.media_format):
+            if transcript_json.get("status") != "COMPLETED" and on_partial is not None:
+                on_partial(transcript_json)
+    store_transcript(audio.sha256, transcript_json)
+    return transcript_json
+
+def print_partial(transcript_json):
+    partial_text = transcript_json["results"]["transcripts"][0]["transcript"]
+    print(f"Partial transcript: {count_words_spacy(partial_text)} words so far")
+
+def run_transcription(audio_path, backend=None):
+    # Transcribe and analyse one recording; returns a JSON-serialisable summary for callers
+    # such as the Practice page's background jobs
+    audio = ingest_path(audio_path)
+    transcript_json = transcribe_audio(audio, backend)
+    transcript_text = transcript_json["results"]["transcripts"][0]["transcript"]
+    transcript_time = round(get_audio_duration_from_transcript(transcript_json), 2)
+    analysis_results = analyze_transcript(transcript_text, transcript_time)
+    with span("speech.metrics"):
+        metrics = compute_metrics(transcript_json)
+    return {
+        "audio_sha256": audio.sha256,
+        "transcript": transcript_text,
+        "total_words": analysis_results['total_words'],
+        "duration": transcript_time,
+        "wpm": analysis_results['wpm'],
+        "filler_word_counts": dict(analysis_results['filler_word_counts']),
+        "filler_word_percentages": analysis_results['filler_word_percentages'],
+        "total_filler_words": analysis_results['total_filler_words'],
+        "pauses": metrics["pauses"],
+        "rate_std": metrics["rate_std"],
+        "window_ends": metrics["window_ends"].tolist(),
+        "rolling_wpm": metrics["rolling_wpm"].tolist(),
+        "filler_density": metrics["filler_density"].tolist(),
+    }
 
+def main(local_file="tmp/default.wav", backend=None):
     try:
-        transcribe_text(job_name, media_uri, "m4a", "en-US", transcribe_client)
-
-        while True:
-            job_info = get_job(job_name, transcribe_client)
-            status = job_info["TranscriptionJobStatus"]
-            if status in ["COMPLETED", "FAILED"]:
-                break
-            time.sleep(5)
-
-        if status == "COMPLETED":
-            transcript_uri = job_info["Transcript"]["TranscriptFileUri"]
-            transcript_json = requests.get(transcript_uri).json()
-            transcript_text = transcript_json["results"]["transcripts"][0]["transcript"]
-            transcript_words = count_words_spacy(transcript_text)
-            transcript_time = round(get_audio_duration_from_transcript(transcript_json), 2)
-            transcript_wpm = round(transcript_words / (transcript_time / 60))
-
-            print("\nTranscription result:")
-            print(transcript_text)
-
-            print("\nNumber of Words: ")
-            print(transcript_words)
-
-            print("\nTime: ")
-            print(f"{transcript_time} seconds")
-
-            print("\nWPM: ")
-            print(transcript_wpm)
-
-            analysis_results = analyze_filler_words(transcript_text)
-            print_analysis(analysis_results)
-        else:
-            print(f"Transcription job failed: {job_info}")
+        audio = ingest_path(local_file)
+        transcript_json = transcribe_audio(audio, backend, on_partial=print_partial)
+        report_transcript(transcript_json)
+    except TranscriptionError as e:
+        print(e)
     except Exception as e:
         print(f"Error in main execution: {e}")
 
 if __name__ == "__main__":
-    main()
+    import sys
+    main(*sys.argv[1:2])
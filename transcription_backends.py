@@ -0,0 +1,166 @@
+import os
+import string
+from abc import ABC, abstractmethod
+
+import requests
+
+from tracing import span
+
+DEFAULT_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "aws")
+LOCAL_MODEL = os.getenv("LOCAL_TRANSCRIBE_MODEL", "openai/whisper-tiny.en")
+SAMPLE_RATE = 16000
+
+
+class TranscriptionError(Exception):
+    pass
+
+
+def build_transcript_json(words, job_name="local", status="COMPLETED"):
+    """Build an Amazon Transcribe style result from (text, start, end) word tuples.
+
+    Trailing punctuation becomes its own "punctuation" item without timestamps, the
+    same way Transcribe reports it, so get_audio_duration_from_transcript and
+    analyze_filler_words can consume either backend's output.
+    """
+    items = []
+    transcript_parts = []
+    for text, start, end in words:
+        text = text.strip()
+        core = text.rstrip(string.punctuation)
+        trailing = text[len(core):]
+        if core:
+            items.append({
+                "start_time": f"{start:.3f}",
+                "end_time": f"{end:.3f}",
+                "alternatives": [{"confidence": "1.0", "content": core}],
+                "type": "pronunciation",
+            })
+            transcript_parts.append(core)
+        for mark in trailing:
+            items.append({
+                "alternatives": [{"confidence": "0.0", "content": mark}],
+                "type": "punctuation",
+            })
+        if trailing:
+            if transcript_parts:
+                transcript_parts[-1] += trailing
+            else:
+                transcript_parts.append(trailing)
+    return {
+        "jobName": job_name,
+        "status": status,
+        "results": {
+            "transcripts": [{"transcript": " ".join(transcript_parts)}],
+            "items": items,
+        },
+    }
+
+
+class TranscriptionBackend(ABC):
+    name = None
+
+    @abstractmethod
+    def stream(self, audio_path, media_format=None):
+        """Yield cumulative transcript JSON snapshots; the last one has status COMPLETED."""
+
+    def transcribe(self, audio_path, media_format=None):
+        transcript_json = None
+        for transcript_json in self.stream(audio_path, media_format):
+            pass
+        return transcript_json
+
+
+class AWSTranscribeBackend(TranscriptionBackend):
+    # Upload to S3, run a Transcribe batch job and download the finished JSON
+    name = "aws"
+
+    def __init__(self, bucket=None, language_code="en-US", timeout=None, **tracker_kwargs):
+        self.bucket = bucket
+        self.language_code = language_code
+        self.timeout = timeout
+        self.tracker_kwargs = tracker_kwargs
+
+    def stream(self, audio_path, media_format="m4a"):
+        import transcript
+        from job_tracker import wait_for_job
+
+        bucket = self.bucket or transcript.s3_bucket
+        s3_key = os.path.basename(audio_path)
+        if not transcript.upload_to_s3(audio_path, bucket, s3_key):
+            raise TranscriptionError("Failed to upload file to S3.")
+
+        job_name = transcript.generate_unique_job_name()
+        media_uri = f"s3://{bucket}/{s3_key}"
+        transcript.transcribe_text(job_name, media_uri, media_format or "m4a", self.language_code,
+                                   transcript.transcribe_client)
+
+        with span("transcribe.wait", job=job_name):
+            job_info = wait_for_job(transcript.transcribe_client, job_name, self.timeout, **self.tracker_kwargs)
+        transcript_uri = job_info["Transcript"]["TranscriptFileUri"]
+        with span("transcribe.download"):
+            transcript_json = requests.get(transcript_uri).json()
+        transcript_json.setdefault("status", "COMPLETED")
+        yield transcript_json
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    # Runs a Whisper model on CPU over fixed-length chunks of the audio and yields the
+    # transcript so far after each chunk, so analysis can begin before the file is done.
+    name = "local"
+    _pipelines = {}
+
+    def __init__(self, model_name=LOCAL_MODEL, chunk_seconds=30, device="cpu"):
+        self.model_name = model_name
+        self.chunk_seconds = chunk_seconds
+        self.device = device
+
+    @property
+    def pipeline(self):
+        key = (self.model_name, self.device)
+        if key not in self._pipelines:
+            from transformers import pipeline
+            self._pipelines[key] = pipeline("automatic-speech-recognition", model=self.model_name,
+                                            device=self.device)
+        return self._pipelines[key]
+
+    def load_audio(self, audio_path):
+        import torchaudio
+
+        waveform, sample_rate = torchaudio.load(audio_path)
+        waveform = waveform.mean(dim=0)
+        if sample_rate != SAMPLE_RATE:
+            waveform = torchaudio.functional.resample(waveform, sample_rate, SAMPLE_RATE)
+        return waveform.numpy()
+
+    def stream(self, audio_path, media_format=None):
+        audio = self.load_audio(audio_path)
+        job_name = f"local_{os.path.basename(audio_path)}"
+        chunk_size = int(self.chunk_seconds * SAMPLE_RATE)
+        words = []
+        for offset in range(0, len(audio), chunk_size):
+            chunk = audio[offset:offset + chunk_size]
+            offset_seconds = offset / SAMPLE_RATE
+            with span("transcribe.local_chunk", audio_seconds=len(chunk) / SAMPLE_RATE):
+                output = self.pipeline({"raw": chunk, "sampling_rate": SAMPLE_RATE}, return_timestamps="word")
+            for word in output.get("chunks", []):
+                start, end = word["timestamp"]
+                start = offset_seconds + (start or 0.0)
+                end = offset_seconds + (end if end is not None else len(chunk) / SAMPLE_RATE)
+                words.append((word["text"], start, end))
+            done = offset + chunk_size >= len(audio)
+            yield build_transcript_json(words, job_name, "COMPLETED" if done else "IN_PROGRESS")
+        if not len(audio):
+            yield build_transcript_json([], job_name)
+
+
+BACKENDS = {
+    AWSTranscribeBackend.name: AWSTranscribeBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+}
+
+
+def get_backend(name=None, **kwargs):
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend {name!r}; choose from {sorted(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,295 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from retrieval import matches_where, normalize
+
+DEFAULT_INDEX_DIR = os.path.join(".cache", "index")
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float16")
+DTYPES = ("float32", "float16", "int8")
+BACKENDS = ("flat", "hnsw", "ivfpq")
+# Rows scored per block in flat search, so float16/int8 storage is widened to float32
+# a slice at a time instead of materialising the whole matrix
+SEARCH_BLOCK = 16384
+# With a filter, ANN backends over-fetch this many times n and filter afterwards
+FILTER_OVERFETCH = 8
+
+# Chroma's own HNSW settings, applied when a collection is first created
+CHROMA_HNSW = {
+    "hnsw:space": "cosine",
+    "hnsw:M": int(os.getenv("CHROMA_HNSW_M", "16")),
+    "hnsw:construction_ef": int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "100")),
+    "hnsw:search_ef": int(os.getenv("CHROMA_HNSW_SEARCH_EF", "64")),
+}
+
+# Scalar quantizer used for the vectors inside an HNSW graph, by index dtype
+HNSW_QTYPES = {"float16": "QT_fp16", "int8": "QT_8bit"}
+
+DEFAULT_PARAMS = {
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 64},
+    "ivfpq": {"nlist": None, "m": None, "nbits": 8, "nprobe": 16},
+}
+
+
+def quantize(vectors, dtype=VECTOR_DTYPE):
+    """Unit-normalise and store vectors as float32, float16 or int8.
+
+    int8 uses one symmetric scale per dimension; returns (stored array, scale or None).
+    """
+    vectors = normalize(vectors)
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scale = np.abs(vectors).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+        return np.round(vectors / scale).astype(np.int8), scale.astype(np.float32)
+    raise ValueError(f"Unknown vector dtype {dtype!r}; choose from {DTYPES}")
+
+
+def dequantize(stored, scale=None):
+    vectors = np.asarray(stored, dtype=np.float32)
+    return vectors * scale if scale is not None else vectors
+
+
+def _faiss():
+    try:
+        import faiss
+    except ImportError:
+        raise ImportError("The hnsw and ivfpq vector backends need faiss: pip install faiss-cpu")
+    return faiss
+
+
+def _ivfpq_params(n, dim, params):
+    params = dict(params)
+    # About 4 * sqrt(n) lists, with enough points per list to train the quantizer
+    params["nlist"] = params["nlist"] or max(1, min(int(4 * np.sqrt(n)), n // 39))
+    if not params["m"]:
+        # Sub-quantizers must divide dim; at least four dimensions each keeps codes useful
+        params["m"] = next(m for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1) if dim % m == 0 and m <= max(1, dim // 4))
+    return params
+
+
+def build_faiss(vectors, backend, params, dtype=VECTOR_DTYPE):
+    faiss = _faiss()
+    n, dim = vectors.shape
+    if backend == "hnsw":
+        # The graph keeps its own copy of the vectors, stored at the index dtype
+        qtype = HNSW_QTYPES.get(dtype)
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dim, params["M"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWSQ(dim, getattr(faiss.ScalarQuantizer, qtype), params["M"],
+                                      faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+        index.hnsw.efConstruction = params["ef_construction"]
+        index.add(vectors)
+        return index
+    quantizer = faiss.IndexFlatIP(dim)
+    index = faiss.IndexIVFPQ(quantizer, dim, params["nlist"], params["m"], params["nbits"],
+                             faiss.METRIC_INNER_PRODUCT)
+    index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+class VectorIndex:
+    """A directory holding a quantized embedding matrix, the chunk texts and metadata,
+    and optionally a faiss HNSW or IVF-PQ graph over the same vectors.
+
+    The matrix is opened with np.load(mmap_mode="r") and faiss indexes are read with
+    IO_FLAG_MMAP where the index type supports it, so opening a large index costs little
+    until queries touch it. IVF-PQ maps; an HNSW graph is read into memory, with its
+    vectors scalar-quantized to the index dtype. IVF-PQ needs at least 2**nbits vectors
+    to train, so smaller collections are built as flat indexes instead. search() has
+    the same shape as retrieval.ArrayCandidates, so a VectorIndex can back a Retriever
+    directly; the vectors handed to MMR are dequantized rows of the stored matrix.
+    """
+
+    def __init__(self, path, config, vectors, scale, ids, texts, metadatas, faiss_index=None):
+        self.path = path
+        self.config = config
+        self.vectors = vectors
+        self.scale = scale
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.faiss_index = faiss_index
+        self._filtered = {}
+
+    @property
+    def backend(self):
+        return self.config["backend"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nbytes(self):
+        # On-disk size of the vector data (matrix plus any faiss index)
+        return sum(os.path.getsize(os.path.join(self.path, name))
+                   for name in ("vectors.npy", "index.faiss") if os.path.exists(os.path.join(self.path, name)))
+
+    def set_search_params(self, ef_search=None, nprobe=None):
+        if self.faiss_index is None:
+            return
+        if ef_search is not None and self.backend == "hnsw":
+            self.faiss_index.hnsw.efSearch = ef_search
+        if nprobe is not None and self.backend == "ivfpq":
+            self.faiss_index.nprobe = nprobe
+
+    def _positions(self, where):
+        key = json.dumps(where, sort_keys=True)
+        if key not in self._filtered:
+            self._filtered[key] = np.flatnonzero([matches_where(m, where) for m in self.metadatas])
+        return self._filtered[key]
+
+    def _flat_search(self, query_vectors, n, positions=None):
+        total = len(self.ids) if positions is None else len(positions)
+        n = min(n, total)
+        queries = query_vectors * self.scale if self.scale is not None else query_vectors
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for offset in range(0, total, SEARCH_BLOCK):
+            rows = np.arange(offset, min(offset + SEARCH_BLOCK, total))
+            if positions is not None:
+                rows = positions[rows]
+            block = np.asarray(self.vectors[rows], dtype=np.float32)
+            # Merge this block's scores with the running top n
+            scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+            candidates = np.concatenate([best_rows, np.broadcast_to(rows, (len(queries), len(rows)))], axis=1)
+            if scores.shape[1] > n:
+                keep = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                candidates = np.take_along_axis(candidates, keep, axis=1)
+            best_scores, best_rows = scores, candidates
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_rows, order, axis=1)
+
+    def _ann_search(self, query_vectors, n, where):
+        fetch = n * FILTER_OVERFETCH if where else n
+        _, rows = self.faiss_index.search(np.ascontiguousarray(query_vectors, dtype=np.float32), fetch)
+        results = []
+        for hits in rows:
+            hits = [int(row) for row in hits if row >= 0]
+            if where:
+                hits = [row for row in hits if matches_where(self.metadatas[row], where)]
+            results.append(hits[:n])
+        return results
+
+    def search(self, query_vectors, n, where=None):
+        query_vectors = normalize(query_vectors)
+        if n <= 0 or not len(self.ids):
+            rows = [[] for _ in query_vectors]
+        elif self.faiss_index is not None:
+            rows = self._ann_search(query_vectors, n, where)
+            if where and any(len(hits) < n for hits in rows):
+                # A selective filter can empty the over-fetched set; fall back to exact search
+                positions = self._positions(where)
+                if len(positions):
+                    rows = [list(hits) for hits in self._flat_search(query_vectors, n, positions)]
+        else:
+            positions = self._positions(where) if where else None
+            if positions is not None and not len(positions):
+                rows = [[] for _ in query_vectors]
+            else:
+                rows = [list(hits) for hits in self._flat_search(query_vectors, n, positions)]
+
+        results = []
+        for hits in rows:
+            hits = [int(row) for row in hits]
+            results.append((
+                [self.ids[row] for row in hits], [self.texts[row] for row in hits],
+                [self.metadatas[row] for row in hits], dequantize(self.vectors[hits], self.scale),
+            ))
+        return results
+
+
+def build_index(path, vectors, texts, metadatas=None, ids=None, backend="flat", dtype=VECTOR_DTYPE,
+                source_hash=None, model_key=None, **params):
+    """Write a VectorIndex to path and return it opened."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector backend {backend!r}; choose from {BACKENDS}")
+    start = time.perf_counter()
+    os.makedirs(path, exist_ok=True)
+    vectors = normalize(vectors)
+    texts = list(texts)
+    ids = list(ids) if ids is not None else [str(i) for i in range(len(texts))]
+    metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+
+    stored, scale = quantize(vectors, dtype)
+    np.save(os.path.join(path, "vectors.npy"), stored)
+    if scale is not None:
+        np.save(os.path.join(path, "scale.npy"), scale)
+    with open(os.path.join(path, "docs.json"), "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "texts": texts, "metadatas": metadatas}, f)
+
+    config = {"backend": backend, "dtype": dtype, "count": len(ids), "dim": int(vectors.shape[1]),
+              "source_hash": source_hash, "embedding": model_key}
+    if backend == "ivfpq" and len(ids) < 2 ** params.get("nbits", DEFAULT_PARAMS["ivfpq"]["nbits"]):
+        # Too few points to train the product quantizer; exact search is cheap at this size
+        print(f"Only {len(ids)} vectors, building a flat index instead of ivfpq")
+        config["backend"] = "flat"
+        config["requested_backend"] = backend
+    elif backend != "flat":
+        settings = dict(DEFAULT_PARAMS[backend], **params)
+        if backend == "ivfpq":
+            settings = _ivfpq_params(len(ids), vectors.shape[1], settings)
+        _faiss().write_index(build_faiss(vectors, backend, settings, dtype), os.path.join(path, "index.faiss"))
+        config["params"] = settings
+    config["build_seconds"] = round(time.perf_counter() - start, 3)
+    with open(os.path.join(path, "config.json"), "w") as f:
+        json.dump(config, f)
+    return open_index(path)
+
+
+def read_config(path):
+    try:
+        with open(os.path.join(path, "config.json"), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def open_index(path, mmap=True):
+    config = read_config(path)
+    if config is None:
+        raise FileNotFoundError(f"No vector index at {path}")
+    mmap_mode = "r" if mmap else None
+    vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+    scale_path = os.path.join(path, "scale.npy")
+    scale = np.load(scale_path) if os.path.exists(scale_path) else None
+    with open(os.path.join(path, "docs.json"), "r", encoding="utf-8") as f:
+        docs = json.load(f)
+
+    faiss_index = None
+    if config["backend"] != "flat":
+        faiss = _faiss()
+        index_path = os.path.join(path, "index.faiss")
+        try:
+            faiss_index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP if mmap else 0)
+        except RuntimeError:
+            # Not every index type can be memory-mapped
+            faiss_index = faiss.read_index(index_path)
+    index = VectorIndex(path, config, vectors, scale, docs["ids"], docs["texts"], docs["metadatas"], faiss_index)
+    params = config.get("params", {})
+    index.set_search_params(params.get("ef_search"), params.get("nprobe"))
+    return index
+
+
+def sync_index(vectorstore, path, source_hash, backend=VECTOR_BACKEND, dtype=VECTOR_DTYPE, model_key=None,
+               **params):
+    """Open the index at path, rebuilding it from the Chroma collection when its
+    source hash, embedding model, backend or dtype no longer match."""
+    config = read_config(path)
+    if config and config.get("source_hash") == source_hash and config.get("embedding") == model_key \
+            and config.get("requested_backend", config["backend"]) == backend and config["dtype"] == dtype:
+        return open_index(path)
+    data = vectorstore.get(include=["embeddings", "documents", "metadatas"])
+    if not len(data["ids"]):
+        return None
+    return build_index(path, np.asarray(data["embeddings"], dtype=np.float32), data["documents"],
+                       data["metadatas"], data["ids"], backend, dtype, source_hash, model_key, **params)
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import Chroma
+
+from dedup import DedupReport, dedup_chunks
+from tracing import span
+
+DEFAULT_PERSIST_DIR = os.path.join(".cache", "chroma")
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+# Chroma rejects very large add() calls; stay well under its max batch size
+ADD_BATCH_SIZE = 1000
+
+
+def chunk_id(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def collection_name_for(data_path, model_key=None):
+    # Chroma names must be 3-63 chars of [A-Za-z0-9._-] starting and ending alphanumeric.
+    # Each embedding model gets its own collection, since their vectors differ in size and meaning.
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", os.path.splitext(os.path.basename(data_path))[0])[:40]
+    source = os.path.abspath(data_path) + "|" + (model_key or "")
+    path_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+    return f"rag_{stem}_{path_hash}"
+
+
+def pages_path(data_path):
+    # Sidecar written by the scraper: one JSON line per page with its url, scrape time
+    # and [start, end) character offsets into the combined text file
+    return f"{os.path.splitext(data_path)[0]}.pages.jsonl"
+
+
+def load_pages(data_path):
+    try:
+        with open(pages_path(data_path), "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+
+
+def split_chunks(text, source, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, pages=None, report=None):
+    """Split text into content-addressed chunks, dropping near-duplicates.
+
+    With a pages sidecar each page is split on its own and its chunks carry the page's
+    url and scraped_at, which retrieval can filter on. Pass a dedup.DedupReport as
+    report to count the chunks removed.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    if pages:
+        texts = [text[page["start"]:page["end"]] for page in pages]
+        metadatas = [{"source": source, "url": page["url"], "scraped_at": page["scraped_at"]} for page in pages]
+    else:
+        texts, metadatas = [text], [{"source": source}]
+    docs = splitter.create_documents(texts, metadatas=metadatas)
+    chunks = {}
+    for doc in docs:
+        # Identical chunks (repeated boilerplate) collapse onto one id
+        chunks.setdefault(chunk_id(doc.page_content), doc)
+    # Near-identical ones (the same passage quoted on two pages) are found with MinHash
+    ids = list(chunks)
+    keep, _ = dedup_chunks([chunks[cid].page_content for cid in ids], report)
+    return {ids[i]: chunks[ids[i]] for i in keep}
+
+
+def _manifest_path(persist_dir, collection_name):
+    return os.path.join(persist_dir, f"{collection_name}.manifest.json")
+
+
+def _load_manifest(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def sync_vectorstore(data_path, embedding, persist_dir=DEFAULT_PERSIST_DIR,
+                     chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, collection_metadata=None):
+    """Open the persisted collection for data_path and bring it in line with the file.
+
+    Chunks are keyed by the sha256 of their content, so only new or changed chunks
+    are embedded and chunks that disappeared from the source are deleted. If the
+    source file hash, chunking settings and embedding model match the last sync,
+    nothing is re-read. The collection name includes the embedding's model_key, so
+    switching models syncs into a fresh collection instead of mixing vectors.
+    collection_metadata (such as vector_index.CHROMA_HNSW) only applies when the
+    collection is first created.
+    """
+    start = time.perf_counter()
+    os.makedirs(persist_dir, exist_ok=True)
+    model_key = getattr(embedding, "model_key", None)
+    collection_name = collection_name_for(data_path, model_key)
+    vectorstore = Chroma(
+        collection_name=collection_name,
+        embedding_function=embedding,
+        persist_directory=persist_dir,
+        collection_metadata=collection_metadata,
+    )
+
+    manifest_path = _manifest_path(persist_dir, collection_name)
+    manifest = _load_manifest(manifest_path)
+    pages = load_pages(data_path)
+    source_hash = file_hash(data_path)
+    if pages is not None:
+        source_hash += ":" + file_hash(pages_path(data_path))
+    settings = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "embedding": model_key}
+    stats = {"collection": collection_name, "added": 0, "deleted": 0, "warm": False, "source_hash": source_hash,
+             "embedding": model_key}
+
+    if manifest.get("source_hash") == source_hash and manifest.get("settings") == settings:
+        stats["warm"] = True
+        stats["chunks"] = manifest.get("chunks", 0)
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        return vectorstore, stats
+
+    with open(data_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    # A chunk already stored keeps the metadata from when it was first embedded
+    dedup_report = DedupReport()
+    with span("vectorstore.split"):
+        chunks = split_chunks(text, data_path, chunk_size, chunk_overlap, pages, dedup_report)
+
+    existing = set(vectorstore.get(include=[])["ids"])
+    stale = list(existing - chunks.keys())
+    new_ids = [cid for cid in chunks if cid not in existing]
+
+    if stale:
+        vectorstore.delete(ids=stale)
+    with span("vectorstore.embed", chunks=len(new_ids)):
+        for i in range(0, len(new_ids), ADD_BATCH_SIZE):
+            batch = new_ids[i:i + ADD_BATCH_SIZE]
+            vectorstore.add_texts(
+                texts=[chunks[cid].page_content for cid in batch],
+                metadatas=[chunks[cid].metadata for cid in batch],
+                ids=batch,
+            )
+
+    with open(manifest_path, "w") as f:
+        json.dump({"source_hash": source_hash, "settings": settings, "chunks": len(chunks)}, f)
+
+    stats.update(added=len(new_ids), deleted=len(stale), chunks=len(chunks),
+                 near_duplicates=dedup_report.chunks_removed,
+                 seconds=round(time.perf_counter() - start, 3))
+    return vectorstore, stats